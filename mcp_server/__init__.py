@@ -16,7 +16,10 @@ except ImportError:
 
     __version__ = version("spec-driven-development-mcp")
 
+from .bundles import register_bundle_routes
+from .compact_prompts import PromptLibrary
 from .config import config
+from .generate_tool import register_generate_tool
 from .prompts_loader import register_prompts
 
 
@@ -33,8 +36,15 @@ def create_app() -> FastMCP:
     async def health_check(request: Request) -> PlainTextResponse:
         return PlainTextResponse("OK")
 
-    # Load prompts from the prompts directory and register them
-    register_prompts(mcp, config.prompts_dir)
+    # Load prompts from the prompts directory and register them, kept in
+    # compact form for the lifetime of the server
+    library = PromptLibrary(compress_bodies=config.compress_prompt_bodies)
+    prompts = register_prompts(mcp, config.prompts_dir, config.prompt_layers, library)
+
+    # Render slash commands from the same parsed prompts, as a tool and as
+    # downloadable per-agent bundles
+    renderer = register_generate_tool(mcp, prompts)
+    register_bundle_routes(mcp, renderer)
 
     @mcp.tool(name="basic-example", description="Return a static message for testing.")
     def basic_example_tool() -> str:
@@ -0,0 +1,107 @@
+"""Per-agent command bundles served over HTTP with content-derived ETags."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+
+from fastmcp import FastMCP
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+from slash_commands.archive import build_archive
+from slash_commands.config import list_agent_keys
+
+from .generate_tool import CommandRenderer
+
+BUNDLE_MEDIA_TYPE = "application/gzip"
+
+
+@dataclass(frozen=True)
+class Bundle:
+    """A built bundle and the registry generation it was built from."""
+
+    generation: str
+    content: bytes
+    etag: str
+
+
+class BundleCache:
+    """Builds each agent's bundle once per prompt-registry generation."""
+
+    def __init__(self, renderer: CommandRenderer):
+        self.renderer = renderer
+        self._bundles: dict[str, Bundle] = {}
+        # Requests build bundles in worker threads; one build at a time
+        self._lock = threading.Lock()
+
+    def get(self, agent_key: str) -> Bundle:
+        """Return the bundle for ``agent_key``, building it if the registry changed.
+
+        Raises:
+            ValueError: If the agent is unknown
+        """
+        with self._lock:
+            return self._get(agent_key)
+
+    def _get(self, agent_key: str) -> Bundle:
+        self.renderer.refresh()
+        generation = self.renderer.generation
+        bundle = self._bundles.get(agent_key)
+        if bundle is not None and bundle.generation == generation:
+            return bundle
+
+        files = self.renderer.render(agent_key)
+        if self.renderer.generation != generation:
+            # A partial changed while rendering; label the files with what they were built from
+            return self._get(agent_key)
+        content = build_archive(
+            f"{agent_key}.tar.gz", ((file["path"], file["content"]) for file in files)
+        )
+        bundle = Bundle(
+            generation=generation, content=content, etag=bundle_etag(generation, agent_key)
+        )
+        self._bundles[agent_key] = bundle
+        return bundle
+
+
+def bundle_etag(generation: str, agent_key: str) -> str:
+    """Return the ETag of an agent's bundle for a prompt-registry generation.
+
+    The generation hashes the prompts and the generator version, so the ETag
+    survives restarts and rebuilds. It is weak because the archive bytes still
+    differ in each file's ``updated_at``.
+    """
+    digest = hashlib.sha256(f"{generation}\0{agent_key}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return True if an ``If-None-Match`` header value matches ``etag``."""
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    opaque = etag.removeprefix("W/")
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return any(candidate in ("*", opaque) for candidate in candidates)
+
+
+def register_bundle_routes(mcp: FastMCP, renderer: CommandRenderer) -> BundleCache:
+    """Register ``GET /bundles/{agent_key}.tar.gz`` (served by the HTTP transport)."""
+    cache = BundleCache(renderer)
+
+    @mcp.custom_route("/bundles/{agent_key}.tar.gz", methods=["GET"])
+    async def get_bundle(request: Request) -> Response:
+        agent_key = request.path_params["agent_key"]
+        if agent_key not in list_agent_keys():
+            return PlainTextResponse(f"Unknown agent: {agent_key}", status_code=404)
+
+        # Rendering and compressing a bundle would block the event loop
+        bundle = await run_in_threadpool(cache.get, agent_key)
+        # Clients must revalidate, which costs a 304 when nothing changed
+        headers = {"ETag": bundle.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match", ""), bundle.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(bundle.content, media_type=BUNDLE_MEDIA_TYPE, headers=headers)
+
+    return cache
@@ -0,0 +1,242 @@
+"""Compact in-memory prompts for servers that keep many prompt libraries loaded.
+
+A :class:`MarkdownPrompt` owns a ``Path``, a tag ``set``, a ``meta`` dict, a
+list of arguments, precomputed agent views and its body. Across a library most
+of that is repeated: the same directory, tags, argument lists and metadata
+appear on many prompts. :class:`PromptLibrary` stores each prompt as a
+:class:`CompactPrompt` with ``__slots__`` whose strings are interned and whose
+tag sets, argument tuples and metadata mappings are shared between every
+prompt that has equal values. Bodies can also be stored zlib-compressed, with
+a small LRU of decompressed bodies.
+
+Compact prompts expose the same read-only fields as ``MarkdownPrompt``;
+:meth:`CompactPrompt.expand` rebuilds a full prompt when one is needed, for
+example to render a command file.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from .prompt_includes import PromptInclude
+from .prompt_utils import MarkdownPrompt, PromptArgumentSpec
+
+# Bodies shorter than this are kept as text even when compression is enabled
+BODY_COMPRESS_THRESHOLD = 512
+
+# Decompressed bodies kept for repeated reads of the same prompts
+BODY_CACHE_SIZE = 64
+
+
+class CompactPrompt:
+    """A prompt stored in a :class:`PromptLibrary`."""
+
+    __slots__ = (
+        "_body",
+        "_token",
+        "agent_overrides",
+        "arguments",
+        "description",
+        "directory",
+        "enabled",
+        "filename",
+        "includes",
+        "library",
+        "meta",
+        "name",
+        "tags",
+    )
+
+    _body: str | bytes  # bytes when compressed
+    _token: int  # Unique within the process; keys the decompressed-body cache
+    agent_overrides: Mapping[str, Any] | None
+    arguments: tuple[PromptArgumentSpec, ...]
+    description: str | None
+    directory: str
+    enabled: bool
+    filename: str
+    includes: tuple[PromptInclude, ...]
+    library: PromptLibrary
+    meta: Mapping[str, Any] | None
+    name: str
+    tags: frozenset[str] | None
+
+    @property
+    def path(self) -> Path:
+        return Path(self.directory, self.filename)
+
+    @property
+    def body(self) -> str:
+        return self.library.body(self)
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self._body, bytes)
+
+    def decorator_kwargs(self) -> dict[str, Any]:
+        return self.expand().decorator_kwargs()
+
+    def expand(self) -> MarkdownPrompt:
+        """Return the prompt as a full :class:`MarkdownPrompt`."""
+        return MarkdownPrompt(
+            path=self.path,
+            name=self.name,
+            description=self.description,
+            tags=set(self.tags) if self.tags is not None else None,
+            meta=dict(self.meta) if self.meta is not None else None,
+            enabled=self.enabled,
+            arguments=list(self.arguments),
+            body=self.body,
+            agent_overrides=dict(self.agent_overrides) if self.agent_overrides else None,
+            includes=self.includes,
+        )
+
+    def __repr__(self) -> str:
+        return f"CompactPrompt(name={self.name!r}, path={str(self.path)!r})"
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_json(value: Any) -> bool:
+    """Return True if ``value`` survives a JSON round trip unchanged."""
+    if isinstance(value, _JSON_SCALARS):
+        return True
+    if isinstance(value, list):
+        return all(_is_json(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json(item) for key, item in value.items())
+    return False
+
+
+def _canonical(mapping: Mapping[str, Any]) -> str | None:
+    """Return the key mappings are shared under, or None if ``mapping`` is not shareable.
+
+    Only plain JSON values are shared: other values (dates, tuples, non-string
+    keys) would collide with JSON values that serialize the same way.
+    """
+    if not _is_json(dict(mapping)):
+        return None
+    return json.dumps(mapping, sort_keys=True)
+
+
+class PromptLibrary:
+    """Prompts stored compactly, sharing equal values between prompts."""
+
+    def __init__(self, compress_bodies: bool = False, body_cache_size: int = BODY_CACHE_SIZE):
+        """Initialize an empty library.
+
+        Args:
+            compress_bodies: Store bodies of at least :data:`BODY_COMPRESS_THRESHOLD`
+                bytes zlib-compressed; they are decompressed on access.
+            body_cache_size: Number of decompressed bodies to keep
+        """
+        self.compress_bodies = compress_bodies
+        self.body_cache_size = body_cache_size
+        self._prompts: dict[str, CompactPrompt] = {}
+        self._tag_sets: dict[frozenset[str], frozenset[str]] = {}
+        self._argument_specs: dict[PromptArgumentSpec, PromptArgumentSpec] = {}
+        self._argument_tuples: dict[tuple[PromptArgumentSpec, ...], tuple[PromptArgumentSpec, ...]]
+        self._argument_tuples = {}
+        self._mappings: dict[str, Mapping[str, Any]] = {}  # Canonical JSON -> shared mapping
+        self._bodies: OrderedDict[int, str] = OrderedDict()  # Prompt token -> decompressed body
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+    def __iter__(self) -> Iterator[CompactPrompt]:
+        return iter(self._prompts.values())
+
+    def get(self, name: str) -> CompactPrompt | None:
+        return self._prompts.get(name)
+
+    def add(self, prompt: MarkdownPrompt) -> CompactPrompt:
+        """Store ``prompt``, replacing any prompt of the same name."""
+        compact = object.__new__(CompactPrompt)
+        compact.library = self
+        compact._token = next(self._tokens)
+        compact.directory = sys.intern(str(prompt.path.parent))
+        compact.filename = sys.intern(prompt.path.name)
+        compact.name = sys.intern(prompt.name)
+        compact.description = prompt.description
+        compact.tags = self._share_tags(prompt.tags)
+        compact.meta = self._share_mapping(prompt.meta)
+        compact.enabled = prompt.enabled
+        compact.arguments = self._share_arguments(prompt.arguments)
+        compact.agent_overrides = self._share_mapping(prompt.agent_overrides)
+        compact.includes = prompt.includes
+        compact._body = self._store_body(prompt.body)
+
+        with self._lock:
+            previous = self._prompts.get(compact.name)
+            if previous is not None:
+                self._bodies.pop(previous._token, None)
+            self._prompts[compact.name] = compact
+        return compact
+
+    def extend(self, prompts: Iterable[MarkdownPrompt]) -> list[CompactPrompt]:
+        """Store several prompts, returning their compact forms in order."""
+        return [self.add(prompt) for prompt in prompts]
+
+    def body(self, prompt: CompactPrompt) -> str:
+        """Return a prompt's body, decompressing it through the LRU if needed."""
+        stored = prompt._body
+        if isinstance(stored, str):
+            return stored
+        key = prompt._token
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                return body
+        body = zlib.decompress(stored).decode("utf-8")
+        with self._lock:
+            self._bodies[key] = body
+            if len(self._bodies) > self.body_cache_size:
+                self._bodies.popitem(last=False)
+        return body
+
+    def _share_tags(self, tags: Iterable[str] | None) -> frozenset[str] | None:
+        if tags is None:
+            return None
+        frozen = frozenset(sys.intern(tag) for tag in tags)
+        return self._tag_sets.setdefault(frozen, frozen)
+
+    def _share_arguments(
+        self, arguments: Iterable[PromptArgumentSpec]
+    ) -> tuple[PromptArgumentSpec, ...]:
+        specs = tuple(
+            self._argument_specs.setdefault(
+                spec,
+                PromptArgumentSpec(sys.intern(spec.name), spec.description, spec.required),
+            )
+            for spec in arguments
+        )
+        return self._argument_tuples.setdefault(specs, specs)
+
+    def _share_mapping(self, mapping: Mapping[str, Any] | None) -> Mapping[str, Any] | None:
+        if mapping is None:
+            return None
+        key = _canonical(mapping)
+        if key is None:
+            return MappingProxyType(dict(mapping))
+        shared = self._mappings.get(key)
+        if shared is None:
+            shared = self._mappings[key] = MappingProxyType(dict(mapping))
+        return shared
+
+    def _store_body(self, body: str) -> str | bytes:
+        if self.compress_bodies and len(body) >= BODY_COMPRESS_THRESHOLD:
+            return zlib.compress(body.encode("utf-8"))
+        return body
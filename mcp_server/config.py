@@ -20,9 +20,20 @@ class Config:
         """Initialize configuration with defaults and environment overrides."""
         # Workspace paths
         self.workspace_root = Path(os.getenv("SDD_WORKSPACE_ROOT", "/workspace")).resolve()
-        self.prompts_dir = Path(
-            os.getenv("SDD_PROMPTS_DIR", str(Path(__file__).parent.parent / "prompts"))
-        ).resolve()
+        bundled_prompts_dir = Path(__file__).parent.parent / "prompts"
+        self.prompts_dir = Path(os.getenv("SDD_PROMPTS_DIR", str(bundled_prompts_dir))).resolve()
+        # Lower-precedence prompt directories beneath prompts_dir, lowest first
+        self.prompt_layers = [
+            Path(layer).resolve()
+            for layer in os.getenv("SDD_PROMPT_LAYERS", "").split(os.pathsep)
+            if layer.strip()
+        ]
+        if os.getenv("SDD_PROMPTS_BUNDLED_LAYER", "false").lower() == "true":
+            self.prompt_layers.insert(0, bundled_prompts_dir.resolve())
+        # Keep large prompt bodies zlib-compressed in memory
+        self.compress_prompt_bodies = (
+            os.getenv("SDD_COMPRESS_PROMPT_BODIES", "false").lower() == "true"
+        )
 
         # Transport configuration
         self.transport: TransportType = os.getenv("SDD_TRANSPORT", "stdio")  # type: ignore
@@ -58,6 +69,7 @@ class Config:
         return (
             f"Config(workspace_root={self.workspace_root}, "
             f"prompts_dir={self.prompts_dir}, "
+            f"prompt_layers={self.prompt_layers}, "
             f"transport={self.transport}, "
             f"http_host={self.http_host}, "
             f"http_port={self.http_port}, "
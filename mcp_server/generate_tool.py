@@ -0,0 +1,216 @@
+"""MCP tool that renders slash command files from the server's parsed prompts."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+
+from fastmcp import FastMCP
+
+from slash_commands.config import get_agent_config, list_agent_keys
+from slash_commands.generators import CommandGenerator
+from slash_commands.generators import __version__ as generator_version
+
+from .compact_prompts import CompactPrompt
+from .prompt_includes import IncludeGraph
+from .prompt_utils import MarkdownPrompt, load_markdown_prompt, prompt_hash
+
+GENERATE_TOOL_NAME = "generate-slash-commands"
+
+# Rendered files are small; this holds every prompt for every agent of a typical library
+RENDER_CACHE_SIZE = 512
+
+RenderKey = tuple[str, str, str]  # (prompt hash, agent key, generator version)
+
+
+class RenderCache:
+    """LRU cache of rendered command files keyed by (prompt hash, agent key, version)."""
+
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[RenderKey, str] = OrderedDict()
+        # Tool calls and bundle builds render from different threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, key: RenderKey, render: Callable[[], str]) -> str:
+        """Return the cached output for ``key``, rendering and storing it on a miss."""
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return content
+            self.misses += 1
+
+        # Rendered outside the lock; a concurrent miss renders the same content
+        content = render()
+        with self._lock:
+            self._entries[key] = content
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return content
+
+
+@dataclass(frozen=True)
+class _RegisteredPrompt:
+    prompt: MarkdownPrompt | CompactPrompt
+    hash: str
+
+    def reload(self) -> MarkdownPrompt | CompactPrompt:
+        """Load the prompt again from its file, keeping compact prompts compact."""
+        prompt = load_markdown_prompt(self.prompt.path)
+        if isinstance(self.prompt, CompactPrompt):
+            return self.prompt.library.add(prompt)
+        return prompt
+
+
+class CommandRenderer:
+    """Renders command files for the prompts registered with the server."""
+
+    def __init__(
+        self,
+        prompts: Iterable[MarkdownPrompt | CompactPrompt],
+        cache: RenderCache | None = None,
+    ):
+        """Initialize the renderer.
+
+        Args:
+            prompts: Parsed prompts, hashed once here. Compact prompts are
+                expanded only to render outputs missing from the cache.
+            cache: Cache of rendered outputs. If None, a new cache is created.
+        """
+        self.cache = cache or RenderCache()
+        self._prompts: dict[str, _RegisteredPrompt] = {}
+        self._includes = IncludeGraph()
+        self.generation = ""
+        # Tool calls and bundle builds refresh the registry from different threads
+        self._lock = threading.Lock()
+        self.update(prompts)
+
+    def update(self, prompts: Iterable[MarkdownPrompt | CompactPrompt]) -> None:
+        """Replace the prompt registry.
+
+        ``generation`` identifies the registry contents, so anything derived from
+        all prompts (such as bundles) can tell when to rebuild.
+        """
+        with self._lock:
+            self._update(prompts)
+
+    def _update(self, prompts: Iterable[MarkdownPrompt | CompactPrompt]) -> None:
+        self._prompts = {
+            prompt.name: _RegisteredPrompt(prompt, prompt_hash(prompt)) for prompt in prompts
+        }
+        self._includes = IncludeGraph(entry.prompt for entry in self._prompts.values())
+        digest = hashlib.sha256(generator_version.encode("utf-8"))
+        for entry in self._prompts.values():
+            digest.update(entry.hash.encode("ascii"))
+        self.generation = digest.hexdigest()
+
+    def refresh(self) -> list[str]:
+        """Reload the prompts that include a partial changed since they were loaded.
+
+        Only those prompts get a new hash, so only their outputs are re-rendered.
+        A prompt that no longer loads keeps its previous version.
+
+        Returns:
+            Names of the reloaded prompts
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> list[str]:
+        changed = self._includes.changed_partials()
+        if not changed:
+            return []
+        sources = self._includes.dependents(changed)
+        reloaded: dict[str, MarkdownPrompt | CompactPrompt] = {}
+        for name, entry in self._prompts.items():
+            if entry.prompt.path in sources:
+                try:
+                    reloaded[name] = entry.reload()
+                except (OSError, ValueError):
+                    continue
+        if reloaded:
+            self._update(reloaded.get(name, entry.prompt) for name, entry in self._prompts.items())
+        return list(reloaded)
+
+    def render(self, agent_key: str, names: Sequence[str] | None = None) -> list[dict[str, str]]:
+        """Render command files for one agent.
+
+        Args:
+            agent_key: Agent to render for
+            names: Prompt names to render. If None, renders every enabled prompt.
+
+        Returns:
+            One ``{"name", "path", "content"}`` dict per file, where ``path`` is
+            relative to the agent's home directory
+
+        Raises:
+            ValueError: If the agent or a prompt name is unknown
+        """
+        if agent_key not in list_agent_keys():
+            valid_keys = ", ".join(list_agent_keys())
+            raise ValueError(f"Unknown agent: {agent_key} (valid agents: {valid_keys})")
+        agent = get_agent_config(agent_key)
+        with self._lock:
+            self._refresh()
+            registry = self._prompts  # Replaced, never mutated, by later updates
+
+        if names is None:
+            selected = list(registry.values())
+        else:
+            unknown = [name for name in names if name not in registry]
+            if unknown:
+                raise ValueError(f"Unknown prompts: {', '.join(unknown)}")
+            selected = [registry[name] for name in dict.fromkeys(names)]
+
+        files = []
+        for entry in selected:
+            prompt = entry.prompt
+            if not prompt.enabled:
+                continue
+            content = self.cache.get_or_render(
+                (entry.hash, agent.key, generator_version),
+                lambda prompt=prompt: CommandGenerator.create(agent.command_format).generate(
+                    prompt.expand() if isinstance(prompt, CompactPrompt) else prompt, agent
+                ),
+            )
+            files.append({
+                "name": prompt.name,
+                "path": f"{agent.command_dir}/{agent.command_filename(prompt.name)}",
+                "content": content,
+            })
+        return files
+
+
+def register_generate_tool(
+    mcp: FastMCP,
+    prompts: Iterable[MarkdownPrompt | CompactPrompt],
+    cache: RenderCache | None = None,
+) -> CommandRenderer:
+    """Register the ``generate-slash-commands`` tool for already-parsed prompts."""
+    renderer = CommandRenderer(prompts, cache)
+
+    @mcp.tool(
+        name=GENERATE_TOOL_NAME,
+        description=(
+            "Render slash command files for an AI assistant from the server's prompts. "
+            "Returns each file's path (relative to the home directory) and content."
+        ),
+    )
+    def generate_slash_commands(
+        agent: str, prompts: list[str] | None = None
+    ) -> list[dict[str, str]]:
+        """Render command files for ``agent``, optionally limited to ``prompts``."""
+        return renderer.render(agent, prompts)
+
+    return renderer
@@ -0,0 +1,191 @@
+"""Shared prompt sections (partials) included into prompt bodies.
+
+A line of the form ``<!-- include: partials/commit-protocol.md -->`` in a
+prompt body is replaced by the contents of that file. Paths are relative to
+the prompt's directory (or prompt pack) and may not leave it. Partials may
+include other partials; cycles are an error. Unresolved directives are HTML
+comments, so they stay invisible wherever the raw prompt is rendered.
+
+Each partial is read and expanded once per process while its file is
+unchanged, and every prompt including it shares that one string. Prompts
+record the partials they include and the state of each when it was read, so
+an edit to a partial invalidates only the prompts that include it.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+from .prompt_packs import prompt_state, read_prompt_text
+
+if TYPE_CHECKING:
+    from .prompt_utils import MarkdownPrompt
+
+INCLUDE_PATTERN = re.compile(
+    r"^[ \t]*<!--[ \t]*include:[ \t]*(?P<path>\S+)[ \t]*-->[ \t]*$\n?", re.M
+)
+
+# (mtime_ns, size) of a file when it was read, as returned by prompt_state()
+FileState = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class PromptInclude:
+    """A partial included by a prompt, and its state when the prompt was loaded."""
+
+    path: Path
+    state: FileState
+
+
+@dataclass(frozen=True)
+class _Partial:
+    text: str  # With nested includes expanded
+    includes: tuple[PromptInclude, ...]  # The partial itself first, then nested ones
+
+
+class PartialCache:
+    """Expanded partials keyed by path, reused while none of their files changed."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[Path, _Partial] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path, root: Path, stack: tuple[Path, ...] = ()) -> _Partial:
+        """Return the expanded partial at ``path``.
+
+        Raises:
+            ValueError: If the partial is missing or the includes form a cycle
+        """
+        if path in stack:
+            cycle = " -> ".join(str(item.relative_to(root)) for item in (*stack, path))
+            raise ValueError(f"Include cycle: {cycle}")
+        cached = self._entries.get(path)
+        if cached is not None and not includes_changed(cached.includes):
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        try:
+            state = prompt_state(path)
+            text = read_prompt_text(path)
+        except (OSError, UnicodeDecodeError) as e:
+            raise ValueError(f"Cannot include {path.relative_to(root)}: {e}") from None
+        text, nested = _expand(text, root, (*stack, path), self)
+        partial = _Partial(text, (PromptInclude(path, state), *nested))
+        with self._lock:
+            self._entries[path] = partial
+        return partial
+
+
+# Partials shared by every prompt loaded in this process
+_partials = PartialCache()
+
+
+def _include_path(root: Path, relative: str) -> Path:
+    """Resolve an include directive's path, which must stay inside ``root``."""
+    posix = PurePosixPath(relative)
+    if posix.is_absolute() or ".." in posix.parts:
+        raise ValueError(f"Include path must be relative to the prompts directory: {relative}")
+    return root.joinpath(*posix.parts)
+
+
+def _expand(
+    text: str, root: Path, stack: tuple[Path, ...], cache: PartialCache
+) -> tuple[str, tuple[PromptInclude, ...]]:
+    if "include:" not in text:
+        return text, ()
+    includes: dict[Path, PromptInclude] = {}
+    pieces: list[str] = []
+    position = 0
+    for match in INCLUDE_PATTERN.finditer(text):
+        partial = cache.load(_include_path(root, match["path"]), root, stack)
+        pieces.append(text[position : match.start()])
+        pieces.append(partial.text if partial.text.endswith("\n") else partial.text + "\n")
+        position = match.end()
+        for include in partial.includes:
+            includes.setdefault(include.path, include)
+    if not pieces:
+        return text, ()
+    pieces.append(text[position:])
+    return "".join(pieces), tuple(includes.values())
+
+
+def expand_includes(body: str, prompt_path: Path) -> tuple[str, tuple[PromptInclude, ...]]:
+    """Replace the include directives in a prompt body with the partials' contents.
+
+    Args:
+        body: Prompt body
+        prompt_path: Path of the prompt file; include paths are relative to its directory
+
+    Returns:
+        The expanded body, and every partial it includes, directly or not
+
+    Raises:
+        ValueError: If a partial is missing, outside the prompts directory, or
+            the includes form a cycle
+    """
+    return _expand(body, prompt_path.parent, (prompt_path,), _partials)
+
+
+def includes_changed(includes: Iterable[PromptInclude]) -> bool:
+    """Return True if any included file changed or disappeared since it was read."""
+    for include in includes:
+        try:
+            if prompt_state(include.path) != include.state:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+class IncludeGraph:
+    """Which prompt files include which partials."""
+
+    def __init__(self, prompts: Iterable[MarkdownPrompt] = ()):
+        self._dependents: dict[Path, set[Path]] = {}  # Partial -> prompt files
+        self._states: dict[Path, FileState | None] = {}  # Partial -> state last seen
+        self.track(prompts)
+
+    @property
+    def partials(self) -> set[Path]:
+        return set(self._dependents)
+
+    def track(self, prompts: Iterable[MarkdownPrompt]) -> None:
+        """Record the includes of newly loaded prompts, replacing their previous ones."""
+        for prompt in prompts:
+            self.forget(prompt.path)
+            for include in prompt.includes:
+                self._dependents.setdefault(include.path, set()).add(prompt.path)
+                self._states[include.path] = include.state
+
+    def forget(self, source: Path) -> None:
+        """Drop a prompt file from the graph."""
+        for partial in [partial for partial, deps in self._dependents.items() if source in deps]:
+            self._dependents[partial].discard(source)
+            if not self._dependents[partial]:
+                del self._dependents[partial]
+                del self._states[partial]
+
+    def dependents(self, partials: Iterable[Path]) -> set[Path]:
+        """Return the prompt files that include any of ``partials``."""
+        return set().union(*(self._dependents.get(partial, ()) for partial in partials))
+
+    def changed_partials(self) -> set[Path]:
+        """Return the partials that changed since they were last read or reported."""
+        changed = set()
+        for partial, state in self._states.items():
+            try:
+                current: FileState | None = prompt_state(partial)
+            except OSError:
+                current = None
+            if current != state:
+                changed.add(partial)
+                self._states[partial] = current
+        return changed
@@ -0,0 +1,188 @@
+"""Layered prompt directories, where a higher layer overrides prompts by name.
+
+Layers are listed lowest first, e.g. bundled prompts, then an org-wide
+directory, a team directory and a user directory. Resolving them needs the
+prompt name of every file in every layer, which means reading each file's
+frontmatter. The name index of each layer is therefore cached, in memory and
+optionally on disk, and reused while the layer directory's mtime is unchanged.
+Adding, removing or renaming a file changes its directory's mtime; editing a
+prompt's ``name`` in place does not, which :meth:`PromptOverlay.load` detects
+for the prompts it loads.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from .prompt_packs import list_prompt_files, read_prompt_text
+from .prompt_utils import MarkdownPrompt, load_markdown_prompt, parse_frontmatter
+
+OVERLAY_CACHE_VERSION = 1
+
+
+def default_overlay_cache_path() -> Path:
+    """Return the per-user file that persists layer indexes between runs."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "sdd-prompts" / "overlay-index.json"
+
+
+@dataclass(frozen=True)
+class LayerIndex:
+    """Prompt names of one layer directory, as of its mtime."""
+
+    mtime_ns: int
+    files: dict[str, str]  # Prompt name -> file name
+
+
+def _prompt_name(path: Path) -> str:
+    # Derived exactly as load_markdown_prompt derives it
+    frontmatter, _ = parse_frontmatter(read_prompt_text(path))
+    return frontmatter.get("name") or path.stem
+
+
+def scan_layer(directory: Path) -> dict[str, str]:
+    """Map each prompt name in ``directory`` (or prompt pack) to the file defining it.
+
+    Files are scanned in name order, so when two files in one layer define
+    the same prompt the later one wins, as it does without layers.
+    """
+    return {_prompt_name(path): path.name for path in list_prompt_files(directory)}
+
+
+# Layer indexes shared by every overlay in this process, keyed by resolved directory
+_memory: dict[str, LayerIndex] = {}
+
+
+class PromptOverlay:
+    """Resolve prompt names across layered directories; the highest layer wins."""
+
+    def __init__(self, layers: Sequence[Path], cache_path: Path | None = None):
+        """Initialize the overlay.
+
+        Args:
+            layers: Prompt directories, lowest precedence first
+            cache_path: File that persists layer indexes between runs. If None,
+                indexes are only cached for the lifetime of the process.
+        """
+        if not layers:
+            raise ValueError("At least one prompts directory is required")
+        self.layers = list(layers)
+        self.cache_path = cache_path
+        self.scanned = 0  # Layers whose index was rebuilt by this overlay
+        self._disk: dict[str, LayerIndex] | None = None
+        self._rescan = False
+        self._winners: dict[str, Path] | None = None
+        self._key: tuple[int, ...] | None = None
+
+    def _disk_indexes(self) -> dict[str, LayerIndex]:
+        """Return the persisted layer indexes, reading the cache file once."""
+        if self._disk is None:
+            self._disk = {}
+            if self.cache_path is not None:
+                try:
+                    data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                    if data.get("version") == OVERLAY_CACHE_VERSION:
+                        self._disk = {
+                            directory: LayerIndex(int(entry["mtime_ns"]), dict(entry["files"]))
+                            for directory, entry in data["layers"].items()
+                        }
+                except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                    pass
+        return self._disk
+
+    def _layer_index(self, directory: Path) -> LayerIndex:
+        """Return a layer's index, rescanning it only when its directory changed."""
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise ValueError(f"Prompts directory does not exist: {directory}") from None
+        key = str(directory.resolve())
+        cached = None if self._rescan else _memory.get(key)
+        if cached is None and not self._rescan:
+            cached = self._disk_indexes().get(key)
+        if cached is None or cached.mtime_ns != mtime_ns:
+            cached = LayerIndex(mtime_ns, scan_layer(directory))
+            self.scanned += 1
+        _memory[key] = cached
+        return cached
+
+    def _save(self) -> None:
+        """Persist this overlay's layer indexes, keeping other layers' entries."""
+        if self.cache_path is None:
+            return
+        disk = self._disk_indexes()
+        for directory in self.layers:
+            key = str(directory.resolve())
+            disk[key] = _memory[key]
+        layers = {
+            directory: {"mtime_ns": index.mtime_ns, "files": index.files}
+            for directory, index in disk.items()
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump({"version": OVERLAY_CACHE_VERSION, "layers": layers}, handle)
+                os.replace(temp_name, self.cache_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+        except OSError:
+            # The cache only saves rescans; failing to write it never fails the run
+            pass
+
+    def resolve(self) -> dict[str, Path]:
+        """Return the winning file of every prompt name.
+
+        Costs one stat per layer when no layer changed since the last call.
+
+        Raises:
+            ValueError: If a layer directory does not exist
+        """
+        scanned_before = self.scanned
+        indexes = [self._layer_index(directory) for directory in self.layers]
+        self._rescan = False
+        key = tuple(index.mtime_ns for index in indexes)
+        if self._winners is None or key != self._key:
+            winners: dict[str, Path] = {}
+            for directory, index in zip(self.layers, indexes, strict=True):
+                for name, filename in index.files.items():
+                    winners[name] = directory / filename
+            self._winners, self._key = winners, key
+        if self.scanned != scanned_before:
+            self._save()
+        return self._winners
+
+    def prompt_files(self) -> list[Path]:
+        """Return the winning prompt files, sorted by file name."""
+        return sorted(self.resolve().values(), key=lambda path: (path.name, str(path)))
+
+    def invalidate(self) -> None:
+        """Forget the indexes of this overlay's layers, forcing a rescan."""
+        self._rescan = True
+        self._winners = None
+
+    def load(
+        self, loader: Callable[[Path], MarkdownPrompt] = load_markdown_prompt
+    ) -> list[MarkdownPrompt]:
+        """Load the winning prompts, sorted by file name.
+
+        If a loaded prompt's name no longer matches the index (its ``name``
+        was edited in place), the layers are rescanned once.
+        """
+        for attempt in range(2):
+            prompts = [loader(path) for path in self.prompt_files()]
+            if attempt or all(self.wins(prompt) for prompt in prompts):
+                return prompts
+            self.invalidate()
+        return prompts
+
+    def wins(self, prompt: MarkdownPrompt) -> bool:
+        """Return True if ``prompt`` is the winning file for its name in the current index."""
+        return self._winners is not None and self._winners.get(prompt.name) == prompt.path
@@ -0,0 +1,208 @@
+"""Prompt packs: ``.zip`` archives of prompt files, read in place.
+
+A pack can be used wherever a prompts directory is expected. Its prompts are
+the ``*.md`` members at the root of the archive, or inside its single
+top-level directory. Members are addressed by virtual paths below the
+archive, e.g. ``packs/sdd-1.4.zip/generate-spec.md``, so prompts loaded from
+a pack look like prompts loaded from a directory.
+
+Open packs are kept per process and indexed by their central directory, so
+reading a prompt is one lookup and one member read. Large packs are
+memory-mapped instead of read through a file handle.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import threading
+import zipfile
+from pathlib import Path, PurePosixPath
+
+PROMPT_PACK_SUFFIX = ".zip"
+
+# Packs at least this large are memory-mapped
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def is_prompt_pack(path: Path) -> bool:
+    """Return True if ``path`` is a prompt pack archive."""
+    return path.suffix.lower() == PROMPT_PACK_SUFFIX and path.is_file()
+
+
+class PromptPack:
+    """An open prompt pack, indexed by its central directory."""
+
+    def __init__(self, path: Path, use_mmap: bool | None = None):
+        """Open a prompt pack.
+
+        Args:
+            path: Path of the ``.zip`` archive
+            use_mmap: Memory-map the archive. If None, only packs of at least
+                :data:`MMAP_THRESHOLD` bytes are memory-mapped.
+
+        Raises:
+            ValueError: If ``path`` is not a valid zip archive
+        """
+        self.path = path
+        stat = path.stat()
+        self.state = (stat.st_mtime_ns, stat.st_size)
+        if use_mmap is None:
+            use_mmap = stat.st_size >= MMAP_THRESHOLD
+        self._handle = path.open("rb")
+        self._mmap: mmap.mmap | None = None
+        try:
+            source = self._handle
+            if use_mmap and stat.st_size:
+                self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+                source = _MappedReader(self._mmap)
+            self._zip = zipfile.ZipFile(source)
+        except zipfile.BadZipFile as e:
+            self.close()
+            raise ValueError(f"Invalid prompt pack {path}: {e}") from None
+
+        infos = [info for info in self._zip.infolist() if not info.is_dir()]
+        self.root = _prompt_root(infos)
+        # Every file below the root by relative path, e.g. partials included by prompts
+        self.files: dict[str, zipfile.ZipInfo] = {}
+        for info in infos:
+            member = PurePosixPath(info.filename)
+            if member.is_relative_to(self.root):
+                self.files[member.relative_to(self.root).as_posix()] = info
+        # Prompt files are the *.md files directly inside the root
+        self.members = {
+            name: info
+            for name, info in self.files.items()
+            if "/" not in name and name.endswith(".md")
+        }
+
+    def prompt_files(self) -> list[Path]:
+        """Return the virtual paths of the pack's prompt files, sorted by name."""
+        return [self.path / name for name in sorted(self.members)]
+
+    def member(self, name: str) -> zipfile.ZipInfo:
+        """Return the entry of a file, by its path relative to the pack root.
+
+        Raises:
+            FileNotFoundError: If the pack has no such file
+        """
+        try:
+            return self.files[name]
+        except KeyError:
+            raise FileNotFoundError(f"Prompt file does not exist: {self.path / name}") from None
+
+    def read_text(self, name: str) -> str:
+        """Return the text of a file, by its path relative to the pack root."""
+        return self._zip.read(self.member(name)).decode("utf-8")
+
+    def close(self) -> None:
+        if getattr(self, "_zip", None) is not None:
+            self._zip.close()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._handle.close()
+
+
+class _MappedReader(io.RawIOBase):
+    """Seekable file interface over a memory-mapped archive, as zipfile expects."""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+    def read(self, size: int | None = -1) -> bytes:
+        return self._mapped.read(size if size is not None and size >= 0 else None)
+
+    def readinto(self, buffer: bytearray) -> int:  # type: ignore[override]
+        data = self._mapped.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _prompt_root(infos: list[zipfile.ZipInfo]) -> PurePosixPath:
+    """Return the archive root, or its single top-level directory if it holds everything."""
+    tops = {PurePosixPath(info.filename).parts[0] for info in infos}
+    nested = all(len(PurePosixPath(info.filename).parts) > 1 for info in infos)
+    if len(tops) == 1 and nested:
+        return PurePosixPath(tops.pop())
+    return PurePosixPath(".")
+
+
+_packs: dict[Path, PromptPack] = {}
+_packs_lock = threading.Lock()
+
+
+def open_pack(path: Path) -> PromptPack:
+    """Return the open pack at ``path``, reopening it if the archive changed."""
+    path = Path(os.path.abspath(path))
+    stat = path.stat()
+    with _packs_lock:
+        pack = _packs.get(path)
+        if pack is not None and pack.state == (stat.st_mtime_ns, stat.st_size):
+            return pack
+        if pack is not None:
+            pack.close()
+        pack = _packs[path] = PromptPack(path)
+        return pack
+
+
+def _split_member(path: Path) -> tuple[Path, str] | None:
+    """Split a virtual path into its pack and the file's path relative to the pack root."""
+    for parent in path.parents:
+        if parent.suffix.lower() == PROMPT_PACK_SUFFIX and parent.is_file():
+            return parent, path.relative_to(parent).as_posix()
+    return None
+
+
+def list_prompt_files(prompts_dir: Path) -> list[Path]:
+    """Return the prompt files of a directory or pack, sorted by name."""
+    if is_prompt_pack(prompts_dir):
+        return open_pack(prompts_dir).prompt_files()
+    return sorted(
+        (path for path in prompts_dir.iterdir() if path.is_file() and path.suffix == ".md"),
+        key=lambda path: path.name,
+    )
+
+
+def read_prompt_text(path: Path) -> str:
+    """Return the text of a prompt file, or of a file inside a pack.
+
+    Raises:
+        FileNotFoundError: If there is no such prompt file
+    """
+    if path.is_file():
+        return path.read_text()
+    split = _split_member(path)
+    if split is None:
+        raise FileNotFoundError(f"Prompt file does not exist: {path}")
+    pack_path, name = split
+    return open_pack(pack_path).read_text(name)
+
+
+def prompt_state(path: Path) -> tuple[int, int]:
+    """Return (mtime_ns, size) of a prompt file, used to notice changes.
+
+    Prompts inside a pack report the pack's mtime and their uncompressed size.
+    """
+    try:
+        stat = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        split = _split_member(path)
+        if split is None:
+            raise
+        pack = open_pack(split[0])
+        return pack.state[0], pack.member(split[1]).file_size
+    return stat.st_mtime_ns, stat.st_size
@@ -1,20 +1,44 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
-from dataclasses import dataclass
+import hashlib
+import json
+import logging
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
 
 import yaml
 
+from .prompt_includes import PromptInclude, expand_includes
+from .prompt_packs import read_prompt_text
 
-@dataclass(frozen=True)
+if TYPE_CHECKING:
+    from .compact_prompts import CompactPrompt
+
+
+@dataclass(frozen=True, slots=True)
 class PromptArgumentSpec:
     name: str
     description: str | None
     required: bool
 
 
+@dataclass(frozen=True, slots=True)
+class AgentPromptView:
+    """A prompt's description, arguments and enabled flag as seen by one agent."""
+
+    description: str | None
+    arguments: tuple[PromptArgumentSpec, ...]
+    enabled: bool
+
+
+_OVERRIDE_KEYS = {"description", "arguments", "enabled"}
+
+logger = logging.getLogger(__name__)
+
+
 @dataclass(frozen=True)
 class MarkdownPrompt:
     path: Path
@@ -26,6 +50,30 @@ class MarkdownPrompt:
     arguments: list[PromptArgumentSpec]
     body: str
     agent_overrides: dict[str, Any] | None = None
+    # Partials expanded into body, with their state when read
+    includes: tuple[PromptInclude, ...] = ()
+    # Resolved once from agent_overrides when the prompt is created
+    default_view: AgentPromptView = field(init=False, repr=False, compare=False)
+    agent_views: Mapping[str, AgentPromptView] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        default_view = AgentPromptView(
+            description=self.description,
+            arguments=tuple(self.arguments),
+            enabled=self.enabled,
+        )
+        views = {
+            agent_key: _resolve_agent_view(default_view, agent_key, overrides)
+            for agent_key, overrides in _validate_agent_overrides(
+                self.agent_overrides, self.path
+            ).items()
+        }
+        object.__setattr__(self, "default_view", default_view)
+        object.__setattr__(self, "agent_views", MappingProxyType(views))
+
+    def for_agent(self, agent_key: str) -> AgentPromptView:
+        """Return the prompt as seen by ``agent_key``, with its overrides applied."""
+        return self.agent_views.get(agent_key, self.default_view)
 
     def decorator_kwargs(self) -> dict[str, Any]:
         kwargs: dict[str, Any] = {"name": self.name}
@@ -41,11 +89,12 @@ class MarkdownPrompt:
 
 
 def load_markdown_prompt(path: Path) -> MarkdownPrompt:
-    if not path.exists():
-        raise FileNotFoundError(f"Prompt file does not exist: {path}")
-
-    content = path.read_text()
+    # Also reads prompts inside a .zip prompt pack, e.g. pack.zip/generate-spec.md
+    content = read_prompt_text(path)
     frontmatter, body = parse_frontmatter(content)
+    body, includes = expand_includes(body, path)
+    if includes:
+        body = body.strip()
 
     name = frontmatter.get("name") or path.stem
     description = frontmatter.get("description")
@@ -82,9 +131,29 @@ def load_markdown_prompt(path: Path) -> MarkdownPrompt:
         arguments=arguments,
         body=body,
         agent_overrides=agent_overrides,
+        includes=includes,
     )
 
 
+def prompt_hash(prompt: MarkdownPrompt | CompactPrompt) -> str:
+    """Return a SHA-256 of every prompt field that affects rendered output."""
+    source = {
+        "name": prompt.name,
+        "source_path": prompt.path.name,
+        "description": prompt.description,
+        "tags": sorted(prompt.tags or ()),
+        "meta": dict(prompt.meta) if prompt.meta is not None else None,
+        "enabled": prompt.enabled,
+        "arguments": [[arg.name, arg.description, arg.required] for arg in prompt.arguments],
+        "body": prompt.body,
+        "agent_overrides": (
+            dict(prompt.agent_overrides) if prompt.agent_overrides is not None else None
+        ),
+    }
+    data = json.dumps(source, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
 def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     if not content.startswith("---"):
         return {}, content
@@ -133,6 +202,62 @@ def normalize_arguments(raw: Any) -> list[PromptArgumentSpec]:
     return normalized
 
 
+def _validate_agent_overrides(raw: Any, path: Path) -> dict[str, dict[str, Any]]:
+    if not raw:
+        return {}
+
+    if not isinstance(raw, dict):
+        raise ValueError("agent_overrides metadata must be a mapping of agent keys to overrides")
+
+    for agent_key, overrides in raw.items():
+        if not isinstance(overrides, dict):
+            raise ValueError(f"agent_overrides for '{agent_key}' must be a mapping")
+        unknown = set(overrides) - _OVERRIDE_KEYS
+        if unknown:
+            # Unsupported keys have always been ignored; warn instead of failing the load
+            logger.warning(
+                "%s: ignoring unsupported agent_overrides keys for '%s': %s",
+                path,
+                agent_key,
+                ", ".join(sorted(map(str, unknown))),
+            )
+        description = overrides.get("description")
+        if description is not None and not isinstance(description, str):
+            raise ValueError(f"agent_overrides description for '{agent_key}' must be a string")
+        if "enabled" in overrides and not isinstance(overrides["enabled"], bool):
+            raise ValueError(f"agent_overrides enabled for '{agent_key}' must be a boolean")
+
+    return raw
+
+
+def _resolve_agent_view(
+    base: AgentPromptView, agent_key: str, overrides: dict[str, Any]
+) -> AgentPromptView:
+    arguments = base.arguments
+    if "arguments" in overrides:
+        try:
+            override_args = normalize_arguments(overrides["arguments"])
+        except ValueError as exc:
+            raise ValueError(f"agent_overrides arguments for '{agent_key}': {exc}") from exc
+
+        # Override by name (override precedence), preserving base order
+        merged = list(arguments)
+        idx_by_name = {arg.name: i for i, arg in enumerate(merged)}
+        for oarg in override_args:
+            if oarg.name in idx_by_name:
+                merged[idx_by_name[oarg.name]] = oarg
+            else:
+                idx_by_name[oarg.name] = len(merged)
+                merged.append(oarg)
+        arguments = tuple(merged)
+
+    return AgentPromptView(
+        description=overrides.get("description", base.description),
+        arguments=arguments,
+        enabled=overrides.get("enabled", base.enabled),
+    )
+
+
 def _ensure_tag_set(raw: Any) -> set[str] | None:
     if raw is None:
         return None
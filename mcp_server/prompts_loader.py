@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import contextlib
+from collections.abc import Sequence
 from pathlib import Path
 
 from fastmcp import FastMCP
 
+from .compact_prompts import CompactPrompt, PromptLibrary
+from .prompt_includes import includes_changed
+from .prompt_layers import PromptOverlay, default_overlay_cache_path
+from .prompt_packs import list_prompt_files
 from .prompt_utils import MarkdownPrompt, load_markdown_prompt
 
 
@@ -11,26 +17,60 @@ def _load_prompt(prompts_dir: Path, filename: str) -> MarkdownPrompt:
     return load_markdown_prompt(prompts_dir / filename)
 
 
-def _register_prompt(mcp: FastMCP, prompt: MarkdownPrompt) -> None:
+def _register_prompt(mcp: FastMCP, prompt: MarkdownPrompt | CompactPrompt) -> None:
+    current = prompt
+
     # See https://gofastmcp.com/servers/prompts#the-%40prompt-decorator
     @mcp.prompt(**prompt.decorator_kwargs())
     def prompt_handler() -> str:
-        return prompt.body
+        nonlocal current
+        # Serve edits to included partials without a restart; keep the last
+        # good body if the prompt no longer loads
+        if current.includes and includes_changed(current.includes):
+            with contextlib.suppress(OSError, ValueError):
+                reloaded = load_markdown_prompt(current.path)
+                if isinstance(current, CompactPrompt):
+                    current = current.library.add(reloaded)
+                else:
+                    current = reloaded
+        return current.body
 
     prompt_handler.__name__ = f"{prompt.name}_prompt"
 
 
-def register_prompts(mcp: FastMCP, prompts_dir: Path) -> None:
+def register_prompts(
+    mcp: FastMCP,
+    prompts_dir: Path,
+    layers: Sequence[Path] = (),
+    library: PromptLibrary | None = None,
+) -> list[MarkdownPrompt] | list[CompactPrompt]:
+    """Load the prompts of a directory or pack and register them with the server.
+
+    Args:
+        mcp: Server to register the prompts with
+        prompts_dir: Prompts directory or prompt pack
+        layers: Lower-precedence prompt directories, lowest first
+        library: If given, prompts are kept in it in compact form and the
+            compact prompts are returned
+
+    Returns:
+        The registered prompts
+    """
     if not prompts_dir.exists():
         raise ValueError(f"Prompts directory does not exist: {prompts_dir}")
 
-    # Get all of the prompt files
-    prompt_files = sorted(
-        (f for f in prompts_dir.iterdir() if f.is_file() and f.suffix == ".md"),
-        key=lambda file_path: file_path.name,
-    )
+    # Lower layers only contribute prompts whose names prompts_dir does not define
+    if layers:
+        overlay = PromptOverlay([*layers, prompts_dir], cache_path=default_overlay_cache_path())
+        prompts = overlay.load()
+    else:
+        # Get all of the prompt files, from a directory or a .zip prompt pack
+        prompts = [
+            _load_prompt(prompts_dir, prompt_file.name)
+            for prompt_file in list_prompt_files(prompts_dir)
+        ]
 
-    # Load and register each prompt
-    for prompt_file in prompt_files:
-        prompt_info = _load_prompt(prompts_dir, prompt_file.name)
+    registered = library.extend(prompts) if library is not None else prompts
+    for prompt_info in registered:
         _register_prompt(mcp, prompt_info)
+    return registered
@@ -1,8 +1,15 @@
 """Slash command generator package."""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .config import SUPPORTED_AGENTS, AgentConfig, CommandFormat, get_agent_config, list_agent_keys
-from .detection import detect_agents
-from .writer import SlashCommandWriter
+
+if TYPE_CHECKING:
+    from .cli import app
+    from .detection import detect_agents
+    from .writer import SlashCommandWriter
 
 __all__ = [
     "SUPPORTED_AGENTS",
@@ -15,5 +22,17 @@ __all__ = [
     "list_agent_keys",
 ]
 
-# Expose CLI for testing
-from .cli import app
+# Imported on first use, so the daemon client starts without loading the CLI stack
+_LAZY_ATTRIBUTES = {
+    "SlashCommandWriter": ".writer",
+    "app": ".cli",
+    "detect_agents": ".detection",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib  # noqa: PLC0415
+
+    return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
@@ -0,0 +1,231 @@
+"""Archive output backend: stream generated command files into a single archive.
+
+Entries are written in generation order (sorted prompts, then agents in the
+order given) with fixed timestamps, ownership and permissions. Generated files
+record their generation time in ``updated_at``, so archives are byte-identical
+only when ``SOURCE_DATE_EPOCH`` is set: it fixes both the entry timestamps and
+``updated_at``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import IO, Any
+
+# 1980-01-01T00:00:00Z, the earliest timestamp a zip entry can store
+DEFAULT_EPOCH = 315532800
+
+# Archive formats by file suffix
+ARCHIVE_FORMATS = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar.gz",
+    ".tgz": "tar.gz",
+    ".tar.bz2": "tar.bz2",
+    ".tar.xz": "tar.xz",
+    ".tar.zst": "tar.zst",
+}
+
+FILE_MODE = 0o644
+
+
+def archive_format(path: Path) -> str:
+    """Return the archive format for ``path`` based on its suffix.
+
+    Raises:
+        ValueError: If the suffix is not a supported archive format
+    """
+    name = path.name.lower()
+    for suffix in sorted(ARCHIVE_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return ARCHIVE_FORMATS[suffix]
+    supported = ", ".join(ARCHIVE_FORMATS)
+    raise ValueError(f"Unsupported archive format: {path.name} (supported: {supported})")
+
+
+def source_date_epoch() -> int:
+    """Return ``SOURCE_DATE_EPOCH`` if set to a valid value, else :data:`DEFAULT_EPOCH`."""
+    value = os.environ.get("SOURCE_DATE_EPOCH", "")
+    return int(value) if value.isdigit() else DEFAULT_EPOCH
+
+
+def _zstd_writer() -> Callable[[IO[bytes]], IO[bytes]]:
+    """Return a function that wraps a stream in a Zstandard compressor.
+
+    Uses the standard library module on Python 3.14+, and the optional
+    ``zstandard`` package on older versions.
+
+    Raises:
+        ValueError: If this Python has no Zstandard support
+    """
+    try:
+        from compression import zstd  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:  # pragma: no cover - Python 3.14+
+        return lambda fileobj: zstd.ZstdFile(fileobj, "wb")
+
+    try:
+        import zstandard  # noqa: PLC0415 - optional dependency
+    except ImportError:
+        raise ValueError(
+            ".tar.zst archives require Python 3.14 or newer, or the zstandard package "
+            "(pip install 'spec-driven-development-mcp[zstd]')"
+        ) from None
+    # closefd=False leaves the archive file to close()
+    return lambda fileobj: zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False)
+
+
+class ArchiveOutput:
+    """Writes command files as entries of one zip or tar archive.
+
+    The archive is written to ``<path>.partial`` and renamed into place by
+    :meth:`close`, so an interrupted run never leaves a truncated archive behind.
+    """
+
+    def __init__(self, path: Path, mtime: int | None = None):
+        """Initialize the backend.
+
+        Args:
+            path: Archive to create; the suffix selects the format
+            mtime: Timestamp for every entry. If None, uses :func:`source_date_epoch`.
+
+        Raises:
+            ValueError: If the suffix is not a supported archive format, or the
+                format is not available on this Python
+        """
+        self.path = path
+        self.format = archive_format(path)
+        self._zstd = _zstd_writer() if self.format == "tar.zst" else None
+        self.mtime = source_date_epoch() if mtime is None else mtime
+        self.entries = 0
+        self._partial = path.with_name(f"{path.name}.partial")
+        self._file: IO[bytes] | None = None
+        self._owns_file = True
+        self._streams: list[Any] = []  # Compression streams between archive and file
+        self._archive: zipfile.ZipFile | tarfile.TarFile | None = None
+
+    def open(self, fileobj: IO[bytes] | None = None) -> None:
+        """Start writing the archive.
+
+        Args:
+            fileobj: Stream to write to instead of ``path``. It is left open, and
+                :meth:`close` does not create ``path``.
+        """
+        self._owns_file = fileobj is None
+        if fileobj is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fileobj = self._partial.open("wb")
+        self._file = fileobj
+        self.entries = 0
+        self._streams = []
+
+        if self.format == "zip":
+            self._archive = zipfile.ZipFile(self._file, "w", compression=zipfile.ZIP_DEFLATED)
+            return
+
+        if self.format == "tar.gz":
+            # Fixed header mtime and no embedded file name keep the output reproducible
+            fileobj = gzip.GzipFile(filename="", mode="wb", fileobj=fileobj, mtime=self.mtime)
+            self._streams.append(fileobj)
+        elif self._zstd is not None:
+            fileobj = self._zstd(fileobj)
+            self._streams.append(fileobj)
+        mode = {"tar.bz2": "w:bz2", "tar.xz": "w:xz"}.get(self.format, "w")
+        # Closed by close() or abort(), not by a with-block
+        self._archive = tarfile.open(  # noqa: SIM115
+            fileobj=fileobj, mode=mode, format=tarfile.PAX_FORMAT
+        )
+
+    def add(self, name: str, content: str) -> None:
+        """Add one file to the archive.
+
+        Args:
+            name: Entry name (a relative POSIX path)
+            content: File content, written as UTF-8
+        """
+        if self._archive is None:
+            raise RuntimeError("Archive is not open")
+        data = content.encode("utf-8")
+
+        if isinstance(self._archive, zipfile.ZipFile):
+            info = zipfile.ZipInfo(name, date_time=self._zip_date_time())
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (0o100000 | FILE_MODE) << 16  # Regular file, rw-r--r--
+            self._archive.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = self.mtime
+            info.mode = FILE_MODE
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            self._archive.addfile(info, io.BytesIO(data))
+        self.entries += 1
+
+    def close(self) -> None:
+        """Finish the archive and move it into place."""
+        if self._file is None:
+            return
+        owns_file = self._owns_file
+        self._close_streams()
+        if owns_file:
+            os.replace(self._partial, self.path)
+
+    def abort(self) -> None:
+        """Discard a partially written archive (no-op once closed)."""
+        if self._file is None:
+            return
+        owns_file = self._owns_file
+        try:
+            self._close_streams()
+        finally:
+            if owns_file:
+                self._partial.unlink(missing_ok=True)
+
+    def _close_streams(self) -> None:
+        archive, streams, file = self._archive, self._streams, self._file
+        self._archive, self._streams, self._file = None, [], None
+        try:
+            if archive is not None:
+                archive.close()
+            for stream in reversed(streams):
+                stream.close()
+        finally:
+            if file is not None and self._owns_file:
+                file.close()
+
+    def _zip_date_time(self) -> tuple[int, int, int, int, int, int]:
+        moment = datetime.fromtimestamp(max(self.mtime, DEFAULT_EPOCH), UTC)
+        return (moment.year, moment.month, moment.day, moment.hour, moment.minute, moment.second)
+
+
+def build_archive(name: str, files: Iterable[tuple[str, str]], mtime: int | None = None) -> bytes:
+    """Build an archive in memory.
+
+    Args:
+        name: File name whose suffix selects the format (e.g. ``bundle.tar.gz``)
+        files: ``(entry name, content)`` pairs, added in order
+        mtime: Timestamp for every entry. If None, uses :func:`source_date_epoch`.
+
+    Returns:
+        The archive bytes
+    """
+    buffer = io.BytesIO()
+    output = ArchiveOutput(Path(name), mtime)
+    output.open(buffer)
+    try:
+        for entry_name, content in files:
+            output.add(entry_name, content)
+        output.close()
+    except BaseException:
+        output.abort()
+        raise
+    return buffer.getvalue()
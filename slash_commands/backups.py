@@ -0,0 +1,264 @@
+"""Content-addressed backup store for overwritten command files.
+
+Each backed-up file's content is stored once under its SHA-256 digest in
+``<target>/.sdd-backups/objects``. An append-only index records every backup
+(original path, timestamp, digest, size), so repeated backups of identical
+content cost one index line instead of another copy. Retention rules trim the
+index and garbage-collect objects that are no longer referenced.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+BACKUP_STORE_DIRNAME = ".sdd-backups"
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+# Linux ioctl for copy-on-write clones (btrfs, XFS, bcachefs, ...)
+_FICLONE = 0x40049409
+
+
+@dataclass(frozen=True)
+class BackupEntry:
+    """A single recorded backup of one file."""
+
+    path: str  # Original path, relative to the store's base directory
+    timestamp: str  # UTC time formatted with TIMESTAMP_FORMAT
+    sha256: str
+    size: int
+
+
+def _hash_file(path: Path) -> tuple[str, int]:
+    """Return the SHA-256 hex digest and size of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    with path.open("rb") as handle:
+        while chunk := handle.read(1024 * 1024):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _clone_or_copy(source: Path, destination: Path) -> None:
+    """Copy ``source`` to ``destination``, using a reflink when the filesystem allows it.
+
+    Hardlinks are deliberately not used: generated files are rewritten in place,
+    which would silently change a hardlinked backup as well.
+    """
+    try:
+        import fcntl  # noqa: PLC0415 - POSIX only
+
+        with source.open("rb") as src, destination.open("wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        shutil.copystat(source, destination)
+        return
+    except (ImportError, OSError):
+        destination.unlink(missing_ok=True)
+
+    shutil.copy2(source, destination)
+
+
+class BackupStore:
+    """Deduplicating backup store rooted in a target directory."""
+
+    def __init__(
+        self,
+        base_path: Path,
+        keep_backups: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        """Initialize the store.
+
+        Args:
+            base_path: Target directory whose files are backed up. The store lives in
+                ``base_path / .sdd-backups``.
+            keep_backups: Keep at most this many backups per original file. None keeps all.
+            max_bytes: Keep total stored object size at or below this many bytes by
+                dropping the oldest backups first. None means unlimited.
+        """
+        self.base_path = base_path
+        self.root = base_path / BACKUP_STORE_DIRNAME
+        self.keep_backups = keep_backups
+        self.max_bytes = max_bytes
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.jsonl"
+
+    def object_path(self, sha256: str) -> Path:
+        """Return where the object for ``sha256`` is (or would be) stored."""
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def entries(self) -> list[BackupEntry]:
+        """Return all recorded backups, oldest first."""
+        if not self.index_path.exists():
+            return []
+        entries = []
+        for line in self.index_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                entries.append(BackupEntry(**json.loads(line)))
+        return entries
+
+    def entries_for(self, file_path: Path) -> list[BackupEntry]:
+        """Return the recorded backups of ``file_path``, oldest first."""
+        relative = self._relative(file_path)
+        return [entry for entry in self.entries() if entry.path == relative]
+
+    def backup(self, file_path: Path) -> BackupEntry:
+        """Record a backup of ``file_path``, storing its content only if it is new.
+
+        Args:
+            file_path: File to back up (must be inside the base directory)
+
+        Returns:
+            The recorded entry
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        sha256, size = _hash_file(file_path)
+        object_path = self.object_path(sha256)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=object_path.parent, prefix=".tmp-")
+            os.close(fd)
+            try:
+                _clone_or_copy(file_path, Path(temp_name))
+                os.replace(temp_name, object_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+
+        entry = BackupEntry(
+            path=self._relative(file_path),
+            timestamp=datetime.now(UTC).strftime(TIMESTAMP_FORMAT),
+            sha256=sha256,
+            size=size,
+        )
+        with self.index_path.open("a", encoding="utf-8") as index:
+            index.write(json.dumps(asdict(entry), sort_keys=True) + "\n")
+        return entry
+
+    def find(self, file_path: Path, timestamp: str | None = None) -> BackupEntry | None:
+        """Return the newest backup of ``file_path`` taken at or before ``timestamp``.
+
+        Args:
+            file_path: Original file path
+            timestamp: Upper bound (``YYYYMMDD-HHMMSS``, or any prefix of it). None
+                selects the most recent backup.
+        """
+        match = None
+        for entry in self.entries_for(file_path):
+            if timestamp is None or entry.timestamp[: len(timestamp)] <= timestamp:
+                match = entry
+        return match
+
+    def restore(self, file_path: Path, timestamp: str | None = None) -> BackupEntry:
+        """Restore ``file_path`` from the store.
+
+        Args:
+            file_path: Original file path to restore
+            timestamp: See :meth:`find`
+
+        Returns:
+            The entry that was restored
+
+        Raises:
+            FileNotFoundError: If there is no matching backup
+        """
+        entry = self.find(file_path, timestamp)
+        if entry is None:
+            raise FileNotFoundError(f"No backup found for {file_path}")
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=file_path.parent, prefix=".sdd-restore-")
+        os.close(fd)
+        try:
+            _clone_or_copy(self.object_path(entry.sha256), Path(temp_name))
+            os.replace(temp_name, file_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        return entry
+
+    def collect_garbage(self) -> dict[str, int]:
+        """Apply retention rules and delete objects that are no longer referenced.
+
+        Returns:
+            Dict with ``entries_removed``, ``objects_removed`` and ``bytes_freed``
+        """
+        entries = self.entries()
+        kept = entries
+
+        if self.keep_backups is not None:
+            # Keep the newest N entries per original path
+            counts: dict[str, int] = {}
+            newest_first = []
+            for entry in reversed(kept):
+                counts[entry.path] = counts.get(entry.path, 0) + 1
+                if counts[entry.path] <= self.keep_backups:
+                    newest_first.append(entry)
+            kept = list(reversed(newest_first))
+
+        if self.max_bytes is not None:
+            # Drop oldest entries until the unique referenced content fits; an
+            # object's size is freed once its last referencing entry is dropped
+            references: dict[str, int] = {}
+            for entry in kept:
+                references[entry.sha256] = references.get(entry.sha256, 0) + 1
+            total = sum({entry.sha256: entry.size for entry in kept}.values())
+            dropped = 0
+            while dropped < len(kept) and total > self.max_bytes:
+                entry = kept[dropped]
+                references[entry.sha256] -= 1
+                if not references[entry.sha256]:
+                    total -= entry.size
+                dropped += 1
+            kept = kept[dropped:]
+
+        if len(kept) != len(entries):
+            self._write_index(kept)
+
+        referenced = {entry.sha256 for entry in kept}
+        objects_removed = 0
+        bytes_freed = 0
+        objects_dir = self.root / "objects"
+        if objects_dir.exists():
+            for object_path in objects_dir.glob("*/*"):
+                if object_path.name.startswith(".") or object_path.name in referenced:
+                    continue
+                bytes_freed += object_path.stat().st_size
+                object_path.unlink()
+                objects_removed += 1
+
+        return {
+            "entries_removed": len(entries) - len(kept),
+            "objects_removed": objects_removed,
+            "bytes_freed": bytes_freed,
+        }
+
+    def _write_index(self, entries: list[BackupEntry]) -> None:
+        """Atomically replace the index with ``entries``."""
+        fd, temp_name = tempfile.mkstemp(dir=self.root, prefix=".index-")
+        with os.fdopen(fd, "w", encoding="utf-8") as index:
+            for entry in entries:
+                index.write(json.dumps(asdict(entry), sort_keys=True) + "\n")
+        os.replace(temp_name, self.index_path)
+
+    def _relative(self, file_path: Path) -> str:
+        """Return ``file_path`` relative to the base directory, in POSIX form.
+
+        Only the parent directory is resolved: a command file that is itself a
+        symlink (``--link-mode symlink``) is indexed under its own path, not
+        under the store object it points to.
+        """
+        path = file_path.absolute().parent.resolve() / file_path.name
+        try:
+            return path.relative_to(self.base_path.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
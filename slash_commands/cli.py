@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import json
 import sys
+from collections.abc import Iterable
+from contextlib import nullcontext
+from enum import Enum
 from pathlib import Path
 from typing import Annotated, Any
 
@@ -12,12 +16,22 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
-from slash_commands import (
-    SlashCommandWriter,
-    detect_agents,
-    get_agent_config,
-    list_agent_keys,
-)
+from mcp_server.prompt_packs import is_prompt_pack, list_prompt_files
+from mcp_server.prompt_utils import MarkdownPrompt, load_markdown_prompt
+from slash_commands.archive import ArchiveOutput
+from slash_commands.backups import BackupStore
+from slash_commands.config import list_agent_keys
+from slash_commands.daemon import DEFAULT_IDLE_TIMEOUT, GeneratorDaemon
+from slash_commands.daemon_client import default_socket_path
+from slash_commands.detection import detect_agents, scan_agents
+from slash_commands.fleet import generate_fleet, read_targets
+from slash_commands.gitchanges import prompt_changes_since
+from slash_commands.linkstore import LINK_STORE_DIRNAME, LinkStore
+from slash_commands.planning import CONFLICT_CATEGORY_LABELS
+from slash_commands.status import FILE_STATES, collect_status
+from slash_commands.timing import TIMING_STAGES, Timings, collect_timings
+from slash_commands.watch import PromptWatcher, WatchChanges
+from slash_commands.writer import SlashCommandWriter, _find_package_prompts_dir
 
 app = typer.Typer(
     name="sdd-generate-commands",
@@ -27,6 +41,47 @@ app = typer.Typer(
 console = Console()
 
 
+class OutputFormat(str, Enum):
+    """Output formats supported by the generate and cleanup commands."""
+
+    TEXT = "text"
+    NDJSON = "ndjson"
+
+
+class LinkModeOption(str, Enum):
+    """How generated command files are placed in each agent's command directory."""
+
+    COPY = "copy"
+    SYMLINK = "symlink"
+    HARDLINK = "hardlink"
+
+
+def _emit_ndjson(events: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Write each event as one JSON line as soon as it arrives.
+
+    Returns:
+        The final event (the summary)
+    """
+    last: dict[str, Any] = {}
+    for event in events:
+        sys.stdout.write(json.dumps(event, default=str) + "\n")
+        sys.stdout.flush()
+        last = event
+    return last
+
+
+def _resolve_prompt_layers(prompt_layers: list[Path] | None, bundled_layer: bool) -> list[Path]:
+    """Return the prompt layers beneath --prompts-dir, lowest first."""
+    layers = list(prompt_layers or [])
+    if bundled_layer:
+        bundled = _find_package_prompts_dir()
+        if bundled is None:
+            print("Error: Bundled prompts were not found in the installed package", file=sys.stderr)
+            raise typer.Exit(code=3) from None  # I/O error
+        layers.insert(0, bundled)
+    return layers
+
+
 def _prompt_agent_selection(detected_agents: list) -> list:
     """Prompt user to select which agents to generate commands for.
 
@@ -65,9 +120,26 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
         typer.Option(
             "--prompts-dir",
             "-p",
-            help="Directory containing prompt files",
+            help="Directory or .zip prompt pack containing prompt files",
+        ),
+    ] = None,
+    prompt_layers: Annotated[
+        list[Path] | None,
+        typer.Option(
+            "--prompt-layer",
+            help=(
+                "Lower-precedence prompts directory beneath --prompts-dir "
+                "(can be specified multiple times, lowest first)"
+            ),
         ),
     ] = None,
+    bundled_layer: Annotated[
+        bool,
+        typer.Option(
+            "--bundled-layer",
+            help="Use the bundled prompts as the lowest prompt layer",
+        ),
+    ] = False,
     agents: Annotated[
         list[str] | None,
         typer.Option(
@@ -114,6 +186,119 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
             help="List all supported agents and exit",
         ),
     ] = False,
+    transactional: Annotated[
+        bool,
+        typer.Option(
+            "--transactional",
+            help="Stage each agent's files and swap them in together, rolling back on failure",
+        ),
+    ] = False,
+    targets_from: Annotated[
+        str | None,
+        typer.Option(
+            "--targets-from",
+            help="File listing target directories (one per line) or a glob of target directories",
+        ),
+    ] = None,
+    jobs: Annotated[
+        int | None,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Worker threads for --targets-from (defaults to a CPU-based value)",
+        ),
+    ] = None,
+    backup_store: Annotated[
+        bool,
+        typer.Option(
+            "--backup-store",
+            help="Store backups once per unique content in <target>/.sdd-backups",
+        ),
+    ] = False,
+    keep_backups: Annotated[
+        int | None,
+        typer.Option(
+            "--keep-backups",
+            min=0,
+            help="Keep at most N backups per file in the backup store (implies --backup-store)",
+        ),
+    ] = None,
+    max_backup_bytes: Annotated[
+        int | None,
+        typer.Option(
+            "--max-backup-bytes",
+            min=0,
+            help="Cap the backup store size in bytes (implies --backup-store)",
+        ),
+    ] = None,
+    diff: Annotated[
+        bool,
+        typer.Option(
+            "--diff",
+            help="Show unified diffs for files that would change (implies --dry-run)",
+        ),
+    ] = False,
+    output: Annotated[
+        OutputFormat,
+        typer.Option(
+            "--output",
+            "-o",
+            help="Output format: human-readable text, or one JSON event per line (ndjson)",
+        ),
+    ] = OutputFormat.TEXT,
+    timings: Annotated[
+        bool,
+        typer.Option(
+            "--timings",
+            help="Report wall and CPU time per stage, files per second, and the slowest prompts",
+        ),
+    ] = False,
+    slowest: Annotated[
+        int,
+        typer.Option(
+            "--slowest",
+            min=1,
+            help="Number of slowest prompts to list with --timings",
+        ),
+    ] = 5,
+    archive: Annotated[
+        Path | None,
+        typer.Option(
+            "--archive",
+            help=(
+                "Write all command files into one archive instead of the target directory "
+                "(.zip, .tar, .tar.gz, .tar.bz2, .tar.xz, or .tar.zst)"
+            ),
+        ),
+    ] = None,
+    link_mode: Annotated[
+        LinkModeOption,
+        typer.Option(
+            "--link-mode",
+            help=(
+                "Write regular files (copy), or store each unique file once and link "
+                "command files to it (symlink, hardlink)"
+            ),
+        ),
+    ] = LinkModeOption.COPY,
+    link_store: Annotated[
+        Path | None,
+        typer.Option(
+            "--link-store",
+            help=f"Shared store for --link-mode (default: <target-path>/{LINK_STORE_DIRNAME})",
+        ),
+    ] = None,
+    since: Annotated[
+        str | None,
+        typer.Option(
+            "--since",
+            help=(
+                "Only regenerate prompts added or changed since this git revision, and "
+                "remove the commands of deleted or renamed prompts"
+            ),
+        ),
+    ] = None,
 ) -> None:
     """Generate slash command files for AI code assistants."""
     # Handle --list-agents
@@ -125,29 +310,99 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
         table.add_column("Target Path", style="blue")
         table.add_column("Detected", justify="center")
 
-        # Get home directory for checking paths
-        home_dir = Path.home()
-
-        for agent_key in list_agent_keys():
-            try:
-                agent = get_agent_config(agent_key)
-                # Check if command directory exists
-                command_path = home_dir / agent.command_dir
-                exists = command_path.exists()
-                detected = "[green]✓[/green]" if exists else "[red]✗[/red]"
-
-                table.add_row(
-                    agent_key,
-                    agent.display_name,
-                    f"~/{agent.command_dir}",
-                    detected,
-                )
-            except KeyError:
-                table.add_row(agent_key, "Unknown", "N/A", "[red]✗[/red]")
+        # Resolve every agent's command directory under home in a single pass
+        for status in scan_agents(Path.home()):
+            agent = status.agent
+            detected = "[green]✓[/green]" if status.installed else "[red]✗[/red]"
+            table.add_row(
+                agent.key,
+                agent.display_name,
+                f"~/{agent.command_dir}",
+                detected,
+            )
 
         console.print(table)
         return
 
+    # --diff only previews changes
+    if diff:
+        dry_run = True
+
+    # NDJSON output is for tooling, so it never prompts and keeps stdout machine-readable
+    ndjson = output == OutputFormat.NDJSON
+    if ndjson and not yes and not dry_run:
+        print("Error: --output ndjson requires --yes (or --dry-run)", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+    if ndjson and targets_from is not None:
+        print("Error: --output ndjson cannot be combined with --targets-from", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+    if timings and targets_from is not None:
+        print("Error: --timings cannot be combined with --targets-from", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+    if targets_from is not None and (
+        diff or backup_store or keep_backups is not None or max_backup_bytes is not None
+    ):
+        print(
+            "Error: --targets-from cannot be combined with --diff, --backup-store, "
+            "--keep-backups, or --max-backup-bytes",
+            file=sys.stderr,
+        )
+        raise typer.Exit(code=2) from None  # Validation error
+    if since is not None and (targets_from is not None or archive is not None):
+        print("Error: --since cannot be combined with --targets-from or --archive", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+    layers = _resolve_prompt_layers(prompt_layers, bundled_layer)
+    if since is not None and layers:
+        print(
+            "Error: --since cannot be combined with --prompt-layer or --bundled-layer",
+            file=sys.stderr,
+        )
+        raise typer.Exit(code=2) from None  # Validation error
+    if since is not None and prompts_dir is not None and is_prompt_pack(prompts_dir):
+        print("Error: --since requires a prompts directory, not a prompt pack", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    # Archive mode writes one file and never touches the target directory
+    archive_output = None
+    if archive is not None:
+        if targets_from is not None or transactional or diff:
+            print(
+                "Error: --archive cannot be combined with --targets-from, --transactional, "
+                "or --diff",
+                file=sys.stderr,
+            )
+            raise typer.Exit(code=2) from None  # Validation error
+        try:
+            archive_output = ArchiveOutput(archive)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            raise typer.Exit(code=2) from None  # Validation error
+    linked = link_mode != LinkModeOption.COPY
+    if linked and (targets_from is not None or transactional or archive is not None):
+        print(
+            "Error: --link-mode cannot be combined with --targets-from, --transactional, "
+            "or --archive",
+            file=sys.stderr,
+        )
+        raise typer.Exit(code=2) from None  # Validation error
+    info_stream = sys.stderr if ndjson else sys.stdout
+
+    # Handle fleet mode (--targets-from)
+    if targets_from is not None:
+        _generate_for_fleet(
+            targets_from=targets_from,
+            prompts_dir=prompts_dir,
+            prompt_layers=layers,
+            agents=agents,
+            dry_run=dry_run,
+            yes=yes,
+            target_path=target_path,
+            detection_path=detection_path,
+            transactional=transactional,
+            jobs=jobs,
+        )
+        return
+
     # Detect agents if not specified
     if agents is None or len(agents) == 0:
         # Use detection_path if specified, otherwise target_path, otherwise home directory
@@ -175,7 +430,7 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
             raise typer.Exit(code=2) from None  # Validation error
 
         # Interactive selection: all detected agents pre-selected
-        if not yes:
+        if not yes and not ndjson:
             selected_agents = _prompt_agent_selection(detected)
             if not selected_agents:
                 print("Cancelled: No agents selected.", file=sys.stderr)
@@ -184,9 +439,9 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
         else:
             # If --yes is used, auto-select all detected agents
             agents = [agent.key for agent in detected]
-            print(f"Detected agents: {', '.join(agents)}")
+            print(f"Detected agents: {', '.join(agents)}", file=info_stream)
     else:
-        print(f"Selected agents: {', '.join(agents)}")
+        print(f"Selected agents: {', '.join(agents)}", file=info_stream)
 
     # Determine target path (default to home directory)
     actual_target_path = target_path if target_path is not None else Path.home()
@@ -197,8 +452,47 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
     is_explicit_prompts_dir = prompts_dir is not None
     actual_prompts_dir = prompts_dir if prompts_dir is not None else Path("prompts")
 
-    # Create writer
-    overwrite_action = "overwrite" if yes else None
+    # Use the content-addressed backup store when requested or when retention is set
+    store = None
+    if backup_store or keep_backups is not None or max_backup_bytes is not None:
+        store = BackupStore(
+            actual_target_path, keep_backups=keep_backups, max_bytes=max_backup_bytes
+        )
+
+    # Partial regeneration: only prompts changed since the git revision
+    since_prompts = None
+    stale_names: set[str] = set()
+    if since is not None:
+        try:
+            changes = prompt_changes_since(actual_prompts_dir, since)
+            since_prompts = [load_markdown_prompt(path) for path in changes.modified]
+            if changes.partials:
+                # Unchanged prompts that include a changed partial are regenerated too
+                since_prompts.extend(
+                    _prompts_including(actual_prompts_dir, changes.partials, changes.modified)
+                )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            raise typer.Exit(code=2) from None  # Validation error (bad revision or prompt)
+        except OSError as e:
+            print(f"Error: I/O error: {e}", file=sys.stderr)
+            raise typer.Exit(code=3) from None  # I/O error
+        # Outputs of a prompt that still exists under the same name are rewritten instead
+        stale_names = changes.previous_names - {
+            prompt.name for prompt in since_prompts if prompt.enabled
+        }
+        print(
+            f"Changed since {since}: {len(since_prompts)} prompt(s) to generate, "
+            f"{len(changes.deleted)} deleted",
+            file=info_stream,
+        )
+
+    store_for_links = None
+    if linked:
+        store_for_links = LinkStore(link_store or actual_target_path / LINK_STORE_DIRNAME)
+
+    # Create writer; with a backup store, --yes backs files up before overwriting them
+    overwrite_action = ("backup" if store is not None else "overwrite") if yes else None
     writer = SlashCommandWriter(
         prompts_dir=actual_prompts_dir,
         agents=agents,
@@ -206,11 +500,27 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
         base_path=actual_target_path,
         overwrite_action=overwrite_action,
         is_explicit_prompts_dir=is_explicit_prompts_dir,
+        transactional=transactional,
+        backup_store=store,
+        diff=diff,
+        archive=archive_output,
+        link_mode=link_mode.value,
+        link_store=store_for_links,
+        prompt_layers=layers,
     )
 
     # Generate commands
     try:
-        result = writer.generate()
+        # Decide every conflict upfront so the write phase never stops for input
+        if overwrite_action is None and not dry_run and archive_output is None:
+            _resolve_conflicts_upfront(writer, since_prompts)
+        # Interactive planning is excluded from the timings
+        with collect_timings() if timings else nullcontext() as collected:
+            if ndjson:
+                result = _emit_ndjson(writer.iter_events(since_prompts))
+            else:
+                result = writer.generate(since_prompts)
+            removed = writer.remove_outputs(stale_names)
     except ValueError as e:
         print(f"Error: {e}", file=sys.stderr)
         print("\nTo fix this:", file=sys.stderr)
@@ -258,7 +568,51 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
             raise typer.Exit(code=1) from None  # User cancellation
         raise
 
-    # Print summary
+    if ndjson:
+        _emit_ndjson({"event": "removed", **info} for info in removed)
+        if collected is not None:
+            _emit_ndjson([{"event": "timings", **collected.to_dict(slowest)}])
+        return
+
+    if diff:
+        _print_diff_summary(result)
+    else:
+        _print_generate_summary(result, dry_run)
+    if removed:
+        verb = "Would remove" if dry_run else "Removed"
+        print(f"\n{verb} {len(removed)} file(s) of deleted or renamed prompts:")
+        for info in removed:
+            print(f"  - {info['path']}")
+    if archive_output is not None and not dry_run:
+        print(f"\nArchive: {archive_output.path} ({archive_output.entries} file(s))")
+    if store_for_links is not None and not dry_run:
+        print(
+            f"\nLink store: {store_for_links.root} "
+            f"({store_for_links.objects_created} new object(s), "
+            f"{store_for_links.objects_removed} unused object(s) removed)"
+        )
+    if collected is not None:
+        _print_timings(collected, slowest)
+
+
+def _prompts_including(
+    prompts_dir: Path, partials: list[Path], exclude: list[Path]
+) -> list[MarkdownPrompt]:
+    """Load the prompts in ``prompts_dir`` that include any of ``partials``."""
+    changed = {partial.resolve() for partial in partials}
+    skipped = {path.resolve() for path in exclude}
+    prompts = []
+    for path in list_prompt_files(prompts_dir):
+        if path.resolve() in skipped:
+            continue
+        prompt = load_markdown_prompt(path)
+        if any(include.path.resolve() in changed for include in prompt.includes):
+            prompts.append(prompt)
+    return prompts
+
+
+def _print_generate_summary(result: dict[str, Any], dry_run: bool) -> None:
+    """Print the summary of a (dry) generation run."""
     mode = "DRY RUN" if dry_run else "Generation"
     print(f"\n{mode} complete:")
     print(f"  Prompts loaded: {result['prompts_loaded']}")
@@ -273,8 +627,174 @@ def generate(  # noqa: PLR0913 PLR0912 PLR0915
         print(f"    Agent: {file_info['agent_display_name']} ({file_info['agent']})")
 
 
+def _print_timings(timings: Timings, slowest: int) -> None:
+    """Print per-stage wall and CPU time, throughput, and the slowest prompts."""
+    table = Table(title=f"Timings ({timings.elapsed:.3f}s total)")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Wall (s)", justify="right")
+    table.add_column("CPU (s)", justify="right")
+    table.add_column("CPU %", justify="right")
+    table.add_column("Calls", justify="right")
+    # Known stages in pipeline order, then anything else that was timed
+    order = [name for name in TIMING_STAGES if name in timings.stages]
+    order += sorted(set(timings.stages) - set(order))
+    for name in order:
+        stage_timing = timings.stages[name]
+        cpu_share = stage_timing.cpu / stage_timing.wall * 100 if stage_timing.wall > 0 else 0.0
+        table.add_row(
+            name,
+            f"{stage_timing.wall:.4f}",
+            f"{stage_timing.cpu:.4f}",
+            f"{cpu_share:.0f}%",
+            str(stage_timing.calls),
+        )
+    console.print(table)
+    console.print(f"Files: {timings.files} ({timings.files_per_second:.1f} files/s)")
+
+    if timings.prompts:
+        slow_table = Table(title=f"Slowest {slowest} prompt(s)")
+        slow_table.add_column("Prompt", style="cyan")
+        slow_table.add_column("Wall (s)", justify="right")
+        for name, seconds in timings.slowest_prompts(slowest):
+            slow_table.add_row(name, f"{seconds:.4f}")
+        console.print(slow_table)
+
+
+def _resolve_conflicts_upfront(
+    writer: SlashCommandWriter, prompts: list[MarkdownPrompt] | None = None
+) -> None:
+    """Show existing-file conflicts in one table and ask for one policy per category."""
+    plan = writer.plan(prompts)
+    grouped = plan.by_category()
+    if not grouped:
+        return
+
+    table = Table(title=f"{len(plan.conflicts)} existing file(s) would be replaced")
+    table.add_column("Category", style="cyan")
+    table.add_column("Files", justify="right")
+    table.add_column("Examples")
+    for category, conflicts in grouped.items():
+        examples = ", ".join(conflict.path.name for conflict in conflicts[:3])
+        if len(conflicts) > 3:
+            examples += ", ..."
+        table.add_row(CONFLICT_CATEGORY_LABELS[category], str(len(conflicts)), examples)
+    console.print(table)
+
+    writer.resolve_conflicts(plan)
+
+
+def _print_diff_summary(result: dict[str, Any]) -> None:
+    """Print unified diffs for changed files followed by change counts."""
+    for file_info in result["files"]:
+        if file_info["status"] == "created":
+            print(f"new file: {file_info['path']}")
+        elif file_info["status"] == "modified":
+            sys.stdout.write(file_info["diff"])
+
+    changes = result["changes"]
+    print("\nDiff summary:")
+    print(f"  Prompts loaded: {result['prompts_loaded']}")
+    print(f"  Created: {changes['created']}")
+    print(f"  Modified: {changes['modified']}")
+    print(f"  Unchanged: {changes['unchanged']}")
+
+
+def _generate_for_fleet(  # noqa: PLR0913 PLR0915
+    targets_from: str,
+    prompts_dir: Path | None,
+    prompt_layers: list[Path],
+    agents: list[str] | None,
+    dry_run: bool,
+    yes: bool,
+    target_path: Path | None,
+    detection_path: Path | None,
+    transactional: bool,
+    jobs: int | None,
+) -> None:
+    """Generate commands for every target root listed by ``--targets-from``."""
+    if target_path is not None or detection_path is not None:
+        print(
+            "Error: --targets-from cannot be combined with --target-path or --detection-path",
+            file=sys.stderr,
+        )
+        raise typer.Exit(code=2) from None  # Validation error
+
+    if not yes and not dry_run:
+        print("Error: --targets-from requires --yes (fleet mode never prompts)", file=sys.stderr)
+        print("\nTo fix this:", file=sys.stderr)
+        print("  - Re-run with --yes to overwrite existing files", file=sys.stderr)
+        print("  - Or use --dry-run to preview the fleet run", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    invalid_keys = [key for key in agents or [] if key not in list_agent_keys()]
+    if invalid_keys:
+        print(f"Error: Invalid agent key: {', '.join(invalid_keys)}", file=sys.stderr)
+        print(f"  - Valid agent keys: {', '.join(list_agent_keys())}", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    try:
+        targets = read_targets(targets_from)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+    except OSError as e:
+        print(f"Error: I/O error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+
+    # Parse prompts once and share them across every target
+    is_explicit_prompts_dir = prompts_dir is not None
+    loader = SlashCommandWriter(
+        prompts_dir=prompts_dir if prompts_dir is not None else Path("prompts"),
+        agents=[],
+        is_explicit_prompts_dir=is_explicit_prompts_dir,
+        prompt_layers=prompt_layers,
+    )
+    try:
+        prompts = loader._load_prompts()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+
+    results = generate_fleet(
+        prompts=prompts,
+        targets=targets,
+        agents=agents or None,
+        dry_run=dry_run,
+        overwrite_action="overwrite",
+        transactional=transactional,
+        max_workers=jobs,
+    )
+
+    table = Table(title=f"Fleet {'dry run' if dry_run else 'generation'}: {len(results)} target(s)")
+    table.add_column("Target", style="cyan", no_wrap=False)
+    table.add_column("Agents", style="magenta")
+    table.add_column("Files", justify="right")
+    table.add_column("Status", justify="center")
+    for result in results:
+        if result.error is not None:
+            status = f"[red]error[/red] {result.error}"
+        elif result.skipped:
+            status = "[yellow]no agents detected[/yellow]"
+        else:
+            status = "[green]ok[/green]"
+        file_count = len(result.files) if dry_run else result.files_written
+        table.add_row(str(result.target), ", ".join(result.agents), str(file_count), status)
+    console.print(table)
+
+    failed = [result for result in results if not result.ok]
+    skipped = [result for result in results if result.skipped]
+    succeeded = len(results) - len(failed) - len(skipped)
+    print(f"\nFleet {'DRY RUN' if dry_run else 'generation'} complete:")
+    print(f"  Prompts loaded: {len(prompts)}")
+    print(f"  Targets succeeded: {succeeded}")
+    print(f"  Targets skipped: {len(skipped)}")
+    print(f"  Targets failed: {len(failed)}")
+    if failed:
+        raise typer.Exit(code=3) from None  # I/O error in at least one target
+
+
 @app.command()
-def cleanup(
+def cleanup(  # noqa: PLR0912 PLR0913 PLR0915
     agents: Annotated[
         list[str] | None,
         typer.Option(
@@ -316,6 +836,21 @@ def cleanup(
             help="Include backup files in cleanup (default: True)",
         ),
     ] = True,
+    output: Annotated[
+        OutputFormat,
+        typer.Option(
+            "--output",
+            "-o",
+            help="Output format: human-readable text, or one JSON event per line (ndjson)",
+        ),
+    ] = OutputFormat.TEXT,
+    timings: Annotated[
+        bool,
+        typer.Option(
+            "--timings",
+            help="Report wall and CPU time per stage and files per second",
+        ),
+    ] = False,
 ) -> None:
     """Clean up generated slash command files."""
     # Determine target path (default to home directory)
@@ -329,6 +864,21 @@ def cleanup(
         base_path=actual_target_path,
     )
 
+    # Stream one event per file without building the file table or prompting
+    if output == OutputFormat.NDJSON:
+        if not yes and not dry_run:
+            print("Error: --output ndjson requires --yes (or --dry-run)", file=sys.stderr)
+            raise typer.Exit(code=2) from None  # Validation error
+        with collect_timings() if timings else nullcontext() as collected:
+            summary = _emit_ndjson(
+                writer.iter_cleanup(agents=agents, include_backups=include_backups, dry_run=dry_run)
+            )
+        if collected is not None:
+            _emit_ndjson([{"event": "timings", **collected.to_dict()}])
+        if summary.get("errors"):
+            raise typer.Exit(code=3) from None  # I/O error deleting at least one file
+        return
+
     # Find files
     found_files = writer.find_generated_files(agents=agents, include_backups=include_backups)
 
@@ -384,7 +934,8 @@ def cleanup(
 
     # Perform cleanup
     try:
-        result = writer.cleanup(agents=agents, include_backups=include_backups, dry_run=dry_run)
+        with collect_timings() if timings else nullcontext() as collected:
+            result = writer.cleanup(agents=agents, include_backups=include_backups, dry_run=dry_run)
     except Exception as e:
         console.print(f"[bold red]Error during cleanup: {e}[/bold red]")
         raise typer.Exit(code=3) from None
@@ -408,6 +959,370 @@ def cleanup(
             border_style="green" if not result.get("errors") else "red",
         )
     )
+    if collected is not None:
+        _print_timings(collected, slowest=5)
+
+
+@app.command()
+def status(  # noqa: PLR0913
+    prompts_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--prompts-dir",
+            "-p",
+            help="Directory or .zip prompt pack containing prompt files",
+        ),
+    ] = None,
+    prompt_layers: Annotated[
+        list[Path] | None,
+        typer.Option(
+            "--prompt-layer",
+            help=(
+                "Lower-precedence prompts directory beneath --prompts-dir "
+                "(can be specified multiple times, lowest first)"
+            ),
+        ),
+    ] = None,
+    bundled_layer: Annotated[
+        bool,
+        typer.Option(
+            "--bundled-layer",
+            help="Use the bundled prompts as the lowest prompt layer",
+        ),
+    ] = False,
+    agents: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--agents",
+            "-a",
+            help=(
+                "Agent keys to check (can be specified multiple times). "
+                "If not specified, checks all agents."
+            ),
+        ),
+    ] = None,
+    target_path: Annotated[
+        Path | None,
+        typer.Option(
+            "--target-path",
+            "-t",
+            help="Target directory to check (defaults to home directory)",
+        ),
+    ] = None,
+    targets_from: Annotated[
+        str | None,
+        typer.Option(
+            "--targets-from",
+            help="File listing target directories (one per line) or a glob of directories",
+        ),
+    ] = None,
+    jobs: Annotated[
+        int | None,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Worker threads used to sniff and hash files",
+        ),
+    ] = None,
+    output: Annotated[
+        OutputFormat,
+        typer.Option(
+            "--output",
+            "-o",
+            help="Output format: human-readable text, or one JSON event per line (ndjson)",
+        ),
+    ] = OutputFormat.TEXT,
+) -> None:
+    """Report generated files that are stale, modified or orphaned."""
+    if targets_from is not None and target_path is not None:
+        print("Error: --targets-from cannot be combined with --target-path", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    invalid_keys = [key for key in agents or [] if key not in list_agent_keys()]
+    if invalid_keys:
+        print(f"Error: Invalid agent key: {', '.join(invalid_keys)}", file=sys.stderr)
+        print(f"  - Valid agent keys: {', '.join(list_agent_keys())}", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    if targets_from is not None:
+        try:
+            targets = read_targets(targets_from)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            raise typer.Exit(code=2) from None  # Validation error
+        except OSError as e:
+            print(f"Error: I/O error: {e}", file=sys.stderr)
+            raise typer.Exit(code=3) from None  # I/O error
+    else:
+        targets = [target_path if target_path is not None else Path.home()]
+
+    layers = _resolve_prompt_layers(prompt_layers, bundled_layer)
+    writers = [
+        SlashCommandWriter(
+            prompts_dir=prompts_dir if prompts_dir is not None else Path("prompts"),
+            agents=agents or None,
+            base_path=target,
+            is_explicit_prompts_dir=prompts_dir is not None,
+            prompt_layers=layers,
+        )
+        for target in targets
+    ]
+    # Every target is checked against the same prompts, parsed once
+    try:
+        prompts = writers[0]._load_prompts()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+    reports = [collect_status(writer, prompts, max_workers=jobs) for writer in writers]
+
+    totals = dict.fromkeys(FILE_STATES, 0)
+    for report in reports:
+        for state, count in report.counts().items():
+            totals[state] += count
+
+    if output == OutputFormat.NDJSON:
+        _emit_ndjson([
+            *(
+                {
+                    "event": "file",
+                    "target": str(report.target),
+                    "path": str(file_status.path),
+                    "agent": file_status.agent,
+                    "state": file_status.state,
+                    "reason": file_status.reason,
+                    "source_prompt": file_status.source_prompt,
+                }
+                for report in reports
+                for file_status in report.files
+            ),
+            {"event": "summary", "targets": len(reports), **totals},
+        ])
+        return
+
+    drifted = [
+        file_status
+        for report in reports
+        for file_status in report.files
+        if file_status.state != "up-to-date"
+    ]
+    if drifted:
+        state_styles = {"stale": "yellow", "modified": "magenta", "orphaned": "red"}
+        table = Table(title=f"{len(drifted)} generated file(s) out of date")
+        table.add_column("File Path", style="cyan", no_wrap=False)
+        table.add_column("Agent", style="magenta")
+        table.add_column("State", justify="center")
+        table.add_column("Reason")
+        for file_status in drifted:
+            style = state_styles[file_status.state]
+            table.add_row(
+                str(file_status.path),
+                file_status.agent,
+                f"[{style}]{file_status.state}[/{style}]",
+                file_status.reason,
+            )
+        console.print(table)
+
+    counts = ", ".join(f"{totals[state]} {state}" for state in FILE_STATES)
+    scope = f" across {len(reports)} target(s)" if targets_from is not None else ""
+    print(f"Checked {sum(totals.values())} generated file(s){scope}: {counts}")
+
+
+@app.command()
+def restore(
+    file_path: Annotated[
+        Path | None,
+        typer.Argument(help="Command file to restore (omit with --list to show all backups)"),
+    ] = None,
+    timestamp: Annotated[
+        str | None,
+        typer.Option(
+            "--timestamp",
+            help="Restore the newest backup taken at or before YYYYMMDD-HHMMSS (or a prefix)",
+        ),
+    ] = None,
+    target_path: Annotated[
+        Path | None,
+        typer.Option(
+            "--target-path",
+            "-t",
+            help="Target directory that owns the backup store (defaults to home directory)",
+        ),
+    ] = None,
+    list_backups: Annotated[
+        bool,
+        typer.Option(
+            "--list",
+            help="List recorded backups instead of restoring",
+        ),
+    ] = False,
+) -> None:
+    """Restore a command file from the content-addressed backup store."""
+    actual_target_path = target_path if target_path is not None else Path.home()
+    store = BackupStore(actual_target_path)
+
+    if list_backups:
+        entries = store.entries() if file_path is None else store.entries_for(file_path)
+        if not entries:
+            console.print("[green]No backups found.[/green]")
+            return
+        table = Table(title=f"Backups in {store.root}")
+        table.add_column("Timestamp", style="cyan", no_wrap=True)
+        table.add_column("File", style="magenta")
+        table.add_column("Size", justify="right")
+        table.add_column("SHA-256", style="yellow")
+        for entry in entries:
+            table.add_row(entry.timestamp, entry.path, str(entry.size), entry.sha256[:12])
+        console.print(table)
+        return
+
+    if file_path is None:
+        print("Error: Specify a file to restore, or use --list", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    try:
+        entry = store.restore(file_path, timestamp)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+    except OSError as e:
+        print(f"Error: I/O error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+
+    print(f"Restored {file_path} from backup taken at {entry.timestamp}")
+
+
+@app.command()
+def watch(
+    prompts_dir: Annotated[
+        Path,
+        typer.Option(
+            "--prompts-dir",
+            "-p",
+            help="Directory containing prompt files to watch",
+        ),
+    ] = Path("prompts"),
+    agents: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--agents",
+            "-a",
+            help="Agent keys to generate commands for (defaults to detected agents)",
+        ),
+    ] = None,
+    target_path: Annotated[
+        Path | None,
+        typer.Option(
+            "--target-path",
+            "-t",
+            help="Target directory for output paths (defaults to home directory)",
+        ),
+    ] = None,
+    interval: Annotated[
+        float,
+        typer.Option(
+            "--interval",
+            min=0.05,
+            help="Seconds between checks of the prompts directory",
+        ),
+    ] = 0.5,
+    debounce: Annotated[
+        float,
+        typer.Option(
+            "--debounce",
+            min=0.0,
+            help="Seconds to wait after the last edit before regenerating",
+        ),
+    ] = 0.3,
+) -> None:
+    """Watch prompts and regenerate only the affected command files on change."""
+    if not prompts_dir.is_dir():
+        print(f"Error: Prompts directory does not exist: {prompts_dir}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+
+    actual_target_path = target_path if target_path is not None else Path.home()
+
+    if not agents:
+        agents = [agent.key for agent in detect_agents(actual_target_path)]
+        if not agents:
+            print("Error: No agents detected.", file=sys.stderr)
+            print(f"Detection path: {actual_target_path}", file=sys.stderr)
+            print("  - Use --agents to specify agents manually", file=sys.stderr)
+            raise typer.Exit(code=2) from None  # Validation error
+
+    invalid_keys = [key for key in agents if key not in list_agent_keys()]
+    if invalid_keys:
+        print(f"Error: Invalid agent key: {', '.join(invalid_keys)}", file=sys.stderr)
+        print(f"  - Valid agent keys: {', '.join(list_agent_keys())}", file=sys.stderr)
+        raise typer.Exit(code=2) from None  # Validation error
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=agents,
+        base_path=actual_target_path,
+        overwrite_action="overwrite",  # Watch mode never prompts
+    )
+    watcher = PromptWatcher(writer, poll_interval=interval, debounce=debounce)
+
+    try:
+        result = watcher.initialize()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error
+
+    print(f"Watching {prompts_dir} for agents: {', '.join(agents)}")
+    print(f"  Initial generation: {result['files_written']} file(s) written")
+    print("Press Ctrl+C to stop.")
+
+    def report(changes: WatchChanges, summary: dict[str, list[str]]) -> None:
+        for path in summary["written"]:
+            print(f"  updated {path}")
+        for path in summary["removed"]:
+            print(f"  removed {path}")
+        for error in summary["errors"]:
+            print(f"  error   {error}", file=sys.stderr)
+
+    try:
+        watcher.run(on_apply=report)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+@app.command()
+def daemon(
+    socket_path: Annotated[
+        Path | None,
+        typer.Option(
+            "--socket",
+            help="Unix socket to listen on (defaults to $SDD_DAEMON_SOCKET or a per-user path)",
+        ),
+    ] = None,
+    idle_timeout: Annotated[
+        float,
+        typer.Option(
+            "--idle-timeout",
+            min=0.1,
+            help="Exit after this many seconds without a request",
+        ),
+    ] = DEFAULT_IDLE_TIMEOUT,
+) -> None:
+    """Serve non-interactive generate and cleanup runs for sdd-generate-commands-client."""
+    actual_socket_path = socket_path if socket_path is not None else default_socket_path()
+    server = GeneratorDaemon(
+        typer.main.get_command(app), actual_socket_path, idle_timeout=idle_timeout
+    )
+    print(f"Listening on {actual_socket_path}")
+    try:
+        server.serve()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        raise typer.Exit(code=1) from None
+    except OSError as e:
+        print(f"Error: I/O error: {e}", file=sys.stderr)
+        raise typer.Exit(code=3) from None  # I/O error (cannot bind the socket)
+    except KeyboardInterrupt:
+        print("\nStopped daemon.")
+    print(f"Stopped after {server.requests} request(s).")
 
 
 def main() -> None:
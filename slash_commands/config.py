@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import re
 from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 from enum import Enum
+from pathlib import PurePath
 
 
 class CommandFormat(str, Enum):
@@ -25,6 +27,13 @@ class AgentConfig:
     command_file_extension: str
     detection_dirs: tuple[str, ...]
 
+    def command_filename(self, prompt_name: str) -> str:
+        """Return the command file name for a prompt, relative to ``command_dir``."""
+        # Sanitize file stem: drop any path components and restrict to safe chars
+        safe_stem = PurePath(prompt_name).name  # remove any directories
+        safe_stem = re.sub(r"[^A-Za-z0-9._-]+", "-", safe_stem).strip("-_.") or "command"
+        return f"{safe_stem}{self.command_file_extension}"
+
     def iter_detection_dirs(self) -> Iterable[str]:
         """Return an iterator over configured detection directories."""
 
@@ -0,0 +1,163 @@
+"""Long-lived generator daemon that serves CLI invocations over a Unix socket.
+
+The daemon keeps the CLI stack imported and parsed prompts cached between
+requests. Requests run one at a time in the daemon process, with the client's
+working directory, forwarded environment and captured output.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import socket
+import socketserver
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any
+
+import click
+
+from slash_commands.daemon_client import FORWARDED_ENV, read_message, send_message
+from slash_commands.prompt_cache import PromptCache, use_prompt_cache
+
+DEFAULT_IDLE_TIMEOUT = 900.0  # Seconds without requests before the daemon exits
+
+
+@contextmanager
+def _request_environment(cwd: str, env: dict[str, str]) -> Iterator[None]:
+    """Run the block in the client's working directory and forwarded environment."""
+    previous_cwd = os.getcwd()
+    previous_env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+    os.chdir(cwd)
+    try:
+        for name in FORWARDED_ENV:
+            if name in env:
+                os.environ[name] = env[name]
+            else:
+                os.environ.pop(name, None)
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _invoke(command: click.Command, argv: list[str]) -> int:
+    """Run ``command`` with ``argv`` and return its exit code."""
+    try:
+        result = command.main(args=argv, prog_name="sdd-generate-commands", standalone_mode=False)
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.exceptions.Abort:
+        print("Aborted!", file=sys.stderr)
+        return 1
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    # Without standalone mode, typer.Exit comes back as its exit code
+    return result if isinstance(result, int) else 0
+
+
+class GeneratorDaemon:
+    """Serves CLI requests from :mod:`slash_commands.daemon_client`."""
+
+    def __init__(
+        self,
+        command: click.Command,
+        socket_path: Path,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ):
+        """Initialize the daemon.
+
+        Args:
+            command: The click command for the CLI
+            socket_path: Unix socket to listen on
+            idle_timeout: Seconds without requests before :meth:`serve` returns
+        """
+        self.command = command
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.prompt_cache = PromptCache()
+        self.requests = 0
+
+    def run(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Run one request and return its exit code and captured output."""
+        argv = [str(arg) for arg in request.get("argv", [])]
+        stdout, stderr = io.StringIO(), io.StringIO()
+        self.requests += 1
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                with (
+                    _request_environment(request.get("cwd", os.getcwd()), request.get("env", {})),
+                    use_prompt_cache(self.prompt_cache),
+                ):
+                    exit_code = _invoke(self.command, argv)
+            except OSError as e:
+                print(f"Error: I/O error: {e}", file=sys.stderr)
+                exit_code = 3
+        return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def serve(self) -> None:
+        """Serve requests until no request arrives for ``idle_timeout`` seconds.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket
+        """
+        self._remove_stale_socket()
+        # A new socket directory is private, as is the default one in the temp directory
+        self.socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Only the owner may connect: requests run with the daemon's permissions
+        previous_umask = os.umask(0o077)
+        try:
+            server = _Server(str(self.socket_path), _Handler)
+        finally:
+            os.umask(previous_umask)
+
+        server.generator_daemon = self
+        server.timeout = self.idle_timeout
+        try:
+            while not server.idle:
+                server.handle_request()
+        finally:
+            server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def _remove_stale_socket(self) -> None:
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink(missing_ok=True)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+
+class _Server(socketserver.UnixStreamServer):
+    generator_daemon: GeneratorDaemon
+    idle = False
+
+    def handle_timeout(self) -> None:
+        self.idle = True
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        try:
+            request = read_message(self.request)
+        except (ConnectionError, ValueError):
+            response = {"exit_code": 2, "stdout": "", "stderr": "Error: invalid daemon request\n"}
+        else:
+            response = self.server.generator_daemon.run(request)
+        send_message(self.request, response)
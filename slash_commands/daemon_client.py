@@ -0,0 +1,222 @@
+"""Thin client that forwards CLI invocations to the generator daemon.
+
+This module only imports the standard library, so forwarding a command costs
+little more than starting the interpreter. Invocations the daemon cannot serve
+(interactive runs, ``watch``, ``restore``) and hosts without Unix sockets run
+the CLI in this process instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+SOCKET_ENV_VAR = "SDD_DAEMON_SOCKET"
+
+# Environment that affects command output and is applied per request by the daemon
+FORWARDED_ENV = ("HOME", "XDG_STATE_HOME", "SOURCE_DATE_EPOCH", "COLUMNS", "NO_COLOR")
+
+# Subcommands the daemon serves, and flags that make them non-interactive
+DAEMON_COMMANDS = ("generate", "cleanup")
+NON_INTERACTIVE_FLAGS = ("--yes", "-y", "--list-agents", "--help")
+
+# Preview flags of generate, which never prompt once the agents are given
+PREVIEW_FLAGS = ("--dry-run", "--diff")
+AGENT_FLAGS = ("--agents", "-a")
+
+START_TIMEOUT = 10.0  # Seconds to wait for a daemon started on demand
+
+
+def default_socket_path() -> Path:
+    """Return the daemon socket path: ``$SDD_DAEMON_SOCKET``, else a per-user default.
+
+    Without ``$XDG_RUNTIME_DIR`` the socket lives in a private (0700) directory
+    in the temp directory, which the daemon creates.
+    """
+    configured = os.environ.get(SOCKET_ENV_VAR)
+    if configured:
+        return Path(configured)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "sdd-generate-commands.sock"
+    return Path(tempfile.gettempdir()) / f"sdd-generate-commands-{os.getuid()}" / "daemon.sock"
+
+
+def daemon_eligible(argv: list[str]) -> bool:
+    """Return True if the daemon can run ``argv`` without prompting for input."""
+    if not hasattr(socket, "AF_UNIX") or not argv or argv[0] not in DAEMON_COMMANDS:
+        return False
+    args = argv[1:]
+    if any(arg in NON_INTERACTIVE_FLAGS for arg in args):
+        return True
+    # cleanup --dry-run still asks for confirmation, and generate --dry-run
+    # asks which detected agents to use
+    return (
+        argv[0] == "generate"
+        and any(arg in PREVIEW_FLAGS for arg in args)
+        and any(arg in AGENT_FLAGS or arg.startswith("--agents=") for arg in args)
+    )
+
+
+def send_message(sock: socket.socket, message: dict[str, Any]) -> None:
+    """Send one newline-delimited JSON message."""
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def read_message(sock: socket.socket) -> dict[str, Any]:
+    """Read one newline-delimited JSON message.
+
+    Raises:
+        ConnectionError: If the peer closed the connection before a full message
+    """
+    with sock.makefile("rb") as stream:
+        line = stream.readline()
+    if not line.endswith(b"\n"):
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+
+def build_request(argv: list[str]) -> dict[str, Any]:
+    """Return the request that runs ``argv`` as if invoked from this process."""
+    return {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+    }
+
+
+def _peer_is_user(sock: socket.socket, socket_path: Path) -> bool:
+    """Return True if the process listening behind ``sock`` runs as this user."""
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _pid, uid, _gid = struct.unpack("3i", credentials)
+        return uid == os.getuid()
+    # Without peer credentials, trust the owner of the socket file
+    try:
+        return socket_path.lstat().st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def _connect(socket_path: Path) -> socket.socket:
+    """Connect to ``socket_path``.
+
+    Raises:
+        PermissionError: If the socket belongs to another user, who would
+            receive the forwarded arguments and environment
+        OSError: If nothing listens on the socket
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+        if not _peer_is_user(sock, socket_path):
+            raise PermissionError(f"{socket_path} is served by another user")
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def start_daemon(socket_path: Path) -> None:
+    """Start a detached daemon listening on ``socket_path``."""
+    subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "slash_commands.cli",
+            "daemon",
+            "--socket",
+            str(socket_path),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def connect(socket_path: Path, start: bool = True) -> socket.socket | None:
+    """Connect to the daemon, starting it on demand.
+
+    Returns:
+        A connected socket, or None if no daemon of this user could be reached
+    """
+    try:
+        return _connect(socket_path)
+    except PermissionError:
+        return None  # Another user's socket; starting a daemon would not replace it
+    except OSError:
+        if not start:
+            return None
+
+    start_daemon(socket_path)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        try:
+            return _connect(socket_path)
+        except PermissionError:
+            return None
+        except OSError:
+            continue
+    return None
+
+
+def forward(argv: list[str], socket_path: Path | None = None) -> dict[str, Any] | None:
+    """Run ``argv`` on the daemon.
+
+    Returns:
+        The daemon's ``exit_code``, ``stdout`` and ``stderr``, or None if the
+        request never reached the daemon, so running ``argv`` locally is safe
+
+    Raises:
+        ConnectionError: If the daemon received the request but no response
+            arrived; it may already have run the command
+    """
+    sock = connect(socket_path or default_socket_path())
+    if sock is None:
+        return None
+    with sock:
+        try:
+            # The daemon ignores a request cut short before its final newline
+            send_message(sock, build_request(argv))
+        except OSError:
+            return None
+        try:
+            return read_message(sock)
+        except (OSError, ValueError) as e:
+            raise ConnectionError(f"No response from the daemon: {e}") from e
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for ``sdd-generate-commands-client``."""
+    argv = sys.argv[1:] if argv is None else argv
+    if daemon_eligible(argv):
+        try:
+            response = forward(argv)
+        except ConnectionError as e:
+            # Running locally as well could apply the command twice
+            print(f"Error: I/O error: {e}", file=sys.stderr)
+            raise SystemExit(3) from None
+        if response is not None:
+            sys.stdout.write(response["stdout"])
+            sys.stderr.write(response["stderr"])
+            raise SystemExit(response["exit_code"])
+
+    # Run the CLI in this process
+    from slash_commands.cli import main as cli_main  # noqa: PLC0415 - slow import, only here
+
+    sys.argv = ["sdd-generate-commands", *argv]
+    cli_main()
+
+
+if __name__ == "__main__":
+    main()
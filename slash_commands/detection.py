@@ -2,33 +2,113 @@
 
 from __future__ import annotations
 
+import os
 from collections.abc import Iterable, Sequence
-from pathlib import Path
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
 
 from .config import SUPPORTED_AGENTS, AgentConfig
 
 
-def detect_agents(target_dir: Path | str) -> list[AgentConfig]:
-    """Return agents whose detection directories exist under ``target_dir``.
+@dataclass(frozen=True)
+class AgentDetection:
+    """Detection result for a single agent under a base directory."""
 
-    The result preserves the ordering defined in :data:`SUPPORTED_AGENTS` to
-    ensure deterministic CLI output regardless of filesystem discovery order.
+    agent: AgentConfig
+    detected: bool  # Any of the agent's detection directories exists
+    installed: bool  # The agent's command directory exists
+
+
+@dataclass(frozen=True)
+class DetectionPlan:
+    """Deduplicated set of relative paths that must be resolved for detection.
+
+    ``paths`` is ordered parent-first so that a missing directory can settle
+    every path nested beneath it without touching the filesystem again.
+    """
+
+    agents: tuple[AgentConfig, ...]
+    paths: tuple[PurePosixPath, ...]
+
+
+@lru_cache(maxsize=8)
+def compile_detection_plan(agents: tuple[AgentConfig, ...] = SUPPORTED_AGENTS) -> DetectionPlan:
+    """Compile the detection and command directories of ``agents`` into one plan.
+
+    Overlapping entries (``.codeium`` and ``.codeium/windsurf``, or a command
+    directory nested in a detection directory) are merged by prefix: each
+    ancestor is added once and resolved before its descendants.
     """
+    paths: set[PurePosixPath] = set()
+    for agent in agents:
+        for directory in (*agent.iter_detection_dirs(), agent.command_dir):
+            relative = PurePosixPath(directory)
+            # Include every ancestor so a missing prefix short-circuits its children
+            paths.update(relative.parents[index] for index in range(len(relative.parts) - 1))
+            paths.add(relative)
+
+    ordered = tuple(sorted(paths, key=lambda path: (len(path.parts), path.as_posix())))
+    return DetectionPlan(agents=agents, paths=ordered)
+
 
-    base_path = Path(target_dir)
-    detected: list[AgentConfig] = []
+def _resolve_plan(plan: DetectionPlan, base_path: Path) -> dict[PurePosixPath, bool]:
+    """Return whether each path in ``plan`` exists under ``base_path``.
 
-    for agent in SUPPORTED_AGENTS:
-        if _agent_configured(agent, base_path):
-            detected.append(agent)
+    Top-level entries come from a single ``os.scandir`` of ``base_path``;
+    nested paths are only looked up when their parent exists.
+    """
+    try:
+        with os.scandir(base_path) as entries:
+            top_level = {
+                entry.name
+                for entry in entries
+                # Match Path.exists(): dangling symlinks do not count
+                if not entry.is_symlink() or os.path.exists(entry.path)
+            }
+    except OSError:
+        top_level = set()
+
+    existing: dict[PurePosixPath, bool] = {}
+    for relative in plan.paths:
+        if len(relative.parts) == 1:
+            existing[relative] = relative.name in top_level
+        else:
+            existing[relative] = existing[relative.parent] and (base_path / relative).exists()
+    return existing
+
+
+def scan_agents(
+    target_dir: Path | str, agents: Sequence[AgentConfig] = SUPPORTED_AGENTS
+) -> list[AgentDetection]:
+    """Return detection and installed state for ``agents`` under ``target_dir``.
+
+    All agents are resolved together from one compiled plan, so shared or
+    nested directories are only checked once.
+    """
+    plan = compile_detection_plan(tuple(agents))
+    existing = _resolve_plan(plan, Path(target_dir))
 
-    return detected
+    return [
+        AgentDetection(
+            agent=agent,
+            detected=any(
+                existing[PurePosixPath(directory)] for directory in agent.iter_detection_dirs()
+            ),
+            installed=existing[PurePosixPath(agent.command_dir)],
+        )
+        for agent in plan.agents
+    ]
 
 
-def _agent_configured(agent: AgentConfig, base_path: Path) -> bool:
-    """Return ``True`` if any of the agent's detection directories exist."""
+def detect_agents(target_dir: Path | str) -> list[AgentConfig]:
+    """Return agents whose detection directories exist under ``target_dir``.
+
+    The result preserves the ordering defined in :data:`SUPPORTED_AGENTS` to
+    ensure deterministic CLI output regardless of filesystem discovery order.
+    """
 
-    return any((base_path / Path(directory)).exists() for directory in agent.iter_detection_dirs())
+    return [status.agent for status in scan_agents(target_dir) if status.detected]
 
 
 def iter_detection_directories(agent: AgentConfig, base_path: Path | str) -> Iterable[Path]:
@@ -45,4 +125,12 @@ def supported_agents() -> Sequence[AgentConfig]:
     return SUPPORTED_AGENTS
 
 
-__all__ = ["detect_agents", "iter_detection_directories", "supported_agents"]
+__all__ = [
+    "AgentDetection",
+    "DetectionPlan",
+    "compile_detection_plan",
+    "detect_agents",
+    "iter_detection_directories",
+    "scan_agents",
+    "supported_agents",
+]
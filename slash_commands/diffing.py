@@ -0,0 +1,92 @@
+"""Change detection between rendered command content and files on disk."""
+
+from __future__ import annotations
+
+import difflib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+ChangeStatus = Literal["created", "modified", "unchanged"]
+
+# Generated metadata that changes on every render and must not count as a change
+_VOLATILE_FIELDS = re.compile(rb"^([ \t]*updated_at[ \t]*[:=]).*$", re.MULTILINE)
+
+# End of YAML frontmatter, and TOML table headers
+_FRONTMATTER_END = re.compile(rb"^---[ \t]*\r?$", re.MULTILINE)
+_TOML_TABLE = re.compile(rb"^\[", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """How rendered content differs from the file currently on disk."""
+
+    status: ChangeStatus
+    diff: str | None = None  # Unified diff, only for modified files
+
+
+def _metadata_span(data: bytes) -> tuple[int, int]:
+    """Return the byte range of the generated metadata: YAML frontmatter or TOML ``[meta]``."""
+    if data.startswith(b"---"):
+        first_line_end = data.find(b"\n")
+        end = _FRONTMATTER_END.search(data, first_line_end + 1) if first_line_end != -1 else None
+        return (first_line_end + 1, end.start()) if end else (0, 0)
+    # tomli_w writes tables after the top-level keys, so the real [meta] table
+    # is the last one even if the prompt text contains such a line
+    table = data.rfind(b"\n[meta]")
+    if table == -1:
+        return 0, 0
+    start = table + 1
+    following = _TOML_TABLE.search(data, start + len(b"[meta]"))
+    return start, following.start() if following else len(data)
+
+
+def _stable_bytes(data: bytes) -> bytes:
+    """Mask volatile generated fields so identical renders compare equal.
+
+    Only the metadata is masked, so body lines that look like these fields
+    still count as changes.
+    """
+    start, end = _metadata_span(data)
+    if start == end:
+        return data
+    return data[:start] + _VOLATILE_FIELDS.sub(rb"\1", data[start:end]) + data[end:]
+
+
+def classify_change(path: Path, content: str, include_diff: bool = True) -> FileChange:
+    """Compare rendered ``content`` with the existing file at ``path``.
+
+    Files are compared by size and then byte by byte; a text diff is only
+    computed for files that really changed.
+
+    Args:
+        path: Output path of the command file
+        content: Newly rendered content
+        include_diff: If True, attach a unified diff for modified files
+
+    Returns:
+        The change classification
+    """
+    try:
+        existing = path.read_bytes()
+    except FileNotFoundError:
+        return FileChange(status="created")
+
+    old = _stable_bytes(existing)
+    new = _stable_bytes(content.encode("utf-8"))
+    if old == new:  # Compares lengths first
+        return FileChange(status="unchanged")
+
+    if not include_diff:
+        return FileChange(status="modified")
+
+    diff = "".join(
+        difflib.unified_diff(
+            old.decode("utf-8", errors="replace").splitlines(keepends=True),
+            new.decode("utf-8").splitlines(keepends=True),
+            fromfile=f"{path} (current)",
+            tofile=f"{path} (generated)",
+        )
+    )
+    return FileChange(status="modified", diff=diff)
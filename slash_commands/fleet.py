@@ -0,0 +1,138 @@
+"""Fleet mode: generate slash commands for many target roots in one invocation."""
+
+from __future__ import annotations
+
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from mcp_server.prompt_utils import MarkdownPrompt
+from slash_commands.detection import detect_agents
+from slash_commands.writer import OverwriteAction, SlashCommandWriter
+
+
+@dataclass
+class FleetTargetResult:
+    """Outcome of generating commands for a single target root."""
+
+    target: Path
+    agents: list[str] = field(default_factory=list)
+    files_written: int = 0
+    files: list[str] = field(default_factory=list)
+    backups_created: list[str] = field(default_factory=list)
+    error: str | None = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """Return ``True`` if the target completed without an error."""
+        return self.error is None
+
+
+def read_targets(source: str) -> list[Path]:
+    """Resolve a ``--targets-from`` value into a list of target roots.
+
+    ``source`` is either a file listing one target directory per line (blank
+    lines and ``#`` comments are ignored) or a glob pattern matching target
+    directories. Duplicates are dropped while preserving first-seen order.
+
+    Args:
+        source: Path to a targets file, or a glob pattern
+
+    Returns:
+        List of target root paths
+
+    Raises:
+        ValueError: If the source is neither a readable file nor a glob that matches anything
+    """
+    source_path = Path(source).expanduser()
+    if source_path.is_file():
+        raw_targets = [
+            line.strip()
+            for line in source_path.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+        candidates = [Path(target).expanduser() for target in raw_targets]
+    elif glob.has_magic(source):
+        candidates = [
+            Path(match)
+            for match in sorted(glob.glob(os.path.expanduser(source)))
+            if Path(match).is_dir()
+        ]
+        if not candidates:
+            raise ValueError(f"Targets glob matched no directories: {source}")
+    else:
+        raise ValueError(f"Targets file does not exist: {source}")
+
+    return list(dict.fromkeys(candidates))
+
+
+def generate_fleet(  # noqa: PLR0913
+    prompts: list[MarkdownPrompt],
+    targets: list[Path],
+    agents: list[str] | None = None,
+    dry_run: bool = False,
+    overwrite_action: OverwriteAction | None = "overwrite",
+    transactional: bool = False,
+    max_workers: int | None = None,
+) -> list[FleetTargetResult]:
+    """Generate commands for every target root using a shared worker pool.
+
+    Prompts are parsed once by the caller and shared (read-only) across all
+    targets. Each target is detected and written independently; a failure in
+    one target is recorded in its result and never stops the others.
+
+    Args:
+        prompts: Prompts to render for every target
+        targets: Target root directories
+        agents: Agent keys to generate for. If None, agents are detected per target.
+        dry_run: If True, don't write files but report what would be written
+        overwrite_action: Action for existing files. Fleet mode never prompts, so
+            this must not be None.
+        transactional: If True, stage and commit each agent's files atomically
+        max_workers: Size of the worker pool. Defaults to the executor's default.
+
+    Returns:
+        One result per target, in the same order as ``targets``
+    """
+    if overwrite_action is None:
+        raise ValueError("Fleet mode requires a non-interactive overwrite action")
+
+    def run_target(target: Path) -> FleetTargetResult:
+        result = FleetTargetResult(target=target)
+        if not target.is_dir():
+            result.error = f"Target directory does not exist: {target}"
+            return result
+
+        try:
+            if agents:
+                target_agents = list(agents)
+            else:
+                target_agents = [agent.key for agent in detect_agents(target)]
+            if not target_agents:
+                result.skipped = True
+                return result
+
+            result.agents = target_agents
+            writer = SlashCommandWriter(
+                prompts_dir=target,  # Unused: prompts are passed in pre-parsed
+                agents=target_agents,
+                dry_run=dry_run,
+                base_path=target,
+                overwrite_action=overwrite_action,
+                transactional=transactional,
+            )
+            generated = writer.generate(prompts=prompts)
+        except (KeyError, OSError, RuntimeError, ValueError) as exc:
+            result.error = f"{type(exc).__name__}: {exc}"
+            return result
+
+        result.files_written = generated["files_written"]
+        result.files = [file_info["path"] for file_info in generated["files"]]
+        result.backups_created = list(generated["backups_created"])
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_target, targets))
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import os
+from collections.abc import Sequence
 from datetime import UTC, datetime
-from typing import Any, Protocol
+from typing import Protocol
 
 import tomli_w
 import yaml
@@ -21,6 +23,8 @@ except ImportError:
 
 from mcp_server.prompt_utils import MarkdownPrompt, PromptArgumentSpec
 from slash_commands.config import AgentConfig, CommandFormat
+from slash_commands.placeholders import render_placeholders
+from slash_commands.timing import stage
 
 
 class CommandGeneratorProtocol(Protocol):
@@ -30,57 +34,74 @@ class CommandGeneratorProtocol(Protocol):
         ...
 
 
+def _source_date() -> str | None:
+    """Return ``SOURCE_DATE_EPOCH`` as an ``updated_at`` timestamp, or None if unset."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH", "")
+    return datetime.fromtimestamp(int(epoch), UTC).isoformat() if epoch.isdigit() else None
+
+
+def _updated_at() -> str:
+    """Return the ``updated_at`` timestamp for generated files.
+
+    Honors ``SOURCE_DATE_EPOCH`` so that reproducible builds (such as archives)
+    produce identical output on every run.
+    """
+    return _source_date() or datetime.now(UTC).isoformat()
+
+
+def _meta_updated_at(updated_at: str | None, agent_neutral: bool) -> str | None:
+    """Return the ``updated_at`` value a generator writes, or None to leave it out."""
+    if updated_at is not None:
+        return updated_at
+    return _source_date() if agent_neutral else _updated_at()
+
+
 def _apply_agent_overrides(
     prompt: MarkdownPrompt, agent: AgentConfig
-) -> tuple[str, list[PromptArgumentSpec], bool]:
+) -> tuple[str | None, Sequence[PromptArgumentSpec], bool]:
     """Apply agent-specific overrides to a prompt.
 
+    Overrides are resolved and validated when the prompt is loaded, so this is a
+    lookup of the prompt's precomputed view for the agent.
+
     Returns:
         Tuple of (description, arguments, enabled)
     """
-    description = prompt.description
-    arguments = prompt.arguments
-    enabled = prompt.enabled
-
-    if prompt.agent_overrides and agent.key in prompt.agent_overrides:
-        overrides = prompt.agent_overrides[agent.key]
-        if isinstance(overrides, dict):
-            if "description" in overrides:
-                description = overrides["description"]
-            if "arguments" in overrides:
-                # Merge base arguments with override arguments
-                override_args = _normalize_override_arguments(overrides["arguments"])
-                # Override by name (override precedence), preserving base order
-                base_list = list(arguments)
-                idx_by_name = {arg.name: i for i, arg in enumerate(base_list)}
-                for oarg in override_args:
-                    if oarg.name in idx_by_name:
-                        base_list[idx_by_name[oarg.name]] = oarg
-                    else:
-                        idx_by_name[oarg.name] = len(base_list)
-                        base_list.append(oarg)
-                arguments = base_list
-            if "enabled" in overrides:
-                enabled = overrides["enabled"]
-
-    return description, arguments, enabled
-
-
-def _normalize_override_arguments(raw: list[dict[str, Any]]) -> list[PromptArgumentSpec]:
-    """Normalize argument overrides to PromptArgumentSpec objects."""
-    normalized = []
-    for entry in raw:
-        if isinstance(entry, dict):
-            name = entry.get("name")
-            if name:
-                normalized.append(
-                    PromptArgumentSpec(
-                        name=name,
-                        description=entry.get("description"),
-                        required=entry.get("required", True),
-                    )
-                )
-    return normalized
+    view = prompt.for_agent(agent.key)
+    return view.description, view.arguments, view.enabled
+
+
+# Line boundaries recognized by str.splitlines() besides "\n"
+_LINE_BREAKS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+# Whitespace removed by str.rstrip() that is not a line boundary
+_TRAILING_WHITESPACE = (
+    " \t\x1f\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u202f\u205f\u3000"
+)
+# Characters that can only occur in non-ASCII content are skipped for ASCII content
+_ASCII_LINE_BREAKS = tuple(char for char in _LINE_BREAKS if char.isascii())
+_ASCII_TRAILING_WHITESPACE = tuple(char for char in _TRAILING_WHITESPACE if char.isascii())
+
+
+def _is_normalized(content: str) -> bool:
+    """Return True if ``_normalize_output`` would return ``content`` unchanged.
+
+    Only substring searches are used, so an already normalized file is checked
+    without copying it.
+    """
+    # Exactly one final newline, and no trailing whitespace on the last line
+    if len(content) < 2 or content[-1] != "\n" or content[-2].isspace():
+        return False
+
+    if content.isascii():
+        line_breaks, whitespace = _ASCII_LINE_BREAKS, _ASCII_TRAILING_WHITESPACE
+    else:
+        line_breaks, whitespace = tuple(_LINE_BREAKS), tuple(_TRAILING_WHITESPACE)
+    if any(char in content for char in line_breaks):
+        return False
+    # Single-character searches are much cheaper, so only look for "<ws>\n"
+    # pairs when that whitespace character occurs at all
+    return not any(char in content and char + "\n" in content for char in whitespace)
 
 
 def _normalize_output(content: str) -> str:
@@ -91,67 +112,56 @@ def _normalize_output(content: str) -> str:
     - Ensures UTF-8 encoding
     - Preserves intentional blank lines
 
+    Content that is already normalized is returned as-is without copying.
+
     Args:
         content: The generated content to normalize
 
     Returns:
         Normalized content string
     """
-    # Normalize line endings to LF
-    content = content.replace("\r\n", "\n").replace("\r", "\n")
-
-    # Remove trailing whitespace from each line, preserve intentional blank lines
-    result = "\n".join(line.rstrip() for line in content.splitlines())
-    if result and not result.endswith("\n"):
-        result += "\n"
-
-    return result
-
-
-def _build_arguments_section_markdown(arguments: list[PromptArgumentSpec]) -> str:
-    """Build a markdown-formatted arguments section."""
-    if not arguments:
-        return ""
-
-    lines = []
-    for arg in arguments:
-        if arg.required:
-            lines.append(f"- `<{arg.name}>` (required): {arg.description or ''}")
-        else:
-            lines.append(f"- `[{arg.name}]` (optional): {arg.description or ''}")
+    if _is_normalized(content):
+        return content
+
+    # splitlines() treats "\r\n" and "\r" as single line boundaries, so line
+    # endings are normalized by the same pass that strips trailing whitespace
+    lines = [line.rstrip() for line in content.splitlines()]
+    if lines and lines[-1]:
+        # End with a newline by joining in an empty last line
+        lines.append("")
     return "\n".join(lines)
 
 
 def _replace_placeholders(
-    body: str, arguments: list[PromptArgumentSpec], replace_double_braces: bool = True
+    body: str, arguments: Sequence[PromptArgumentSpec], replace_double_braces: bool = True
 ) -> str:
-    """Replace argument placeholders in the body text.
+    """Replace argument placeholders in the body text in a single pass.
 
     Args:
         body: The body text to process
         arguments: List of argument specs
         replace_double_braces: If True, replace {{args}} with comma-separated names
     """
-    result = body
-
-    # Replace $ARGUMENTS with markdown-formatted arguments
-    if "$ARGUMENTS" in result:
-        args_section = _build_arguments_section_markdown(arguments)
-        # Replace `$ARGUMENTS` first (with backticks), then $ARGUMENTS (without backticks)
-        result = result.replace("`$ARGUMENTS`", args_section)
-        result = result.replace("$ARGUMENTS", args_section)
-
-    # Replace {{args}} with argument names (only if flag is True)
-    if replace_double_braces and "{{args}}" in result:
-        arg_names = [arg.name for arg in arguments]
-        result = result.replace("{{args}}", ", ".join(arg_names))
-
-    return result
+    kinds = ("arguments", "args") if replace_double_braces else ("arguments",)
+    return render_placeholders(body, arguments, kinds)
 
 
 class MarkdownCommandGenerator:
     """Generator for Markdown-format slash command files."""
 
+    def __init__(self, agent_neutral: bool = False, updated_at: str | None = None):
+        """Initialize the generator.
+
+        Args:
+            agent_neutral: If True, leave agent-specific fields out of the metadata so
+                agents sharing the format can receive byte-identical files. ``updated_at``
+                is then only written when given or set by ``SOURCE_DATE_EPOCH``, so
+                unchanged prompts render identically on every run.
+            updated_at: Fixed ``updated_at`` value. If None, the current time is used.
+        """
+        self.agent_neutral = agent_neutral
+        self.updated_at = updated_at
+
     def generate(self, prompt: MarkdownPrompt, agent: AgentConfig) -> str:
         """Generate a Markdown-formatted command file.
 
@@ -162,7 +172,8 @@ class MarkdownCommandGenerator:
         Returns:
             Complete markdown file content
         """
-        description, arguments, enabled = _apply_agent_overrides(prompt, agent)
+        with stage("overrides"):
+            description, arguments, enabled = _apply_agent_overrides(prompt, agent)
 
         # Build frontmatter
         frontmatter = {
@@ -181,13 +192,15 @@ class MarkdownCommandGenerator:
             "meta": self._build_meta(prompt, agent),
         }
 
-        # Replace placeholders in body
-        body = _replace_placeholders(prompt.body, arguments, replace_double_braces=False)
+        with stage("render"):
+            # Replace placeholders in body
+            body = _replace_placeholders(prompt.body, arguments, replace_double_braces=False)
 
-        # Format as YAML frontmatter + body
-        yaml_content = yaml.safe_dump(frontmatter, allow_unicode=True, sort_keys=False)
-        output = f"---\n{yaml_content}---\n\n{body}\n"
-        return _normalize_output(output)
+            # Format as YAML frontmatter + body
+            yaml_content = yaml.safe_dump(frontmatter, allow_unicode=True, sort_keys=False)
+            output = f"---\n{yaml_content}---\n\n{body}\n"
+        with stage("normalize"):
+            return _normalize_output(output)
 
     def _get_command_name(self, prompt: MarkdownPrompt, agent: AgentConfig) -> str:
         """Get the command name with optional prefix."""
@@ -197,24 +210,40 @@ class MarkdownCommandGenerator:
     def _build_meta(self, prompt: MarkdownPrompt, agent: AgentConfig) -> dict:
         """Build metadata section for the command."""
         meta = prompt.meta.copy() if prompt.meta else {}
+        if not self.agent_neutral:
+            meta.update({
+                "agent": agent.key,
+                "agent_display_name": agent.display_name,
+                "command_dir": agent.command_dir,
+                "command_format": agent.command_format.value,
+                "command_file_extension": agent.command_file_extension,
+            })
         meta.update({
-            "agent": agent.key,
-            "agent_display_name": agent.display_name,
-            "command_dir": agent.command_dir,
-            "command_format": agent.command_format.value,
-            "command_file_extension": agent.command_file_extension,
             "source_prompt": prompt.name,
             # Store only basename to avoid leaking absolute paths
             "source_path": prompt.path.name,
             "version": __version__,
-            "updated_at": datetime.now(UTC).isoformat(),
         })
+        updated_at = _meta_updated_at(self.updated_at, self.agent_neutral)
+        if updated_at is not None:
+            meta["updated_at"] = updated_at
         return meta
 
 
 class TomlCommandGenerator:
     """Generator for TOML-format slash command files (Gemini CLI spec)."""
 
+    def __init__(self, agent_neutral: bool = False, updated_at: str | None = None):
+        """Initialize the generator.
+
+        Args:
+            agent_neutral: If True, leave the agent key out of the metadata, and
+                ``updated_at`` unless given or set by ``SOURCE_DATE_EPOCH``.
+            updated_at: Fixed ``updated_at`` value. If None, the current time is used.
+        """
+        self.agent_neutral = agent_neutral
+        self.updated_at = updated_at
+
     def generate(self, prompt: MarkdownPrompt, agent: AgentConfig) -> str:
         """Generate a TOML-formatted command file following Gemini CLI spec.
 
@@ -230,11 +259,13 @@ class TomlCommandGenerator:
         Returns:
             Complete TOML file content
         """
-        description, arguments, _enabled = _apply_agent_overrides(prompt, agent)
+        with stage("overrides"):
+            description, arguments, _enabled = _apply_agent_overrides(prompt, agent)
 
         # Replace $ARGUMENTS with markdown-formatted arguments
         # But preserve {{args}} placeholder for Gemini CLI context-aware injection
-        prompt_text = _replace_placeholders(prompt.body, arguments, replace_double_braces=False)
+        with stage("render"):
+            prompt_text = _replace_placeholders(prompt.body, arguments, replace_double_braces=False)
 
         # Build TOML structure following official Gemini CLI spec
         # Only include 'description' if it exists, 'prompt' is always required
@@ -244,16 +275,19 @@ class TomlCommandGenerator:
 
         # Add metadata fields (version tracking for our tooling)
         # These are ignored by Gemini CLI but preserved for bookkeeping
-        toml_data["meta"] = {
-            "version": __version__,
-            "updated_at": datetime.now(UTC).isoformat(),
-            "source_prompt": prompt.name,
-            "agent": agent.key,
-        }
+        toml_data["meta"] = {"version": __version__}
+        updated_at = _meta_updated_at(self.updated_at, self.agent_neutral)
+        if updated_at is not None:
+            toml_data["meta"]["updated_at"] = updated_at
+        toml_data["meta"]["source_prompt"] = prompt.name
+        if not self.agent_neutral:
+            toml_data["meta"]["agent"] = agent.key
 
         # Convert to TOML format
-        output = self._dict_to_toml(toml_data)
-        return _normalize_output(output)
+        with stage("render"):
+            output = self._dict_to_toml(toml_data)
+        with stage("normalize"):
+            return _normalize_output(output)
 
     def _dict_to_toml(self, data: dict) -> str:
         """Convert a dict to TOML format."""
@@ -264,11 +298,13 @@ class CommandGenerator:
     """Base class for command generators."""
 
     @staticmethod
-    def create(format: CommandFormat) -> CommandGeneratorProtocol:
+    def create(
+        format: CommandFormat, agent_neutral: bool = False, updated_at: str | None = None
+    ) -> CommandGeneratorProtocol:
         """Factory method to create a generator for the specified format."""
         if format == CommandFormat.MARKDOWN:
-            return MarkdownCommandGenerator()
+            return MarkdownCommandGenerator(agent_neutral=agent_neutral, updated_at=updated_at)
         elif format == CommandFormat.TOML:
-            return TomlCommandGenerator()
+            return TomlCommandGenerator(agent_neutral=agent_neutral, updated_at=updated_at)
         else:
             raise ValueError(f"Unsupported command format: {format}")
@@ -0,0 +1,104 @@
+"""Find prompts changed since a git revision, for partial regeneration."""
+
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from mcp_server.prompt_utils import parse_frontmatter
+
+
+@dataclass
+class PromptChanges:
+    """Prompt files that differ between a git revision and the working tree."""
+
+    modified: list[Path] = field(default_factory=list)  # Added or modified, sorted
+    deleted: list[Path] = field(default_factory=list)  # Deleted, or renamed away
+    # Prompt names at the revision for every deleted or modified file
+    previous_names: set[str] = field(default_factory=set)
+    # Other changed files, such as partials included by prompts, sorted
+    partials: list[Path] = field(default_factory=list)
+
+
+def _git(prompts_dir: Path, *args: str) -> str:
+    """Run git in ``prompts_dir`` and return its output.
+
+    Raises:
+        ValueError: If git is not installed or the command fails
+    """
+    try:
+        completed = subprocess.run(
+            ["git", *args], cwd=prompts_dir, capture_output=True, text=True, check=False
+        )
+    except FileNotFoundError:
+        raise ValueError("--since requires git to be installed") from None
+    if completed.returncode != 0:
+        raise ValueError(f"git {args[0]} failed: {completed.stderr.strip()}")
+    return completed.stdout
+
+
+def _is_prompt_file(relative_path: str) -> bool:
+    # The writer only loads *.md files directly inside the prompts directory
+    return "/" not in relative_path and relative_path.endswith(".md")
+
+
+def _previous_name(prompts_dir: Path, ref: str, relative_path: str) -> str:
+    """Return the prompt name a file had at ``ref``, as the prompt loader derives it."""
+    frontmatter, _ = parse_frontmatter(_git(prompts_dir, "show", f"{ref}:./{relative_path}"))
+    name = frontmatter.get("name")
+    return name if isinstance(name, str) and name else Path(relative_path).stem
+
+
+def prompt_changes_since(prompts_dir: Path, ref: str) -> PromptChanges:
+    """Return prompt files added, modified or deleted since ``ref``.
+
+    Compares ``ref`` with the working tree of the local repository, so
+    uncommitted edits and untracked prompt files count as changes. Renames are
+    reported as a deletion plus an addition.
+
+    Raises:
+        ValueError: If ``prompts_dir`` is not in a git repository or ``ref`` is unknown
+    """
+    if ref.startswith("-"):
+        raise ValueError(f"Invalid git revision: {ref}")
+    _git(prompts_dir, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+
+    modified: set[str] = set()
+    deleted: set[str] = set()
+    existed: set[str] = set()  # Paths that have a version at the revision
+    fields = iter(
+        _git(prompts_dir, "diff", "--name-status", "-z", "-M", "--relative", ref, "--").split("\0")
+    )
+    for status in fields:
+        if not status:
+            continue
+        path = next(fields)
+        if status[0] in "RC":
+            # Renames and copies list the old path, then the new one
+            modified.add(next(fields))
+            if status[0] == "R":
+                deleted.add(path)
+                existed.add(path)
+        elif status[0] == "A":
+            modified.add(path)
+        else:
+            (deleted if status[0] == "D" else modified).add(path)
+            existed.add(path)
+
+    untracked = _git(prompts_dir, "ls-files", "-z", "--others", "--exclude-standard", "--", ".")
+    modified.update(path for path in untracked.split("\0") if path)
+
+    previous_names = {
+        _previous_name(prompts_dir, ref, path) for path in sorted(existed) if _is_prompt_file(path)
+    }
+    partials = {path for path in modified | deleted if not _is_prompt_file(path)}
+    modified = {path for path in modified if _is_prompt_file(path)}
+    deleted = {path for path in deleted if _is_prompt_file(path)}
+
+    return PromptChanges(
+        modified=[prompts_dir / path for path in sorted(modified)],
+        deleted=[prompts_dir / path for path in sorted(deleted)],
+        previous_names=previous_names,
+        partials=[prompts_dir / path for path in sorted(partials)],
+    )
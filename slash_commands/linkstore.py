@@ -0,0 +1,183 @@
+"""Shared content store that command files are linked to instead of copied.
+
+Each unique rendered file is written once to ``objects/<xx>/<sha256>`` under the
+store root and made read-only; every agent's command file is then a symlink or
+hardlink to that object. Agents (or users on a shared machine) that receive
+byte-identical content share one file on disk.
+
+Every link is registered under ``links/`` with the object it points to, so
+:meth:`LinkStore.collect_garbage` can delete objects that no link uses any more.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Literal
+
+LinkMode = Literal["copy", "symlink", "hardlink"]
+
+LINK_STORE_DIRNAME = ".sdd-store"
+
+# Stored objects are shared, so they must not be edited in place
+OBJECT_MODE = 0o444
+
+# Objects and link registrations younger than this (seconds) are never collected,
+# so a concurrent run's links are safe before they exist on disk
+GC_GRACE_PERIOD = 3600
+
+
+def _replace_atomically(target: Path, create) -> None:
+    """Create a temporary entry next to ``target`` with ``create`` and swap it in."""
+    fd, temp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    os.close(fd)
+    temp_path = Path(temp_name)
+    temp_path.unlink()
+    try:
+        create(temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+class LinkStore:
+    """Content-addressed store of rendered command files."""
+
+    def __init__(self, root: Path):
+        """Initialize the store.
+
+        Args:
+            root: Store directory. Hardlinks require it to be on the same
+                filesystem as the command directories.
+        """
+        self.root = root
+        self.objects_created = 0
+        self.objects_removed = 0
+
+    def object_path(self, sha256: str) -> Path:
+        """Return where the object for ``sha256`` is (or would be) stored."""
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def _registration_path(self, target: Path) -> Path:
+        key = hashlib.sha256(os.path.abspath(target).encode("utf-8")).hexdigest()
+        return self.root / "links" / key[:2] / key
+
+    def _register(self, target: Path, sha256: str) -> None:
+        """Record that ``target`` links to the object ``sha256``."""
+        registration = self._registration_path(target)
+        registration.parent.mkdir(parents=True, exist_ok=True)
+        text = f"{sha256}\n{os.path.abspath(target)}\n"
+        _replace_atomically(registration, lambda temp: temp.write_text(text, encoding="utf-8"))
+
+    def put(self, content: str) -> Path:
+        """Store ``content`` unless an identical object exists, and return its path."""
+        data = content.encode("utf-8")
+        object_path = self.object_path(hashlib.sha256(data).hexdigest())
+        if object_path.exists():
+            return object_path
+
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+
+        def write(temp_path: Path) -> None:
+            temp_path.write_bytes(data)
+            temp_path.chmod(OBJECT_MODE)
+
+        _replace_atomically(object_path, write)
+        self.objects_created += 1
+        return object_path
+
+    def link(self, target: Path, content: str, mode: LinkMode) -> LinkMode:
+        """Point ``target`` at the stored object for ``content``.
+
+        The existing entry at ``target`` is replaced atomically and never written
+        through, so a previous link never modifies the shared object.
+
+        Args:
+            target: Command file path to create or replace
+            content: Rendered file content
+            mode: ``symlink`` or ``hardlink`` (``copy`` writes a regular file)
+
+        Returns:
+            The mode actually used: ``copy`` when the filesystem refused the link
+            (for example a hardlink across filesystems)
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if mode != "copy":
+            # Registered first, so garbage collection never removes the object in between
+            self._register(target, hashlib.sha256(content.encode("utf-8")).hexdigest())
+            object_path = self.put(content)
+            try:
+                if mode == "symlink":
+                    # Relative to the link's own directory, so it resolves wherever
+                    # the store path was given relative to
+                    link_target = os.path.relpath(object_path, target.parent)
+                    _replace_atomically(target, lambda temp: temp.symlink_to(link_target))
+                else:
+                    _replace_atomically(target, lambda temp: os.link(object_path, temp))
+                return mode
+            except OSError:
+                # Fall back to a private copy below
+                pass
+
+        _replace_atomically(target, lambda temp: temp.write_text(content, encoding="utf-8"))
+        return "copy"
+
+    def collect_garbage(self) -> dict[str, int]:
+        """Delete objects that no registered link points to any more.
+
+        A registration is live while its link still resolves to (symlink) or is
+        the same file as (hardlink) its object. Objects that are still hardlinked,
+        and registrations and objects younger than :data:`GC_GRACE_PERIOD`, are
+        always kept.
+
+        Returns:
+            Dict with ``objects_removed`` and ``bytes_freed``
+        """
+        now = time.time()
+        referenced: set[str] = set()
+        for registration in (self.root / "links").glob("*/*"):
+            try:
+                sha256, link_path = registration.read_text(encoding="utf-8").splitlines()[:2]
+                young = now - registration.stat().st_mtime < GC_GRACE_PERIOD
+            except (OSError, ValueError):
+                continue
+            if young or self._links_to(Path(link_path), sha256):
+                referenced.add(sha256)
+            else:
+                registration.unlink(missing_ok=True)
+
+        objects_removed = 0
+        bytes_freed = 0
+        for object_path in (self.root / "objects").glob("*/*"):
+            if object_path.name.startswith(".") or object_path.name in referenced:
+                continue
+            try:
+                stat = object_path.stat()
+                if now - stat.st_mtime < GC_GRACE_PERIOD or stat.st_nlink > 1:
+                    continue  # Too young, or still hardlinked somewhere
+                object_path.unlink()
+            except OSError:
+                continue
+            objects_removed += 1
+            bytes_freed += stat.st_size
+        self.objects_removed += objects_removed
+        return {"objects_removed": objects_removed, "bytes_freed": bytes_freed}
+
+    def _links_to(self, link_path: Path, sha256: str) -> bool:
+        try:
+            return link_path.samefile(self.object_path(sha256))
+        except OSError:
+            return False
+
+
+def is_shared_file(path: Path) -> bool:
+    """Return True if writing to ``path`` in place would modify another file too."""
+    try:
+        stat = path.lstat()
+    except FileNotFoundError:
+        return False
+    return path.is_symlink() or stat.st_nlink > 1
@@ -0,0 +1,97 @@
+"""Generation manifest: what was generated into a target directory, and from what.
+
+The writer records one entry per generated command file, so drift can be
+detected by hashing files instead of regenerating them. Manifests are kept
+per target in the user's state directory
+(``$XDG_STATE_HOME/sdd-generate-commands/manifests``), never in the target
+itself, which is often the home directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+# Written into the target directory by earlier versions; removed on the next save
+LEGACY_MANIFEST_FILENAME = ".sdd-manifest.json"
+
+
+def manifest_path(base_path: Path) -> Path:
+    """Return where the manifest of the target ``base_path`` is stored."""
+    state_home = os.environ.get("XDG_STATE_HOME") or str(Path.home() / ".local" / "state")
+    key = hashlib.sha256(str(base_path.resolve()).encode("utf-8")).hexdigest()
+    return Path(state_home) / "sdd-generate-commands" / "manifests" / f"{key}.json"
+
+
+def content_hash(content: str | bytes) -> str:
+    """Return the SHA-256 of a command file's content."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """A generated command file as it was written."""
+
+    agent: str
+    source_prompt: str
+    source_hash: str  # prompt_hash() of the source prompt
+    content_hash: str
+    version: str
+
+
+class GenerationManifest:
+    """Entries keyed by command file path relative to the target directory."""
+
+    def __init__(self, base_path: Path, entries: dict[str, ManifestEntry] | None = None):
+        self.base_path = base_path
+        self.path = manifest_path(base_path)
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, base_path: Path) -> GenerationManifest:
+        """Load the manifest of ``base_path``; a missing or unreadable one is empty."""
+        try:
+            data = json.loads(manifest_path(base_path).read_text(encoding="utf-8"))
+            entries = {
+                relative: ManifestEntry(**entry) for relative, entry in data["files"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(base_path)
+        return cls(base_path, entries)
+
+    def update(self, changes: dict[str, ManifestEntry | None]) -> None:
+        """Apply recorded (entry) and removed (None) files."""
+        for relative, entry in changes.items():
+            if entry is None:
+                self.entries.pop(relative, None)
+            else:
+                self.entries[relative] = entry
+
+    def save(self) -> None:
+        """Write the manifest atomically, or delete it once it has no entries."""
+        (self.base_path / LEGACY_MANIFEST_FILENAME).unlink(missing_ok=True)
+        if not self.entries:
+            self.path.unlink(missing_ok=True)
+            return
+        data = {
+            "version": MANIFEST_VERSION,
+            "target": str(self.base_path.resolve()),
+            "files": {relative: asdict(entry) for relative, entry in sorted(self.entries.items())},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(data, handle, indent=2)
+                handle.write("\n")
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,116 @@
+"""Single-pass placeholder substitution for prompt bodies.
+
+A body is tokenized once into literal text and placeholder segments. Rendering
+is then a single ``"".join`` over the segments, no matter how many placeholder
+kinds are defined: every kind is one alternative of the same compiled pattern.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Collection, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+
+from mcp_server.prompt_utils import PromptArgumentSpec
+
+# Placeholder kinds and their patterns. Earlier alternatives win at the same
+# position, so the backticked form of $ARGUMENTS is consumed as a whole.
+PLACEHOLDER_PATTERNS: dict[str, str] = {
+    "arguments": r"`\$ARGUMENTS`|\$ARGUMENTS",
+    "args": r"\{\{args\}\}",
+}
+
+_PLACEHOLDER_RE = re.compile(
+    "|".join(f"(?P<{kind}>{pattern})" for kind, pattern in PLACEHOLDER_PATTERNS.items())
+)
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """A placeholder occurrence in a body."""
+
+    kind: str
+    text: str  # Original text, rendered verbatim when the kind is not substituted
+
+
+@dataclass(frozen=True)
+class PlaceholderPlan:
+    """A body split into literal strings and placeholders."""
+
+    segments: tuple[str | Placeholder, ...]
+    kinds: frozenset[str]
+
+    def render(self, values: dict[str, str]) -> str:
+        """Join the segments, substituting placeholders whose kind is in ``values``."""
+        if len(self.segments) == 1 and isinstance(self.segments[0], str):
+            # No placeholders: return the body itself without copying it
+            return self.segments[0]
+        return "".join(
+            segment if isinstance(segment, str) else values.get(segment.kind, segment.text)
+            for segment in self.segments
+        )
+
+
+# Bodies are rendered for every agent before the next prompt is loaded, so a
+# small cache avoids re-tokenizing without pinning a whole prompt library
+@lru_cache(maxsize=4)
+def compile_placeholders(body: str) -> PlaceholderPlan:
+    """Tokenize ``body`` into literal and placeholder segments."""
+    segments: list[str | Placeholder] = []
+    kinds: set[str] = set()
+    position = 0
+    for match in _PLACEHOLDER_RE.finditer(body):
+        if match.start() > position:
+            segments.append(body[position : match.start()])
+        kind = match.lastgroup or ""
+        segments.append(Placeholder(kind=kind, text=match.group()))
+        kinds.add(kind)
+        position = match.end()
+    if position < len(body) or not segments:
+        segments.append(body[position:])
+    return PlaceholderPlan(segments=tuple(segments), kinds=frozenset(kinds))
+
+
+@lru_cache(maxsize=64)
+def build_arguments_section(arguments: tuple[PromptArgumentSpec, ...]) -> str:
+    """Build a markdown-formatted arguments section."""
+    if not arguments:
+        return ""
+
+    lines = []
+    for arg in arguments:
+        if arg.required:
+            lines.append(f"- `<{arg.name}>` (required): {arg.description or ''}")
+        else:
+            lines.append(f"- `[{arg.name}]` (optional): {arg.description or ''}")
+    return "\n".join(lines)
+
+
+# How each placeholder kind is rendered from the effective arguments
+_RESOLVERS: dict[str, Callable[[tuple[PromptArgumentSpec, ...]], str]] = {
+    "arguments": build_arguments_section,
+    "args": lambda arguments: ", ".join(arg.name for arg in arguments),
+}
+
+
+def render_placeholders(
+    body: str, arguments: Sequence[PromptArgumentSpec], kinds: Collection[str]
+) -> str:
+    """Render ``body`` with the placeholder ``kinds`` substituted in a single pass.
+
+    Args:
+        body: The body text to process
+        arguments: Effective arguments for the agent
+        kinds: Placeholder kinds to substitute; other placeholders are kept verbatim
+
+    Returns:
+        The rendered body
+    """
+    plan = compile_placeholders(body)
+    wanted = plan.kinds.intersection(kinds)
+    if not wanted:
+        return body
+
+    arguments = tuple(arguments)
+    return plan.render({kind: _RESOLVERS[kind](arguments) for kind in wanted})
@@ -0,0 +1,55 @@
+"""Upfront planning of conflicts between generated commands and existing files."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+ConflictCategory = Literal["unchanged", "stale", "outdated", "modified", "differs"]
+ConflictPolicy = Literal["skip", "overwrite", "backup", "cancel"]
+
+# Human-readable labels, in the order categories are presented
+CONFLICT_CATEGORY_LABELS: dict[ConflictCategory, str] = {
+    "unchanged": "Unchanged",
+    "stale": "Generated from an earlier prompt version",
+    "outdated": "Generated by an older version",
+    "modified": "Modified by user",
+    "differs": "Differs from new output",
+}
+
+
+@dataclass(frozen=True)
+class PlannedConflict:
+    """An output path that already exists on disk."""
+
+    path: Path
+    agent: str
+    category: ConflictCategory
+
+
+@dataclass
+class GenerationPlan:
+    """Result of the planning phase: which outputs are new and which conflict."""
+
+    new_files: int = 0
+    conflicts: list[PlannedConflict] = field(default_factory=list)
+
+    def by_category(self) -> dict[ConflictCategory, list[PlannedConflict]]:
+        """Group conflicts by category, omitting empty categories."""
+        grouped: dict[ConflictCategory, list[PlannedConflict]] = {}
+        for category in CONFLICT_CATEGORY_LABELS:
+            matching = [conflict for conflict in self.conflicts if conflict.category == category]
+            if matching:
+                grouped[category] = matching
+        return grouped
+
+    def resolve(
+        self, policies: dict[ConflictCategory, ConflictPolicy]
+    ) -> dict[Path, ConflictPolicy]:
+        """Map every conflicting path to the policy chosen for its category.
+
+        Raises:
+            KeyError: If a category with conflicts has no policy
+        """
+        return {conflict.path: policies[conflict.category] for conflict in self.conflicts}
@@ -0,0 +1,57 @@
+"""Reuse parsed prompts across runs in one long-lived process."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from mcp_server.prompt_includes import includes_changed
+from mcp_server.prompt_packs import prompt_state
+from mcp_server.prompt_utils import MarkdownPrompt, load_markdown_prompt
+
+
+class PromptCache:
+    """Parsed prompts keyed by path, reused while the file's mtime and size are unchanged.
+
+    A prompt that includes partials is also reparsed when any of them changed.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[Path, tuple[tuple[int, int], MarkdownPrompt]] = {}
+
+    def load(self, path: Path) -> MarkdownPrompt:
+        """Return the parsed prompt at ``path``, parsing it only if it changed."""
+        state = prompt_state(path)
+        cached = self._entries.get(path)
+        if cached is not None and cached[0] == state and not includes_changed(cached[1].includes):
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        prompt = load_markdown_prompt(path)
+        self._entries[path] = (state, prompt)
+        return prompt
+
+
+# Cache used by prompt loads in this context, if any
+_current: ContextVar[PromptCache | None] = ContextVar("slash_commands_prompt_cache", default=None)
+
+
+@contextmanager
+def use_prompt_cache(cache: PromptCache) -> Iterator[PromptCache]:
+    """Serve prompt loads inside the block from ``cache``."""
+    token = _current.set(cache)
+    try:
+        yield cache
+    finally:
+        _current.reset(token)
+
+
+def load_prompt(path: Path) -> MarkdownPrompt:
+    """Load a prompt through the active cache, or parse it directly when there is none."""
+    cache = _current.get()
+    return load_markdown_prompt(path) if cache is None else cache.load(path)
@@ -0,0 +1,164 @@
+"""Drift report: classify generated command files against the current prompts."""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from mcp_server.prompt_utils import MarkdownPrompt, prompt_hash
+from slash_commands.config import AgentConfig, get_agent_config
+from slash_commands.diffing import classify_change
+from slash_commands.generators import __version__ as generator_version
+from slash_commands.manifest import GenerationManifest, content_hash
+from slash_commands.writer import SlashCommandWriter
+
+FileState = Literal["up-to-date", "stale", "modified", "orphaned"]
+
+# States in the order they are reported
+FILE_STATES: tuple[FileState, ...] = ("up-to-date", "stale", "modified", "orphaned")
+
+
+@dataclass(frozen=True)
+class FileStatus:
+    """Drift state of one generated command file."""
+
+    path: Path
+    agent: str
+    state: FileState
+    reason: str
+    source_prompt: str | None = None
+
+
+@dataclass
+class StatusReport:
+    """Drift states of every generated file under one target directory."""
+
+    target: Path
+    files: list[FileStatus]
+
+    def counts(self) -> dict[FileState, int]:
+        counted = Counter(status.state for status in self.files)
+        return {state: counted[state] for state in FILE_STATES}
+
+
+def _command_files(
+    base_path: Path, agents: Iterable[AgentConfig]
+) -> Iterator[tuple[Path, AgentConfig]]:
+    """Yield every candidate command file, listing each command directory once."""
+    for agent in agents:
+        try:
+            with os.scandir(base_path / agent.command_dir) as entries:
+                names = sorted(
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith(agent.command_file_extension)
+                    and not entry.name.startswith(".")
+                    and entry.is_file()
+                )
+        except OSError:
+            continue
+        for name in names:
+            yield base_path / agent.command_dir / name, agent
+
+
+class _Classifier:
+    """Classifies files against prompts parsed and hashed once per report."""
+
+    def __init__(
+        self,
+        writer: SlashCommandWriter,
+        prompts: dict[str, MarkdownPrompt],
+        source_hashes: dict[str, str],
+        manifest: GenerationManifest,
+    ):
+        self.writer = writer
+        self.prompts = prompts
+        self.source_hashes = source_hashes
+        self.manifest = manifest
+
+    def __call__(self, candidate: tuple[Path, AgentConfig]) -> FileStatus | None:  # noqa: PLR0911
+        path, agent = candidate
+        # Reads only the header (Markdown) or trailing [meta] table (TOML)
+        meta = self.writer.generated_meta(path, agent)
+        if meta is None:
+            return None
+
+        source = meta.get("source_prompt")
+        source = str(source) if source is not None else None
+
+        def status(state: FileState, reason: str) -> FileStatus:
+            return FileStatus(path, agent.key, state, reason, source)
+
+        prompt = self.prompts.get(source) if source is not None else None
+        if prompt is None:
+            return status("orphaned", "source prompt no longer exists")
+        if not prompt.enabled or not prompt.for_agent(agent.key).enabled:
+            return status("orphaned", "source prompt is disabled")
+
+        entry = self.manifest.entries.get(path.relative_to(self.writer.base_path).as_posix())
+        if entry is not None and entry.agent == agent.key:
+            try:
+                current_hash = content_hash(path.read_bytes())
+            except OSError as e:
+                return status("modified", f"unreadable: {e}")
+            if current_hash != entry.content_hash:
+                return status("modified", "edited after generation")
+            if entry.version != generator_version:
+                return status("stale", f"generated by version {entry.version}")
+            if entry.source_hash != self.source_hashes[prompt.name]:
+                return status("stale", "source prompt changed")
+            return status("up-to-date", "matches the manifest")
+
+        # No manifest entry: fall back to the recorded version, then a fresh render
+        version = meta.get("version")
+        if version is not None and str(version) != generator_version:
+            return status("stale", f"generated by version {version}")
+        content = self.writer._generator_for(agent).generate(prompt, agent)
+        if classify_change(path, content, include_diff=False).status == "unchanged":
+            return status("up-to-date", "matches a fresh render")
+        return status("modified", "differs from a fresh render")
+
+
+def collect_status(
+    writer: SlashCommandWriter,
+    prompts: Iterable[MarkdownPrompt] | None = None,
+    max_workers: int | None = None,
+) -> StatusReport:
+    """Classify every generated file under the writer's agents' command directories.
+
+    Files are ``up-to-date``, ``stale`` (generated by another version, or from
+    an older version of the source prompt), ``modified`` (edited after
+    generation) or ``orphaned`` (the source prompt was removed or disabled).
+    Files without generated metadata are ignored.
+
+    The generation manifest is used when it has an entry for a file: then the
+    file is only hashed. Other files are compared with a fresh render.
+
+    Args:
+        writer: Writer configured with the prompts directory, agents and target path
+        prompts: Already-loaded prompts. If None, prompts are loaded from the
+            writer's prompts directory.
+        max_workers: Size of the worker pool that sniffs and hashes files
+
+    Returns:
+        The report, sorted by path
+    """
+    prompt_list = writer._load_prompts() if prompts is None else list(prompts)
+    by_name = {prompt.name: prompt for prompt in prompt_list}
+    manifest = GenerationManifest.load(writer.base_path)
+    agents = [get_agent_config(key) for key in writer.agents]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        source_hashes = dict(zip(by_name, executor.map(prompt_hash, by_name.values()), strict=True))
+        classify = _Classifier(writer, by_name, source_hashes, manifest)
+        results = executor.map(classify, _command_files(writer.base_path, agents))
+        files = [status for status in results if status is not None]
+
+    return StatusReport(
+        target=writer.base_path, files=sorted(files, key=lambda status: str(status.path))
+    )
@@ -0,0 +1,111 @@
+"""Opt-in per-stage wall and CPU timing for generate and cleanup runs."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+# Stages timed by the writer and generators, in pipeline order
+TIMING_STAGES = (
+    "discovery",
+    "load",
+    "overrides",
+    "render",
+    "normalize",
+    "diff",
+    "exists",
+    "backup",
+    "write",
+    "scan",
+    "delete",
+)
+
+
+@dataclass
+class StageTiming:
+    """Accumulated time spent in one stage."""
+
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+
+
+@dataclass
+class Timings:
+    """Timings collected while a :func:`collect_timings` block is active."""
+
+    stages: dict[str, StageTiming] = field(default_factory=dict)
+    prompts: dict[str, float] = field(default_factory=dict)  # Wall seconds per prompt
+    files: int = 0
+    elapsed: float = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the wall and CPU time spent in the block to stage ``name``."""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.stages.setdefault(name, StageTiming())
+            timing.wall += time.perf_counter() - wall_start
+            timing.cpu += time.process_time() - cpu_start
+            timing.calls += 1
+
+    def add_prompt(self, name: str, seconds: float) -> None:
+        self.prompts[name] = self.prompts.get(name, 0.0) + seconds
+
+    def slowest_prompts(self, count: int) -> list[tuple[str, float]]:
+        """Return the ``count`` prompts that took longest, slowest first."""
+        return sorted(self.prompts.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self, slowest: int = 5) -> dict[str, Any]:
+        """Return the timings as JSON-serializable data."""
+        return {
+            "elapsed": self.elapsed,
+            "files": self.files,
+            "files_per_second": self.files_per_second,
+            "stages": {
+                name: {"wall": timing.wall, "cpu": timing.cpu, "calls": timing.calls}
+                for name, timing in self.stages.items()
+            },
+            "slowest_prompts": [
+                {"name": name, "wall": seconds} for name, seconds in self.slowest_prompts(slowest)
+            ],
+        }
+
+
+# Timings of the run in progress in this context, if any
+_current: ContextVar[Timings | None] = ContextVar("slash_commands_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Timings]:
+    """Collect stage timings for everything run inside the block (in this thread)."""
+    timings = Timings()
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.elapsed = time.perf_counter() - start
+        _current.reset(token)
+
+
+def current_timings() -> Timings | None:
+    """Return the active timings collector, or None when timing is off."""
+    return _current.get()
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """Time the block as stage ``name`` if timings are being collected."""
+    timings = _current.get()
+    return nullcontext() if timings is None else timings.stage(name)
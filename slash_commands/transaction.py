@@ -0,0 +1,233 @@
+"""Transactional staging of generated command files.
+
+Files for an agent are first written into a hidden staging directory inside the
+agent's command directory, flushed to disk in one batch, and only then swapped
+into place. If anything fails before or during the swap, the command directory
+is restored to its previous state.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+STAGING_PREFIX = ".sdd-staging-"
+
+# Staging directories of other hosts, or without an owner, are removed once this old (seconds)
+STALE_STAGING_AGE = 3600
+
+
+def _fsync_file(path: Path) -> None:
+    """Flush a file's contents to stable storage."""
+    with path.open("rb") as handle:
+        os.fsync(handle.fileno())
+
+
+def _fsync_directory(path: Path) -> None:
+    """Flush directory entries (renames, new files) to stable storage.
+
+    Not every platform supports opening directories, so failures are ignored.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+def _host_tag() -> str:
+    """Identify this host and boot, so staging directories of other hosts are told apart."""
+    try:
+        boot_id = Path("/proc/sys/kernel/random/boot_id").read_text().strip()
+    except OSError:
+        boot_id = ""
+    return hashlib.sha256(f"{socket.gethostname()}\0{boot_id}".encode()).hexdigest()[:12]
+
+
+def _process_start(pid: int) -> str:
+    """Return when ``pid`` started in clock ticks since boot, or ``"0"`` where unknown."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return "0"
+    # Fields after the parenthesised command name start at field 3; starttime is field 22
+    fields = stat.rpartition(")")[2].split()
+    return fields[19] if len(fields) > 19 else "0"
+
+
+def _staging_owner() -> str:
+    """Return the owner recorded in this process's staging directory names."""
+    pid = os.getpid()
+    return f"{_host_tag()}-{pid}-{_process_start(pid)}"
+
+
+def _owner_alive(pid: int, start: str) -> bool:
+    """Return True if the process that recorded ``pid`` and ``start`` still runs."""
+    if not _process_alive(pid):
+        return False
+    # A different start time means the PID was reused by an unrelated process
+    return start == "0" or _process_start(pid) in ("0", start)
+
+
+def remove_stale_staging(command_dir: Path) -> int:
+    """Remove staging directories left behind by transactions that were killed.
+
+    Staging directories are named after the host, PID and process start time
+    of the run that created them. A directory (with the ``.rollback``
+    directory inside it) created on this host is stale when that process no
+    longer runs. Directories of other hosts sharing the command directory, and
+    directories whose owner cannot be told, are removed once older than
+    :data:`STALE_STAGING_AGE`.
+
+    Returns:
+        Number of directories removed
+    """
+    try:
+        entries = [
+            entry for entry in os.scandir(command_dir) if entry.name.startswith(STAGING_PREFIX)
+        ]
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+
+    host = _host_tag()
+    removed = 0
+    for entry in entries:
+        # tempfile's random suffix never contains "-"
+        owner = entry.name.removeprefix(STAGING_PREFIX).rpartition("-")[0].split("-")
+        if len(owner) == 3 and owner[0] == host and owner[1].isdigit():
+            stale = not _owner_alive(int(owner[1]), owner[2])
+        else:
+            try:
+                stale = time.time() - entry.stat(follow_symlinks=False).st_mtime > STALE_STAGING_AGE
+            except OSError:
+                continue
+        if stale and entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class AgentTransaction:
+    """Stage all command files for one agent and commit them together."""
+
+    def __init__(self, command_dir: Path):
+        """Initialize the transaction.
+
+        Args:
+            command_dir: The agent's command directory that files are committed into
+        """
+        self.command_dir = command_dir
+        self._staging_dir: Path | None = None
+        self._staged: dict[Path, Path] = {}  # target path -> staged path
+        self.committed = False
+
+    def stage(self, target: Path, content: str) -> None:
+        """Write ``content`` for ``target`` into the staging directory.
+
+        Args:
+            target: Final path of the file inside the command directory
+            content: File content to write
+        """
+        if self.committed:
+            raise RuntimeError("Transaction has already been committed")
+
+        if self._staging_dir is None:
+            self.command_dir.mkdir(parents=True, exist_ok=True)
+            remove_stale_staging(self.command_dir)
+            # Stage inside the command directory so renames never cross filesystems;
+            # the owner lets later runs tell when this directory was abandoned
+            self._staging_dir = Path(
+                tempfile.mkdtemp(
+                    prefix=f"{STAGING_PREFIX}{_staging_owner()}-", dir=self.command_dir
+                )
+            )
+
+        staged_path = self._staging_dir / target.name
+        staged_path.write_text(content, encoding="utf-8")
+        self._staged[target] = staged_path
+
+    def commit(self) -> None:
+        """Flush staged files and swap them into place.
+
+        On failure every already-swapped target is restored (or removed if it
+        did not exist before) and the original exception is re-raised.
+        """
+        if self.committed:
+            raise RuntimeError("Transaction has already been committed")
+        if self._staging_dir is None:
+            self.committed = True
+            return
+
+        # One batched flush of all staged content before anything becomes visible
+        for staged_path in self._staged.values():
+            _fsync_file(staged_path)
+        _fsync_directory(self._staging_dir)
+
+        rollback_dir = self._staging_dir / ".rollback"
+        rollback_dir.mkdir()
+        swapped: list[tuple[Path, Path | None]] = []
+
+        try:
+            for index, (target, staged_path) in enumerate(self._staged.items()):
+                original: Path | None = None
+                if target.exists():
+                    original = rollback_dir / f"{index}-{target.name}"
+                    try:
+                        os.link(target, original)
+                    except OSError:
+                        shutil.copy2(target, original)
+                os.replace(staged_path, target)
+                swapped.append((target, original))
+            _fsync_directory(self.command_dir)
+        except BaseException:
+            self._restore(swapped)
+            self._discard()
+            raise
+
+        self.committed = True
+        self._discard()
+
+    def rollback(self) -> None:
+        """Abandon the transaction, leaving the command directory untouched."""
+        if not self.committed:
+            self._discard()
+
+    def _restore(self, swapped: list[tuple[Path, Path | None]]) -> None:
+        """Undo already-swapped targets in reverse order."""
+        for target, original in reversed(swapped):
+            try:
+                if original is not None:
+                    os.replace(original, target)
+                else:
+                    target.unlink(missing_ok=True)
+            except OSError:
+                # Keep restoring the remaining files even if one fails
+                continue
+        _fsync_directory(self.command_dir)
+
+    def _discard(self) -> None:
+        """Remove the staging directory and everything left inside it."""
+        if self._staging_dir is not None:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+            self._staging_dir = None
+        self._staged.clear()
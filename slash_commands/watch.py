@@ -0,0 +1,180 @@
+"""Watch a prompts directory and regenerate affected slash commands on change."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from mcp_server.prompt_includes import IncludeGraph
+from mcp_server.prompt_utils import load_markdown_prompt
+from slash_commands.config import get_agent_config
+from slash_commands.writer import SlashCommandWriter
+
+# (mtime_ns, size) is enough to notice edits without reading file contents
+Snapshot = dict[Path, tuple[int, int]]
+
+
+def snapshot_prompts(prompts_dir: Path) -> Snapshot:
+    """Return a modification snapshot of every prompt file in ``prompts_dir``."""
+    snapshot: Snapshot = {}
+    for prompt_file in prompts_dir.glob("*.md"):
+        try:
+            stat = prompt_file.stat()
+        except OSError:
+            # File vanished between listing and stat; treat it as deleted
+            continue
+        snapshot[prompt_file] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+@dataclass
+class WatchChanges:
+    """Prompt files that changed between two snapshots."""
+
+    modified: set[Path] = field(default_factory=set)  # Added or edited
+    deleted: set[Path] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.modified or self.deleted)
+
+    def merge(self, other: WatchChanges) -> None:
+        """Fold a later set of changes into this one."""
+        self.modified = (self.modified - other.deleted) | other.modified
+        self.deleted = (self.deleted - other.modified) | other.deleted
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> WatchChanges:
+    """Return the prompt files added, edited, or removed between two snapshots."""
+    modified = {path for path, state in new.items() if old.get(path) != state}
+    deleted = set(old) - set(new)
+    return WatchChanges(modified=modified, deleted=deleted)
+
+
+class PromptWatcher:
+    """Poll a prompts directory and keep generated commands in sync with it."""
+
+    def __init__(
+        self,
+        writer: SlashCommandWriter,
+        poll_interval: float = 0.5,
+        debounce: float = 0.3,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            writer: Writer configured with the prompts directory, agents and target path.
+                It must be non-interactive (``overwrite_action`` set).
+            poll_interval: Seconds between directory polls
+            debounce: Quiet period (seconds) required after the last change before
+                regenerating, so bursts of saves are handled once
+        """
+        if writer.overwrite_action is None:
+            raise ValueError("Watch mode requires a non-interactive overwrite action")
+
+        self.writer = writer
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._snapshot: Snapshot = {}
+        # Generated outputs per source prompt file: output path -> agent key
+        self._outputs: dict[Path, dict[Path, str]] = {}
+        # Partials included by each prompt, so an edited partial regenerates its dependents
+        self._includes = IncludeGraph()
+
+    def initialize(self) -> dict[str, Any]:
+        """Run a full generation and record which outputs belong to each prompt."""
+        prompts = self.writer._load_prompts()
+        self._snapshot = snapshot_prompts(self.writer.prompts_dir)
+        self._includes = IncludeGraph(prompts)
+        result = self.writer.generate(prompts=prompts)
+        self._outputs = {prompt.path: {} for prompt in prompts}
+        for file_info in result["files"]:
+            source = Path(file_info["source_path"])
+            self._outputs.setdefault(source, {})[Path(file_info["path"])] = file_info["agent"]
+        return result
+
+    def poll(self) -> WatchChanges:
+        """Take a new snapshot and return what changed since the last one."""
+        current = snapshot_prompts(self.writer.prompts_dir)
+        changes = diff_snapshots(self._snapshot, current)
+        self._snapshot = current
+        changed_partials = self._includes.changed_partials()
+        if changed_partials:
+            changes.modified |= self._includes.dependents(changed_partials) - changes.deleted
+        return changes
+
+    def wait_for_changes(self, stop_event: threading.Event) -> WatchChanges:
+        """Block until changes settle for the debounce period, or ``stop_event`` is set."""
+        pending = WatchChanges()
+        last_change = 0.0
+        while not stop_event.is_set():
+            changes = self.poll()
+            now = time.monotonic()
+            if changes:
+                pending.merge(changes)
+                last_change = now
+            elif pending and now - last_change >= self.debounce:
+                return pending
+            stop_event.wait(self.poll_interval)
+        return pending
+
+    def apply(self, changes: WatchChanges) -> dict[str, list[str]]:
+        """Regenerate outputs for modified prompts and remove outputs of deleted ones.
+
+        Returns:
+            Dict with ``written``, ``removed`` and ``errors`` path/message lists
+        """
+        summary: dict[str, list[str]] = {"written": [], "removed": [], "errors": []}
+
+        for source in sorted(changes.deleted):
+            summary["removed"].extend(self._remove_outputs(source, keep=set()))
+            self._includes.forget(source)
+
+        for source in sorted(changes.modified):
+            try:
+                prompt = load_markdown_prompt(source)
+                self._includes.track([prompt])
+                result = self.writer.generate(prompts=[prompt])
+            except (OSError, ValueError, RuntimeError) as exc:
+                summary["errors"].append(f"{source}: {exc}")
+                continue
+
+            outputs = {Path(info["path"]): info["agent"] for info in result["files"]}
+            # A renamed or disabled prompt leaves its previous outputs behind
+            summary["removed"].extend(self._remove_outputs(source, keep=set(outputs)))
+            self._outputs[source] = outputs
+            summary["written"].extend(str(path) for path in outputs)
+
+        return summary
+
+    def run(
+        self,
+        stop_event: threading.Event | None = None,
+        on_apply: Callable[[WatchChanges, dict[str, list[str]]], None] | None = None,
+    ) -> None:
+        """Watch until ``stop_event`` is set, applying each debounced batch of changes."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            changes = self.wait_for_changes(stop_event)
+            if not changes:
+                continue
+            summary = self.apply(changes)
+            if on_apply is not None:
+                on_apply(changes, summary)
+
+    def _remove_outputs(self, source: Path, keep: set[Path]) -> list[str]:
+        """Delete generated outputs recorded for ``source`` that are not in ``keep``."""
+        removed: list[str] = []
+        for output_path, agent_key in self._outputs.pop(source, {}).items():
+            if output_path in keep or not output_path.exists():
+                continue
+            # Never delete a file a user has since replaced with their own content
+            if not self.writer._is_generated_file(output_path, get_agent_config(agent_key)):
+                continue
+            if not self.writer.dry_run:
+                output_path.unlink()
+            removed.append(str(output_path))
+        return removed
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
+import codecs
+import contextlib
 import importlib.resources
 import os
 import re
 import shutil
+import time
 
 # tomllib is part of the Python standard library since Python 3.11
 # Project requires Python 3.12+ for compatibility with all dependencies
 import tomllib
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, Literal
@@ -17,9 +21,27 @@ from typing import Any, Literal
 import questionary
 import yaml
 
-from mcp_server.prompt_utils import MarkdownPrompt, load_markdown_prompt
+from mcp_server.prompt_layers import PromptOverlay, default_overlay_cache_path
+from mcp_server.prompt_packs import list_prompt_files
+from mcp_server.prompt_utils import MarkdownPrompt, prompt_hash
+from slash_commands.archive import ArchiveOutput
+from slash_commands.backups import BackupStore
 from slash_commands.config import AgentConfig, get_agent_config, list_agent_keys
-from slash_commands.generators import CommandGenerator
+from slash_commands.diffing import classify_change
+from slash_commands.generators import CommandGenerator, CommandGeneratorProtocol
+from slash_commands.generators import __version__ as generator_version
+from slash_commands.linkstore import LINK_STORE_DIRNAME, LinkMode, LinkStore, is_shared_file
+from slash_commands.manifest import GenerationManifest, ManifestEntry, content_hash
+from slash_commands.planning import (
+    CONFLICT_CATEGORY_LABELS,
+    ConflictCategory,
+    ConflictPolicy,
+    GenerationPlan,
+    PlannedConflict,
+)
+from slash_commands.prompt_cache import load_prompt
+from slash_commands.timing import current_timings, stage
+from slash_commands.transaction import AgentTransaction
 
 
 def _find_package_prompts_dir() -> Path | None:
@@ -63,6 +85,10 @@ def _find_package_prompts_dir() -> Path | None:
 
 OverwriteAction = Literal["cancel", "overwrite", "backup", "overwrite-all"]
 
+# Bytes read from the start (Markdown) or end (TOML) of a file when sniffing
+# whether it was generated; only ambiguous files are read and parsed in full
+SNIFF_BYTES = 8192
+
 
 def prompt_overwrite_action(file_path: Path) -> OverwriteAction:
     """Prompt user for what to do with an existing file.
@@ -90,6 +116,39 @@ def prompt_overwrite_action(file_path: Path) -> OverwriteAction:
     return response  # type: ignore[return-value]
 
 
+def prompt_conflict_policy(category: ConflictCategory, count: int) -> ConflictPolicy:
+    """Prompt user for one policy covering every conflict in a category.
+
+    Args:
+        category: Conflict category being decided
+        count: Number of existing files in the category
+
+    Returns:
+        One of: "skip", "overwrite", "backup", "cancel"
+    """
+    response = questionary.select(
+        f"{CONFLICT_CATEGORY_LABELS[category]}: {count} existing file(s)\n"
+        "What would you like to do with them?",
+        choices=[
+            questionary.Choice("Keep existing files", "skip"),
+            questionary.Choice("Overwrite", "overwrite"),
+            questionary.Choice("Create backups and overwrite", "backup"),
+            questionary.Choice("Cancel", "cancel"),
+        ],
+    ).ask()
+
+    if response is None:
+        # User pressed Ctrl+C or similar
+        return "cancel"
+
+    return response  # type: ignore[return-value]
+
+
+def _marks_generated(meta: Any) -> bool:
+    """Return True if a ``meta`` table marks its file as generated by this tool."""
+    return isinstance(meta, dict) and ("source_prompt" in meta or "version" in meta)
+
+
 def create_backup(file_path: Path) -> Path:
     """Create a timestamped backup of an existing file.
 
@@ -119,6 +178,13 @@ class SlashCommandWriter:
         base_path: Path | None = None,
         overwrite_action: OverwriteAction | None = None,
         is_explicit_prompts_dir: bool = True,
+        transactional: bool = False,
+        backup_store: BackupStore | None = None,
+        diff: bool = False,
+        archive: ArchiveOutput | None = None,
+        link_mode: LinkMode = "copy",
+        link_store: LinkStore | None = None,
+        prompt_layers: Sequence[Path] = (),
     ):
         """Initialize the writer.
 
@@ -130,6 +196,21 @@ class SlashCommandWriter:
             overwrite_action: Global overwrite action to apply. If None, will prompt per file.
             is_explicit_prompts_dir: If True, prompts_dir was explicitly provided by user.
                 If False, use bundled prompts fallback.
+            transactional: If True, stage each agent's files and swap them into place
+                together, rolling back the agent's command directory on failure.
+            backup_store: Content-addressed store to record backups in. If None, backups
+                are written next to the original file.
+            diff: If True, classify each output as created, modified or unchanged
+                compared with the file on disk, with a unified diff for modified files.
+            archive: Write every file into this archive instead of under ``base_path``.
+                Entry names are the output paths relative to ``base_path``.
+            link_mode: ``copy`` writes regular files. ``symlink`` or ``hardlink`` store
+                each unique file once in ``link_store`` and link command files to it;
+                metadata is then agent-neutral so agents sharing a format share files.
+            link_store: Store for linked files. If None, uses ``base_path / .sdd-store``.
+            prompt_layers: Lower-precedence prompt directories beneath ``prompts_dir``,
+                lowest first. A prompt in a higher layer replaces any prompt of the
+                same name below it.
         """
         self.prompts_dir = prompts_dir
         self.agents = agents if agents is not None else list_agent_keys()
@@ -137,47 +218,290 @@ class SlashCommandWriter:
         self.base_path = base_path or Path.cwd()
         self.overwrite_action = overwrite_action
         self.is_explicit_prompts_dir = is_explicit_prompts_dir
+        self.prompt_layers = list(prompt_layers)
+        self._overlay: PromptOverlay | None = None
+        self.transactional = transactional
+        self.backup_store = backup_store
+        self.diff = diff
+        self.archive = archive
+        self.link_mode = link_mode
+        self.link_store = None
+        if link_mode != "copy":
+            self.link_store = link_store or LinkStore(self.base_path / LINK_STORE_DIRNAME)
+        self._generators: dict[str, CommandGeneratorProtocol] = {}  # Link mode, by format
+        # Manifest entries of this run by relative path; None marks a removed file
+        self._manifest_changes: dict[str, ManifestEntry | None] = {}
+        self._source_hash: tuple[MarkdownPrompt, str] | None = None  # Last prompt hashed
+        self._transactions: dict[str, AgentTransaction] = {}  # Open transactions by agent key
         self._global_overwrite = False  # Track if user chose "overwrite-all"
-        self._backups_created = []  # Track backup files created
+        self._planned_actions: dict[Path, ConflictPolicy] = {}  # Decided before writing
+        # Prompts loaded and outputs rendered by plan(), reused by the next run
+        self._planned_prompts: list[MarkdownPrompt] | None = None
+        self._planned_renders: dict[Path, tuple[MarkdownPrompt, str]] = {}
+        self._backups_created = 0  # Backups created during the current run
 
-    def generate(self) -> dict[str, Any]:
+    def generate(self, prompts: Iterable[MarkdownPrompt] | None = None) -> dict[str, Any]:
         """Generate command files for all configured agents.
 
+        Args:
+            prompts: Already-loaded prompts to generate from. If None, prompts are
+                loaded from the prompts directory.
+
         Returns:
             Dict with keys:
             - prompts_loaded: Number of prompts loaded
             - files_written: Number of files written
             - files: List of dicts with path and agent info
             - prompts: List of prompt metadata
+            - backups_created: List of backup file paths
+            - changes: Counts of created/modified/unchanged files (only in diff mode)
+        """
+        files = []
+        prompt_infos = []
+        result: dict[str, Any] = {}
+        for event in self.iter_events(prompts):
+            if event["event"] == "file":
+                files.append({
+                    key: value for key, value in event.items() if key not in {"event", "action"}
+                })
+            elif event["event"] == "prompt":
+                prompt_infos.append({"name": event["name"], "path": event["path"]})
+            elif event["event"] == "summary":
+                result = {key: value for key, value in event.items() if key != "event"}
+
+        result["files"] = files
+        result["prompts"] = prompt_infos
+        result["backups_created"] = [info["backup_path"] for info in files if "backup_path" in info]
+        return result
+
+    def iter_generate(
+        self, prompts: Iterable[MarkdownPrompt] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Generate command files one prompt at a time, yielding a result per prompt.
+
+        Unlike ``generate()``, nothing is accumulated across prompts: each prompt is
+        loaded, rendered and written for every agent, yielded, and then released, so
+        peak memory does not grow with the size of the prompt library.
+
+        Args:
+            prompts: Prompts to generate from. If None, prompt files are loaded lazily
+                from the prompts directory.
+
+        Yields:
+            Dict per prompt with ``name``, ``path`` and ``files`` (the prompt's entries
+            in the ``generate()["files"]`` format)
         """
-        # Load prompts
-        prompts = self._load_prompts()
+        files: list[dict[str, Any]] = []
+        for event in self.iter_events(prompts):
+            if event["event"] == "file":
+                files.append({
+                    key: value for key, value in event.items() if key not in {"event", "action"}
+                })
+            elif event["event"] == "prompt":
+                yield {"name": event["name"], "path": event["path"], "files": files}
+                files = []
+
+    def iter_events(  # noqa: PLR0912 PLR0915
+        self, prompts: Iterable[MarkdownPrompt] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Generate command files, yielding one event per file as soon as it is handled.
+
+        Events are dicts with an ``event`` key:
+
+        - ``file``: a command file was handled. ``action`` is ``written``, ``staged``
+          (transactional mode, visible once the agent commits), ``archived`` or
+          ``dry-run``; the
+          remaining keys match the entries of ``generate()["files"]``.
+        - ``skipped``: a disabled prompt (``reason`` ``disabled``) or an existing file
+          kept by a planned conflict policy (``reason`` ``policy``) was skipped.
+        - ``prompt``: all agents are done with a prompt (``name`` and ``path``).
+        - ``commit``: an agent's staged files were swapped into place.
+        - ``archive``: the archive was completed (``path`` and ``entries``).
+        - ``summary``: emitted last, with ``prompts_loaded``, ``files_written``,
+          ``backups_created`` (a count) and, in diff mode, ``changes``.
+
+        Args:
+            prompts: Already-loaded prompts to generate from. If None, prompt files are
+                loaded lazily, one at a time, from the prompts directory.
+        """
+        # Load prompts lazily unless the caller or plan() already parsed them
+        if prompts is None:
+            prompts = (
+                self._planned_prompts if self._planned_prompts is not None else self._iter_prompts()
+            )
 
         # Get agent configs
         agent_configs = [get_agent_config(key) for key in self.agents]
 
-        # Generate files
-        files = []
+        # Open one staging transaction per agent when running transactionally
+        if self.transactional and not self.dry_run:
+            self._transactions = {
+                agent.key: AgentTransaction(self.base_path / agent.command_dir)
+                for agent in agent_configs
+            }
+
+        # Stream every file into the archive instead of the filesystem
+        if self.archive is not None and not self.dry_run:
+            self.archive.open()
+
+        if self.dry_run:
+            action = "dry-run"
+        elif self.archive is not None:
+            action = "archived"
+        elif self._transactions:
+            action = "staged"
+        else:
+            action = "written"
+
+        timings = current_timings()
+        prompts_loaded = 0
         files_written = 0
-        for prompt in prompts:
-            for agent in agent_configs:
-                file_info = self._generate_file(prompt, agent)
-                if file_info:
-                    files.append(file_info)
+        self._backups_created = 0
+        changes = dict.fromkeys(("created", "modified", "unchanged"), 0)
+        transactional = bool(self._transactions)
+        committed: set[str] = set()
+        try:
+            for prompt in prompts:
+                prompts_loaded += 1
+                prompt_seconds = 0.0
+                for agent in agent_configs:
+                    started = time.perf_counter()
+                    file_info = self._generate_file(prompt, agent)
+                    prompt_seconds += time.perf_counter() - started
+                    if file_info is None:
+                        yield {
+                            "event": "skipped",
+                            "prompt": prompt.name,
+                            "agent": agent.key,
+                            "reason": "disabled",
+                        }
+                        continue
+                    if "skipped" in file_info:
+                        yield {
+                            "event": "skipped",
+                            "prompt": prompt.name,
+                            "agent": agent.key,
+                            "path": file_info["path"],
+                            "reason": file_info["skipped"],
+                        }
+                        continue
+
                     # Only count files that were actually written (not dry run)
                     if not self.dry_run:
                         files_written += 1
-
-        return {
-            "prompts_loaded": len(prompts),
+                    if self.diff:
+                        changes[file_info["status"]] += 1
+                    if timings is not None:
+                        timings.files += 1
+                    yield {"event": "file", "action": action, **file_info}
+                if timings is not None:
+                    timings.add_prompt(prompt.name, prompt_seconds)
+                yield {"event": "prompt", "name": prompt.name, "path": str(prompt.path)}
+
+            # Swap each agent's staged files into place
+            for agent_key, transaction in self._transactions.items():
+                transaction.commit()
+                committed.add(agent_key)
+                yield {"event": "commit", "agent": agent_key}
+
+            if self.archive is not None and not self.dry_run:
+                self.archive.close()
+                yield {
+                    "event": "archive",
+                    "path": str(self.archive.path),
+                    "entries": self.archive.entries,
+                }
+        finally:
+            # Discard anything left staged (no-op for committed transactions)
+            for transaction in self._transactions.values():
+                transaction.rollback()
+            self._transactions = {}
+            # Remove a partial archive (no-op once it was closed)
+            if self.archive is not None:
+                self.archive.abort()
+            # Planned policies and renders apply to a single run
+            self._planned_actions = {}
+            self._planned_prompts = None
+            self._planned_renders = {}
+            # Record the files that reached the disk, even if the run failed part-way
+            self._save_manifest(
+                lambda entry: entry is None or not transactional or entry.agent in committed
+            )
+
+        # Enforce backup retention once per run rather than once per file
+        if self.backup_store is not None and self._backups_created:
+            self.backup_store.collect_garbage()
+        # Delete stored objects that no link uses since this or earlier runs
+        if self.link_store is not None and not self.dry_run:
+            self.link_store.collect_garbage()
+
+        summary: dict[str, Any] = {
+            "event": "summary",
+            "prompts_loaded": prompts_loaded,
             "files_written": files_written,
-            "files": files,
-            "prompts": [{"name": p.name, "path": str(p.path)} for p in prompts],
             "backups_created": self._backups_created,
         }
+        if self.diff:
+            summary["changes"] = changes
+        yield summary
 
     def _load_prompts(self) -> list[MarkdownPrompt]:
         """Load all prompts from the prompts directory."""
+        return list(self._iter_prompts())
+
+    def _iter_prompts(self) -> Iterator[MarkdownPrompt]:
+        """Load prompts from the prompts directory one file at a time."""
+        if self.prompt_layers:
+            yield from self._iter_layered_prompts()
+            return
+
+        with stage("discovery"):
+            prompt_files = self._prompt_files()
+        for prompt_file in prompt_files:
+            with stage("load"):
+                prompt = load_prompt(prompt_file)
+            yield prompt
+
+    def _iter_layered_prompts(self) -> Iterator[MarkdownPrompt]:
+        """Load the winning prompts of the prompt layers one file at a time."""
+        with stage("discovery"):
+            overlay = self._prompt_overlay()
+            pending = overlay.prompt_files()
+        loaded: set[Path] = set()
+        rescanned = False
+        while pending:
+            prompt_file = pending.pop(0)
+            with stage("load"):
+                prompt = load_prompt(prompt_file)
+            loaded.add(prompt_file)
+            if not overlay.wins(prompt) and not rescanned:
+                # Its name was edited in place: rescan the layers once and
+                # continue with the files not loaded yet
+                rescanned = True
+                with stage("discovery"):
+                    overlay.invalidate()
+                    pending = [path for path in overlay.prompt_files() if path not in loaded]
+                if not overlay.wins(prompt):
+                    continue
+            yield prompt
+
+    def _prompt_overlay(self) -> PromptOverlay:
+        """Return the overlay of the prompt layers, with ``prompts_dir`` on top."""
+        if self._overlay is None:
+            self._overlay = PromptOverlay(
+                [*self.prompt_layers, self._prompts_dir()],
+                cache_path=default_overlay_cache_path(),
+            )
+        return self._overlay
+
+    def _prompt_files(self) -> list[Path]:
+        """Return the sorted prompt files, falling back to bundled prompts if allowed."""
+        if self.prompt_layers:
+            return self._prompt_overlay().prompt_files()
+        return list_prompt_files(self._prompts_dir())
+
+    def _prompts_dir(self) -> Path:
+        """Return the prompts directory, falling back to bundled prompts if allowed."""
         # Check if the specified prompts directory exists
         prompts_dir = self.prompts_dir
         if not prompts_dir.exists():
@@ -193,14 +517,11 @@ class SlashCommandWriter:
                 # Explicit path not found, raise error immediately without fallback
                 raise ValueError(f"Prompts directory does not exist: {self.prompts_dir}")
 
-        prompts = []
-        for prompt_file in sorted(prompts_dir.glob("*.md")):
-            prompt = load_markdown_prompt(prompt_file)
-            prompts.append(prompt)
-
-        return prompts
+        return prompts_dir
 
-    def _generate_file(self, prompt: MarkdownPrompt, agent: AgentConfig) -> dict[str, Any] | None:
+    def _generate_file(  # noqa: PLR0912 PLR0915
+        self, prompt: MarkdownPrompt, agent: AgentConfig
+    ) -> dict[str, Any] | None:
         """Generate a command file for a single prompt and agent.
 
         Args:
@@ -214,52 +535,312 @@ class SlashCommandWriter:
         if not prompt.enabled:
             return None
 
-        # Create generator for this agent's format
-        generator = CommandGenerator.create(agent.command_format)
-
-        # Generate command content
-        content = generator.generate(prompt, agent)
-
-        # Determine output path (resolve relative to base_path)
-        # Sanitize file stem: drop any path components and restrict to safe chars
-        safe_stem = Path(prompt.name).name  # remove any directories
-        safe_stem = re.sub(r"[^A-Za-z0-9._-]+", "-", safe_stem).strip("-_.") or "command"
-        filename = f"{safe_stem}{agent.command_file_extension}"
-        output_path = self.base_path / agent.command_dir / filename
+        output_path = self._output_path(prompt, agent)
+
+        # Generate command content, unless plan() already rendered it
+        planned = self._planned_renders.get(output_path)
+        if planned is not None and planned[0] is prompt:
+            content = planned[1]
+        else:
+            content = self._generator_for(agent).generate(prompt, agent)
+
+        # Archive entries never touch existing files on disk
+        if self.archive is not None:
+            member = output_path.relative_to(self.base_path).as_posix()
+            if not self.dry_run:
+                with stage("write"):
+                    self.archive.add(member, content)
+            return {
+                "path": member,
+                "agent": agent.key,
+                "agent_display_name": agent.display_name,
+                "format": agent.command_format.value,
+                "source_path": str(prompt.path),
+                "archive": str(self.archive.path),
+            }
+
+        # Compare against the current file before anything is written
+        change = None
+        if self.diff:
+            with stage("diff"):
+                change = classify_change(output_path, content)
 
         # Handle existing files
-        if output_path.exists() and not self.dry_run:
+        backup_path = None
+        link = None
+        with stage("exists"):
+            exists = output_path.exists()
+        if exists and not self.dry_run:
             action = self._handle_existing_file(output_path)
             if action == "cancel":
                 raise RuntimeError("Cancelled by user")
+            elif action == "skip":
+                return {"path": str(output_path), "agent": agent.key, "skipped": "policy"}
             elif action == "backup":
-                backup_path = create_backup(output_path)
-                self._backups_created.append(str(backup_path))
-
-        # Create parent directories if needed
-        if not self.dry_run:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+                with stage("backup"):
+                    if self.backup_store is not None:
+                        entry = self.backup_store.backup(output_path)
+                        backup_path = self.backup_store.object_path(entry.sha256)
+                    else:
+                        backup_path = create_backup(output_path)
+                self._backups_created += 1
+
+        # Stage the file when running transactionally; it is committed later
+        transaction = self._transactions.get(agent.key)
+        if transaction is not None:
+            with stage("write"):
+                transaction.stage(output_path, content)
+        elif self.link_store is not None and not self.dry_run:
+            with stage("write"):
+                link = self.link_store.link(output_path, content, self.link_mode)
+        elif not self.dry_run:
+            # Create parent directories if needed, then write the file
+            with stage("write"):
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if is_shared_file(output_path):
+                    # Never write through a link into content shared with other files
+                    output_path.unlink()
+                output_path.write_text(content, encoding="utf-8")
 
-        # Write file if not dry run
         if not self.dry_run:
-            output_path.write_text(content, encoding="utf-8")
+            self._record_output(output_path, prompt, agent, content)
 
-        return {
+        file_info: dict[str, Any] = {
             "path": str(output_path),
             "agent": agent.key,
             "agent_display_name": agent.display_name,
             "format": agent.command_format.value,
+            "source_path": str(prompt.path),
+        }
+        if backup_path is not None:
+            file_info["backup_path"] = str(backup_path)
+        if link is not None:
+            file_info["link"] = link
+        if change is not None:
+            file_info["status"] = change.status
+            if change.diff is not None:
+                file_info["diff"] = change.diff
+        return file_info
+
+    def _record_output(
+        self, output_path: Path, prompt: MarkdownPrompt, agent: AgentConfig, content: str
+    ) -> None:
+        """Add a written command file to the manifest changes of this run."""
+        if self._source_hash is None or self._source_hash[0] is not prompt:
+            self._source_hash = (prompt, prompt_hash(prompt))
+        self._manifest_changes[output_path.relative_to(self.base_path).as_posix()] = ManifestEntry(
+            agent=agent.key,
+            source_prompt=prompt.name,
+            source_hash=self._source_hash[1],
+            content_hash=content_hash(content),
+            version=generator_version,
+        )
+
+    def _save_manifest(
+        self, include: Callable[[ManifestEntry | None], bool] = lambda entry: True
+    ) -> None:
+        """Merge this run's manifest changes into the target's manifest."""
+        changes = {
+            relative: entry for relative, entry in self._manifest_changes.items() if include(entry)
         }
+        self._manifest_changes = {}
+        self._source_hash = None
+        if not changes:
+            return
+        # The manifest only speeds up `status`, which falls back to rendering
+        # files without an entry, so failing to save it never fails the run
+        with contextlib.suppress(OSError):
+            manifest = GenerationManifest.load(self.base_path)
+            manifest.update(changes)
+            manifest.save()
+
+    def _generator_for(self, agent: AgentConfig) -> CommandGeneratorProtocol:
+        """Return the generator for an agent's command format."""
+        if self.link_mode == "copy":
+            return CommandGenerator.create(agent.command_format)
+
+        # Linked files are shared between agents and runs, so use agent-neutral
+        # metadata without a per-run timestamp
+        key = agent.command_format.value
+        if key not in self._generators:
+            self._generators[key] = CommandGenerator.create(
+                agent.command_format, agent_neutral=True
+            )
+        return self._generators[key]
+
+    def _output_path(self, prompt: MarkdownPrompt, agent: AgentConfig) -> Path:
+        """Return the output path of a prompt's command file for an agent."""
+        return self.base_path / agent.command_dir / agent.command_filename(prompt.name)
+
+    def remove_outputs(self, prompt_names: Iterable[str]) -> list[dict[str, Any]]:
+        """Delete the command files generated for prompts that no longer exist.
+
+        Files without generated metadata (for example a command a user replaced
+        by hand) are kept. In dry-run mode nothing is deleted.
+
+        Args:
+            prompt_names: Names of the removed prompts
+
+        Returns:
+            List of dicts with the ``path`` and ``agent`` of each removed file
+        """
+        removed = []
+        agent_configs = [get_agent_config(key) for key in self.agents]
+        for name in sorted(set(prompt_names)):
+            for agent in agent_configs:
+                output_path = self.base_path / agent.command_dir / agent.command_filename(name)
+                if not output_path.is_file() or not self._is_generated_file(output_path, agent):
+                    continue
+                if not self.dry_run:
+                    output_path.unlink()
+                    self._manifest_changes[output_path.relative_to(self.base_path).as_posix()] = (
+                        None
+                    )
+                removed.append({"path": str(output_path), "agent": agent.key})
+        self._save_manifest()
+        return removed
+
+    def plan(self, prompts: Iterable[MarkdownPrompt] | None = None) -> GenerationPlan:
+        """Classify every existing output before anything is written.
+
+        Each agent's command directory is listed once; only outputs that already
+        exist are rendered and compared. Existing files are ``unchanged`` (same
+        content apart from ``updated_at``), ``outdated`` (generated by another
+        version of this tool), ``stale`` (written by this version, but the source
+        prompt changed since), ``modified`` (edited after it was generated) or
+        ``differs`` (different, with no manifest entry to tell why).
+
+        The loaded prompts and rendered outputs are reused by the next
+        :meth:`generate` run, so planning does not render anything twice.
+
+        Args:
+            prompts: Prompts to plan for. If None, prompts are loaded from the
+                prompts directory.
+
+        Returns:
+            The plan, to be passed to :meth:`resolve_conflicts`
+        """
+        if prompts is None:
+            prompts = self._planned_prompts = list(self._iter_prompts())
+        agent_configs = [get_agent_config(key) for key in self.agents]
+        manifest = GenerationManifest.load(self.base_path)
+        self._planned_renders = {}
+
+        # Stat all targets in one batch: one directory listing per agent
+        existing: dict[str, set[str]] = {}
+        for agent in agent_configs:
+            try:
+                with os.scandir(self.base_path / agent.command_dir) as entries:
+                    existing[agent.key] = {entry.name for entry in entries if entry.is_file()}
+            except (FileNotFoundError, NotADirectoryError):
+                existing[agent.key] = set()
+
+        plan = GenerationPlan()
+        for prompt in prompts:
+            if not prompt.enabled:
+                continue
+            for agent in agent_configs:
+                output_path = self._output_path(prompt, agent)
+                if output_path.name not in existing[agent.key]:
+                    plan.new_files += 1
+                    continue
+                content = self._generator_for(agent).generate(prompt, agent)
+                self._planned_renders[output_path] = (prompt, content)
+                entry = manifest.entries.get(output_path.relative_to(self.base_path).as_posix())
+                if entry is not None and entry.agent != agent.key:
+                    entry = None
+                category = self._classify_conflict(output_path, content, agent, entry)
+                plan.conflicts.append(PlannedConflict(output_path, agent.key, category))
+        return plan
+
+    def resolve_conflicts(
+        self,
+        plan: GenerationPlan,
+        policies: dict[ConflictCategory, ConflictPolicy] | None = None,
+    ) -> dict[ConflictCategory, ConflictPolicy]:
+        """Decide one policy per conflict category and apply it during generation.
+
+        Args:
+            plan: Plan returned by :meth:`plan`
+            policies: Policies per category. Categories without a policy are
+                prompted for interactively.
+
+        Returns:
+            The policy chosen for each category present in the plan
+
+        Raises:
+            RuntimeError: If the user cancels
+        """
+        chosen: dict[ConflictCategory, ConflictPolicy] = {}
+        for category, conflicts in plan.by_category().items():
+            policy = (policies or {}).get(category) or prompt_conflict_policy(
+                category, len(conflicts)
+            )
+            if policy == "cancel":
+                raise RuntimeError("Cancelled by user")
+            chosen[category] = policy
+
+        self._planned_actions = plan.resolve(chosen)
+        return chosen
+
+    def _classify_conflict(
+        self,
+        output_path: Path,
+        content: str,
+        agent: AgentConfig,
+        entry: ManifestEntry | None = None,
+    ) -> ConflictCategory:
+        """Classify an existing output against its newly rendered content.
+
+        Args:
+            output_path: Existing command file
+            content: Newly rendered content
+            agent: Agent the file belongs to
+            entry: Manifest entry of the file, used to tell user edits apart
+                from generated output whose source prompt changed
+        """
+        if classify_change(output_path, content, include_diff=False).status == "unchanged":
+            return "unchanged"
+        version = self._generated_version(output_path, agent)
+        if version is not None and version != generator_version:
+            return "outdated"
+        if entry is None:
+            return "differs"
+        try:
+            written_as_generated = content_hash(output_path.read_bytes()) == entry.content_hash
+        except OSError:
+            return "differs"
+        return "stale" if written_as_generated else "modified"
 
-    def _handle_existing_file(self, file_path: Path) -> OverwriteAction:
+    def _generated_version(self, file_path: Path, agent: AgentConfig) -> str | None:
+        """Return the tool version recorded in a generated file, if any."""
+        try:
+            content = file_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        if agent.command_format.value == "markdown":
+            meta = self._markdown_meta(content)
+        elif agent.command_format.value == "toml":
+            meta = self._toml_meta(content)
+        else:
+            meta = None
+        version = meta.get("version") if meta else None
+        return str(version) if version is not None else None
+
+    def _handle_existing_file(self, file_path: Path) -> OverwriteAction | ConflictPolicy:
         """Handle an existing file by determining what action to take.
 
         Args:
             file_path: Path to the existing file
 
         Returns:
-            OverwriteAction to apply
+            OverwriteAction (or planned ConflictPolicy) to apply
         """
+        # A policy decided in the planning phase takes precedence
+        if file_path in self._planned_actions:
+            return self._planned_actions[file_path]
+
         # If global overwrite was already set, use it
         if self._global_overwrite:
             return "overwrite"
@@ -292,7 +873,20 @@ class SlashCommandWriter:
         Returns:
             List of dicts with keys: path, agent, agent_display_name, type, reason
         """
-        found_files = []
+        return list(self.iter_generated_files(agents=agents, include_backups=include_backups))
+
+    def iter_generated_files(
+        self, agents: list[str] | None = None, include_backups: bool = True
+    ) -> Iterator[dict[str, Any]]:
+        """Yield files generated by this tool one at a time.
+
+        Args:
+            agents: List of agent keys to search. If None, searches all supported agents.
+            include_backups: If True, includes backup files in the results.
+
+        Yields:
+            Dicts with keys: path, agent, agent_display_name, type, reason
+        """
         agent_keys = list_agent_keys() if agents is None else agents
 
         for agent_key in agent_keys:
@@ -308,13 +902,13 @@ class SlashCommandWriter:
                     if self._is_generated_file(file_path, agent):
                         # Convert Path to string explicitly using os.fspath
                         path_str = os.fspath(file_path)
-                        found_files.append({
+                        yield {
                             "path": path_str,
                             "agent": agent.key,
                             "agent_display_name": agent.display_name,
                             "type": "command",
                             "reason": "Has generated metadata",
-                        })
+                        }
 
                 # Check for backup files
                 if include_backups:
@@ -325,19 +919,17 @@ class SlashCommandWriter:
                         if file_path.is_file() and pattern.match(file_path.name):
                             # Convert Path to string explicitly using os.fspath
                             path_str = os.fspath(file_path)
-                            found_files.append({
+                            yield {
                                 "path": path_str,
                                 "agent": agent.key,
                                 "agent_display_name": agent.display_name,
                                 "type": "backup",
                                 "reason": "Matches backup pattern",
-                            })
+                            }
             except KeyError:
                 # Agent key not found, skip
                 continue
 
-        return found_files
-
     def _is_generated_file(self, file_path: Path, agent: AgentConfig) -> bool:
         """Check if a file was generated by this tool.
 
@@ -348,6 +940,13 @@ class SlashCommandWriter:
         Returns:
             True if the file was generated by this tool
         """
+        try:
+            sniffed = self._sniff_generated_file(file_path, agent)
+        except (OSError, UnicodeDecodeError):
+            return False
+        if sniffed is not None:
+            return sniffed
+
         try:
             content = file_path.read_text(encoding="utf-8")
         except (OSError, UnicodeDecodeError):
@@ -359,6 +958,99 @@ class SlashCommandWriter:
             return self._is_generated_toml(content)
         return False
 
+    def _sniff_generated_file(self, file_path: Path, agent: AgentConfig) -> bool | None:
+        """Decide whether a file was generated by reading only a bounded slice of it.
+
+        Args:
+            file_path: Path to the file to check
+            agent: Agent configuration
+
+        Returns:
+            True or False when the slice is conclusive, None if a full parse is needed
+        """
+        conclusive, meta = self._sniff_meta(file_path, agent)
+        return _marks_generated(meta) if conclusive else None
+
+    def generated_meta(self, file_path: Path, agent: AgentConfig) -> dict[str, Any] | None:
+        """Return the metadata of a generated file, or None if it was not generated.
+
+        Only the header (Markdown) or trailing ``[meta]`` table (TOML) is read
+        unless that slice is inconclusive.
+        """
+        try:
+            conclusive, meta = self._sniff_meta(file_path, agent)
+            if not conclusive:
+                content = file_path.read_text(encoding="utf-8")
+                if agent.command_format.value == "toml":
+                    meta = self._toml_meta(content)
+                else:
+                    meta = self._markdown_meta(content)
+        except (OSError, UnicodeDecodeError):
+            return None
+        return meta if _marks_generated(meta) else None
+
+    def _sniff_meta(
+        self, file_path: Path, agent: AgentConfig
+    ) -> tuple[bool, dict[str, Any] | None]:
+        """Read the metadata of a file from a bounded slice of it.
+
+        Markdown frontmatter sits at the start of the file, and the generator
+        writes the TOML ``[meta]`` table last, so at most :data:`SNIFF_BYTES`
+        are read from the relevant end.
+
+        Args:
+            file_path: Path to the file to check
+            agent: Agent configuration
+
+        Returns:
+            Whether the slice was conclusive, and the metadata found in it
+        """
+        with file_path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            complete = size <= SNIFF_BYTES
+
+            if agent.command_format.value == "markdown":
+                data = handle.read(SNIFF_BYTES)
+                # Incremental decoding tolerates a multi-byte character cut at the end
+                head = codecs.getincrementaldecoder("utf-8")().decode(data, final=complete)
+                if not complete and head.startswith("---") and head.count("---") < 2:
+                    # Frontmatter extends beyond the sniffed head
+                    return False, None
+                return True, self._markdown_meta(head)
+
+            if agent.command_format.value == "toml":
+                if not complete:
+                    handle.seek(size - SNIFF_BYTES)
+                data = handle.read()
+                if complete:
+                    return True, self._toml_meta(data.decode("utf-8"))
+                # Drop continuation bytes of a character cut at the start
+                tail = data.lstrip(bytes(range(0x80, 0xC0))).decode("utf-8")
+                meta = self._sniff_toml_meta(tail)
+                return meta is not None, meta
+
+        return True, None
+
+    def _sniff_toml_meta(self, tail: str) -> dict[str, Any] | None:
+        """Read the trailing ``[meta]`` table of a TOML file.
+
+        Args:
+            tail: The last bytes of the file, decoded
+
+        Returns:
+            The table if it marks the file as generated, None if inconclusive
+        """
+        index = tail.rfind("\n[meta]\n")
+        if index == -1:
+            return None
+        try:
+            data = tomllib.loads(tail[index + 1 :])
+        except tomllib.TOMLDecodeError:
+            # The match was inside a multi-line string; fall back to a full parse
+            return None
+        meta = data.get("meta", {})
+        return meta if _marks_generated(meta) else None
+
     def _is_generated_markdown(self, content: str) -> bool:
         """Check if markdown content was generated by this tool.
 
@@ -368,25 +1060,30 @@ class SlashCommandWriter:
         Returns:
             True if generated by this tool
         """
+        # Check for meta section with source_prompt or version
+        meta = self._markdown_meta(content)
+        return meta is not None and ("source_prompt" in meta or "version" in meta)
+
+    def _markdown_meta(self, content: str) -> dict[str, Any] | None:
+        """Return the ``meta`` table from Markdown frontmatter, if present."""
         # Check for YAML frontmatter with metadata
         if not content.startswith("---"):
-            return False
+            return None
 
         try:
             # Extract YAML frontmatter
             parts = content.split("---", 2)
             if len(parts) < 3:
-                return False
+                return None
 
             frontmatter = yaml.safe_load(parts[1])
             if not isinstance(frontmatter, dict):
-                return False
+                return None
 
-            # Check for meta section with source_prompt or version
             meta = frontmatter.get("meta", {})
-            return isinstance(meta, dict) and ("source_prompt" in meta or "version" in meta)
+            return meta if isinstance(meta, dict) else None
         except (yaml.YAMLError, AttributeError):
-            return False
+            return None
 
     def _is_generated_toml(self, content: str) -> bool:
         """Check if TOML content was generated by this tool.
@@ -397,16 +1094,19 @@ class SlashCommandWriter:
         Returns:
             True if generated by this tool
         """
+        # Check for meta section with source_prompt or version
+        meta = self._toml_meta(content)
+        return meta is not None and ("source_prompt" in meta or "version" in meta)
+
+    def _toml_meta(self, content: str) -> dict[str, Any] | None:
+        """Return the ``[meta]`` table from TOML content, if present."""
         try:
             data = tomllib.loads(content)
-            if not isinstance(data, dict):
-                return False
-
-            # Check for meta section with source_prompt or version
-            meta = data.get("meta", {})
-            return isinstance(meta, dict) and ("source_prompt" in meta or "version" in meta)
         except tomllib.TOMLDecodeError:
-            return False
+            return None
+
+        meta = data.get("meta", {})
+        return meta if isinstance(meta, dict) else None
 
     def cleanup(
         self, agents: list[str] | None = None, include_backups: bool = True, dry_run: bool = False
@@ -421,25 +1121,80 @@ class SlashCommandWriter:
         Returns:
             Dict with keys: files_found, files_deleted, files
         """
-        found_files = self.find_generated_files(agents=agents, include_backups=include_backups)
-
         deleted_files = []
         errors = []
-
-        for file_info in found_files:
-            file_path = Path(file_info["path"])
-            if not dry_run:
-                try:
-                    file_path.unlink()
-                    deleted_files.append(file_info)
-                except OSError as e:
-                    errors.append({"path": str(file_path), "error": str(e)})
+        summary: dict[str, Any] = {}
+
+        for event in self.iter_cleanup(
+            agents=agents, include_backups=include_backups, dry_run=dry_run
+        ):
+            if event["event"] == "error":
+                errors.append({"path": event["path"], "error": event["error"]})
+            elif event["event"] == "summary":
+                summary = event
             else:
-                deleted_files.append(file_info)
+                deleted_files.append({key: value for key, value in event.items() if key != "event"})
 
         return {
-            "files_found": len(found_files),
+            "files_found": summary["files_found"],
             "files_deleted": len(deleted_files),
             "files": deleted_files,
             "errors": errors,
         }
+
+    def iter_cleanup(
+        self, agents: list[str] | None = None, include_backups: bool = True, dry_run: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """Delete generated files, yielding one event per file as soon as it is handled.
+
+        Events are dicts with an ``event`` key: ``deleted`` (or ``would-delete`` in
+        dry-run mode) with the :meth:`find_generated_files` keys, ``error`` with
+        ``path`` and ``error``, and a final ``summary`` with ``files_found``,
+        ``files_deleted`` and ``errors`` counts.
+
+        Args:
+            agents: List of agent keys to clean. If None, cleans all agents.
+            include_backups: If True, includes backup files in cleanup.
+            dry_run: If True, don't delete files but report what would be deleted.
+        """
+        timings = current_timings()
+        files_found = 0
+        files_deleted = 0
+        errors = 0
+
+        found = self.iter_generated_files(agents=agents, include_backups=include_backups)
+        while True:
+            # Time the scan separately from the deletes; the scan runs lazily
+            with stage("scan"):
+                file_info = next(found, None)
+            if file_info is None:
+                break
+
+            files_found += 1
+            if timings is not None:
+                timings.files += 1
+            file_path = Path(file_info["path"])
+            if dry_run:
+                files_deleted += 1
+                yield {"event": "would-delete", **file_info}
+                continue
+            try:
+                with stage("delete"):
+                    file_path.unlink()
+            except OSError as e:
+                errors += 1
+                yield {"event": "error", "path": str(file_path), "error": str(e)}
+            else:
+                files_deleted += 1
+                if file_info["type"] == "command":
+                    relative = file_path.relative_to(self.base_path).as_posix()
+                    self._manifest_changes[relative] = None
+                yield {"event": "deleted", **file_info}
+        self._save_manifest()
+
+        yield {
+            "event": "summary",
+            "files_found": files_found,
+            "files_deleted": files_deleted,
+            "errors": errors,
+        }
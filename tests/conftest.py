@@ -10,6 +10,12 @@ from fastmcp import FastMCP
 from mcp_server.prompt_utils import MarkdownPrompt, load_markdown_prompt
 
 
+@pytest.fixture(autouse=True)
+def isolated_state_home(tmp_path, monkeypatch):
+    """Keep generation manifests out of the real user state directory."""
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+
+
 @pytest.fixture
 def temp_workspace():
     """Create a temporary workspace directory for testing.
@@ -187,3 +193,18 @@ def prompt_with_placeholder_body(tmp_path) -> MarkdownPrompt:
     )
 
     return load_markdown_prompt(prompt_path)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report the measurements recorded by benchmark tests (``pytest -m benchmark``)."""
+    reports = [
+        report
+        for report in terminalreporter.stats.get("passed", [])
+        if "benchmark" in report.keywords and report.user_properties
+    ]
+    if not reports:
+        return
+    terminalreporter.section("benchmarks")
+    for report in reports:
+        for name, value in report.user_properties:
+            terminalreporter.write_line(f"{report.nodeid}: {name} = {value}")
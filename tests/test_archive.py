@@ -0,0 +1,146 @@
+"""Tests for the archive output backend."""
+
+from __future__ import annotations
+
+import tarfile
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from slash_commands.archive import DEFAULT_EPOCH, ArchiveOutput, archive_format, build_archive
+from slash_commands.writer import SlashCommandWriter
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """Create a prompts directory with two prompts."""
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    for name in ("beta", "alpha"):
+        (prompts_dir / f"{name}.md").write_text(
+            f"---\nname: {name}\ndescription: {name} prompt\n---\n# {name}\n"
+        )
+    return prompts_dir
+
+
+def _archive(prompts_dir: Path, target: Path, archive_path: Path) -> dict:
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        base_path=target,
+        archive=ArchiveOutput(archive_path),
+    )
+    return writer.generate()
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("pack.zip", "zip"),
+        ("pack.tar", "tar"),
+        ("pack.tar.gz", "tar.gz"),
+        ("PACK.TGZ", "tar.gz"),
+        ("pack.tar.xz", "tar.xz"),
+        ("pack.tar.zst", "tar.zst"),
+    ],
+)
+def test_archive_format_from_suffix(name, expected):
+    assert archive_format(Path(name)) == expected
+
+
+def test_archive_format_rejects_unknown_suffix():
+    with pytest.raises(ValueError, match="Unsupported archive format"):
+        archive_format(Path("pack.rar"))
+
+
+def test_writer_streams_files_into_tar_archive(prompts_dir, tmp_path):
+    """Test that files are archived in generation order without touching the target."""
+    target = tmp_path / "target"
+    archive_path = tmp_path / "out" / "pack.tar.gz"
+
+    result = _archive(prompts_dir, target, archive_path)
+
+    assert not target.exists()
+    assert not archive_path.with_name("pack.tar.gz.partial").exists()
+    assert result["files_written"] == 4
+    with tarfile.open(archive_path) as archive:
+        members = archive.getmembers()
+        assert [member.name for member in members] == [
+            ".claude/commands/alpha.md",
+            ".gemini/commands/alpha.toml",
+            ".claude/commands/beta.md",
+            ".gemini/commands/beta.toml",
+        ]
+        assert {member.mtime for member in members} == {DEFAULT_EPOCH}
+        assert {(member.uid, member.gid, member.mode) for member in members} == {(0, 0, 0o644)}
+        content = archive.extractfile(members[0]).read().decode("utf-8")
+    assert "# alpha" in content
+    assert result["files"][0]["path"] == ".claude/commands/alpha.md"
+
+
+def test_writer_archives_are_reproducible(prompts_dir, tmp_path, monkeypatch):
+    """Test that identical inputs produce byte-identical archives with SOURCE_DATE_EPOCH."""
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    for suffix in ("zip", "tar.gz"):
+        first = tmp_path / f"first.{suffix}"
+        second = tmp_path / f"second.{suffix}"
+        _archive(prompts_dir, tmp_path, first)
+        _archive(prompts_dir, tmp_path, second)
+        assert first.read_bytes() == second.read_bytes()
+
+    with zipfile.ZipFile(tmp_path / "first.zip") as archive:
+        info = archive.infolist()[0]
+        assert info.date_time == (2023, 11, 14, 22, 13, 20)
+        assert "updated_at: '2023-11-14T22:13:20+00:00'" in archive.read(info).decode("utf-8")
+
+
+def test_tar_zst_archive_with_zstandard_package(tmp_path):
+    """Test that .tar.zst archives fall back to the optional zstandard package."""
+    zstandard = pytest.importorskip("zstandard")
+    archive_path = tmp_path / "pack.tar.zst"
+    output = ArchiveOutput(archive_path)
+    output.open()
+    output.add("a/one.md", "one\n")
+    output.close()
+
+    with (
+        zstandard.ZstdDecompressor().stream_reader(archive_path.open("rb")) as stream,
+        tarfile.open(fileobj=stream, mode="r|") as archive,
+    ):
+        member = next(iter(archive))
+        assert member.name == "a/one.md"
+        assert archive.extractfile(member).read() == b"one\n"
+
+
+def test_writer_removes_partial_archive_on_failure(prompts_dir, tmp_path):
+    """Test that a failed run leaves neither the archive nor its partial file."""
+    archive_path = tmp_path / "pack.zip"
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code"],
+        base_path=tmp_path,
+        archive=ArchiveOutput(archive_path),
+    )
+
+    with (
+        patch.object(ArchiveOutput, "add", side_effect=OSError("disk full")),
+        pytest.raises(OSError, match="disk full"),
+    ):
+        writer.generate()
+
+    assert list(tmp_path.glob("pack.zip*")) == []
+
+
+def test_build_archive_in_memory(tmp_path):
+    """Test that an in-memory archive matches one written to disk."""
+    files = [("a/one.md", "one\n"), ("b/two.md", "two\n")]
+    output = ArchiveOutput(tmp_path / "pack.tar.gz")
+    output.open()
+    for name, content in files:
+        output.add(name, content)
+    output.close()
+
+    assert build_archive("pack.tar.gz", files) == (tmp_path / "pack.tar.gz").read_bytes()
+    assert list(tmp_path.iterdir()) == [tmp_path / "pack.tar.gz"]
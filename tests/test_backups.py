@@ -0,0 +1,141 @@
+"""Tests for the content-addressed backup store."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from slash_commands.backups import BackupStore
+from slash_commands.writer import SlashCommandWriter
+
+
+@pytest.fixture
+def command_file(tmp_path: Path) -> Path:
+    command_file = tmp_path / ".claude" / "commands" / "cmd.md"
+    command_file.parent.mkdir(parents=True)
+    command_file.write_text("version one\n")
+    return command_file
+
+
+def _objects(store: BackupStore) -> list[Path]:
+    return [path for path in (store.root / "objects").glob("*/*") if not path.name.startswith(".")]
+
+
+def test_backup_store_deduplicates_identical_content(tmp_path: Path, command_file: Path):
+    store = BackupStore(tmp_path)
+
+    first = store.backup(command_file)
+    second = store.backup(command_file)
+
+    assert first.sha256 == second.sha256
+    assert first.path == ".claude/commands/cmd.md"
+    assert len(store.entries()) == 2
+    assert len(_objects(store)) == 1
+    assert store.object_path(first.sha256).read_text() == "version one\n"
+
+
+def test_backup_store_restores_by_timestamp(tmp_path: Path, command_file: Path):
+    store = BackupStore(tmp_path)
+
+    with patch("slash_commands.backups.datetime") as mock_datetime:
+        mock_datetime.now.return_value.strftime.return_value = "20250101-000000"
+        store.backup(command_file)
+        command_file.write_text("version two\n")
+        mock_datetime.now.return_value.strftime.return_value = "20250201-000000"
+        store.backup(command_file)
+
+    command_file.write_text("current\n")
+
+    entry = store.restore(command_file, timestamp="202501")
+    assert entry.timestamp == "20250101-000000"
+    assert command_file.read_text() == "version one\n"
+
+    store.restore(command_file)
+    assert command_file.read_text() == "version two\n"
+
+
+def test_backup_store_restore_without_backup_raises(tmp_path: Path, command_file: Path):
+    with pytest.raises(FileNotFoundError, match="No backup found"):
+        BackupStore(tmp_path).restore(command_file)
+
+
+def test_backup_store_keep_backups_collects_unreferenced_objects(
+    tmp_path: Path, command_file: Path
+):
+    store = BackupStore(tmp_path, keep_backups=1)
+    for content in ("one\n", "two\n", "three\n"):
+        command_file.write_text(content)
+        store.backup(command_file)
+
+    result = store.collect_garbage()
+
+    assert result["entries_removed"] == 2
+    assert result["objects_removed"] == 2
+    assert [entry.sha256 for entry in store.entries()] == [p.name for p in _objects(store)]
+    store.restore(command_file)
+    assert command_file.read_text() == "three\n"
+
+
+def test_backup_store_max_bytes_drops_oldest(tmp_path: Path, command_file: Path):
+    store = BackupStore(tmp_path, max_bytes=10)
+    for content in ("a" * 6, "b" * 6):
+        command_file.write_text(content)
+        store.backup(command_file)
+
+    store.collect_garbage()
+
+    entries = store.entries()
+    assert len(entries) == 1
+    assert store.object_path(entries[0].sha256).read_text() == "b" * 6
+
+
+def test_backup_store_max_bytes_counts_shared_objects_once(tmp_path: Path, command_file: Path):
+    store = BackupStore(tmp_path, max_bytes=12)
+    for content in ("a" * 6, "b" * 6, "a" * 6, "c" * 6):
+        command_file.write_text(content)
+        store.backup(command_file)
+
+    store.collect_garbage()
+
+    # Dropping the first "a" entry frees nothing while a later entry still uses it
+    assert [store.object_path(entry.sha256).read_text() for entry in store.entries()] == [
+        "a" * 6,
+        "c" * 6,
+    ]
+
+
+def test_backup_store_entries_for_file(tmp_path: Path, command_file: Path):
+    store = BackupStore(tmp_path)
+    other = command_file.with_name("other.md")
+    other.write_text("other\n")
+    store.backup(command_file)
+    store.backup(other)
+
+    assert [entry.path for entry in store.entries_for(other)] == [".claude/commands/other.md"]
+
+
+def test_writer_records_backups_in_store(tmp_path: Path):
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    (prompts_dir / "cmd.md").write_text("---\nname: cmd\ndescription: Command\n---\n# Cmd\n")
+    output_path = tmp_path / ".claude" / "commands" / "cmd.md"
+    output_path.parent.mkdir(parents=True)
+    output_path.write_text("user content\n")
+
+    store = BackupStore(tmp_path, keep_backups=2)
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code"],
+        base_path=tmp_path,
+        overwrite_action="backup",
+        backup_store=store,
+    )
+    result = writer.generate()
+
+    assert result["backups_created"] == [str(store.object_path(store.entries()[0].sha256))]
+    # No loose .bak files next to the command
+    assert sorted(p.name for p in output_path.parent.iterdir()) == ["cmd.md"]
+    store.restore(output_path)
+    assert output_path.read_text() == "user content\n"
@@ -0,0 +1,108 @@
+"""Tests for the per-agent HTTP command bundles."""
+
+import asyncio
+import io
+import tarfile
+
+import pytest
+from starlette.testclient import TestClient
+
+from mcp_server.bundles import etag_matches, register_bundle_routes
+from mcp_server.generate_tool import register_generate_tool
+from mcp_server.prompts_loader import register_prompts
+
+
+@pytest.fixture
+def bundle_app(mcp_server, temp_prompts_dir):
+    """Register prompts, the renderer and bundle routes on a test server."""
+    prompts = register_prompts(mcp_server, temp_prompts_dir)
+    renderer = register_generate_tool(mcp_server, prompts)
+    cache = register_bundle_routes(mcp_server, renderer)
+    return TestClient(mcp_server.http_app()), renderer, cache
+
+
+def test_bundle_contains_agent_commands(bundle_app):
+    client, _, _ = bundle_app
+
+    response = client.get("/bundles/claude-code.tar.gz")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    with tarfile.open(fileobj=io.BytesIO(response.content)) as archive:
+        names = archive.getnames()
+    assert ".claude/commands/generate-spec.md" in names
+    assert all(name.startswith(".claude/commands/") for name in names)
+
+
+def test_bundle_etag_revalidation(bundle_app):
+    client, _, _ = bundle_app
+
+    first = client.get("/bundles/gemini-cli.tar.gz")
+    etag = first.headers["etag"]
+    second = client.get("/bundles/gemini-cli.tar.gz", headers={"If-None-Match": etag})
+
+    assert etag.startswith('W/"')
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+
+
+def test_bundle_etag_survives_rebuilds(mcp_server, temp_prompts_dir, monkeypatch):
+    """Test that a restarted server serves the same ETag for unchanged prompts."""
+    etags = []
+    for epoch in ("1700000000", "1800000000"):
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", epoch)
+        renderer = register_generate_tool(
+            mcp_server, register_prompts(mcp_server, temp_prompts_dir)
+        )
+        cache = register_bundle_routes(mcp_server, renderer)
+        etags.append(cache.get("cursor").etag)
+        assert cache.get("claude-code").etag != etags[-1]
+
+    assert etags[0] == etags[1]
+
+
+def test_bundle_built_once_per_generation(bundle_app, temp_prompts_dir, mcp_server):
+    client, renderer, cache = bundle_app
+
+    client.get("/bundles/cursor.tar.gz")
+    built = cache.get("cursor")
+    client.get("/bundles/cursor.tar.gz")
+    assert cache.get("cursor") is built
+
+    prompts = register_prompts(mcp_server, temp_prompts_dir)
+    renderer.update(prompts[:1])
+    assert cache.get("cursor") is not built
+
+
+def test_bundle_built_off_the_event_loop(bundle_app, monkeypatch):
+    client, _, cache = bundle_app
+    loops = []
+    build = cache.get
+
+    def get(agent_key):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return build(agent_key)
+
+    monkeypatch.setattr(cache, "get", get)
+
+    assert client.get("/bundles/cursor.tar.gz").status_code == 200
+    assert loops == [None]
+
+
+def test_unknown_agent_is_not_found(bundle_app):
+    client, _, _ = bundle_app
+
+    assert client.get("/bundles/no-such-agent.tar.gz").status_code == 404
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [('"abc"', True), ('W/"abc"', True), ('"x", "abc"', True), ("*", True), ('"x"', False)],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+    assert etag_matches(header, 'W/"abc"') is expected
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import json
+import subprocess
+import zipfile
 from unittest.mock import patch
 
 import pytest
 from typer.testing import CliRunner
 
+from slash_commands.backups import BackupStore
 from slash_commands.cli import app
 from slash_commands.config import AgentConfig, CommandFormat
 
@@ -233,7 +237,7 @@ def test_cli_prompts_for_overwrite_without_yes(mock_prompts_dir, tmp_path):
 
     runner = CliRunner()
     # Don't pass --yes flag to test prompting
-    with patch("slash_commands.writer.prompt_overwrite_action") as mock_prompt:
+    with patch("slash_commands.writer.prompt_conflict_policy") as mock_prompt:
         mock_prompt.return_value = "overwrite"
         result = runner.invoke(
             app,
@@ -292,7 +296,7 @@ def test_cli_reports_backup_creation(mock_prompts_dir, tmp_path):
     output_path.write_text("existing content")
 
     runner = CliRunner()
-    with patch("slash_commands.writer.prompt_overwrite_action") as mock_prompt:
+    with patch("slash_commands.writer.prompt_conflict_policy") as mock_prompt:
         mock_prompt.return_value = "backup"
         result = runner.invoke(
             app,
@@ -319,6 +323,39 @@ def test_cli_reports_backup_creation(mock_prompts_dir, tmp_path):
         assert len(backup_files) > 0
 
 
+def test_cli_decides_conflicts_once_per_category(mock_prompts_dir, tmp_path):
+    """Test that existing files are planned upfront with one decision per category."""
+    (mock_prompts_dir / "second-prompt.md").write_text(
+        "---\nname: second-prompt\ndescription: Second\n---\n# Second\n"
+    )
+    command_dir = tmp_path / ".claude" / "commands"
+    command_dir.mkdir(parents=True)
+    (command_dir / "test-prompt.md").write_text("hand-written content")
+    (command_dir / "second-prompt.md").write_text("more hand-written content")
+
+    runner = CliRunner()
+    with patch("slash_commands.writer.prompt_conflict_policy") as mock_policy:
+        mock_policy.return_value = "skip"
+        result = runner.invoke(
+            app,
+            [
+                "generate",
+                "--prompts-dir",
+                str(mock_prompts_dir),
+                "--agents",
+                "claude-code",
+                "--target-path",
+                str(tmp_path),
+            ],
+        )
+
+    assert result.exit_code == 0
+    mock_policy.assert_called_once_with("differs", 2)
+    assert "Differs from new output" in result.stdout
+    assert (command_dir / "test-prompt.md").read_text() == "hand-written content"
+    assert (command_dir / "second-prompt.md").read_text() == "more hand-written content"
+
+
 def test_cli_interactive_agent_selection_selects_all(mock_prompts_dir, tmp_path):
     """Test that interactive agent selection allows selecting all detected agents."""
     # Create agent directories
@@ -484,7 +521,7 @@ def test_cli_no_agents_detected_exit_code(tmp_path):
 
 
 def test_cli_exit_code_user_cancellation(mock_prompts_dir, tmp_path):
-    """Test that user cancellation during overwrite prompt exits with code 1."""
+    """Test that user cancellation during the conflict prompt exits with code 1."""
     # Create an existing file
     output_path = tmp_path / ".claude" / "commands" / "test-prompt.md"
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -492,7 +529,7 @@ def test_cli_exit_code_user_cancellation(mock_prompts_dir, tmp_path):
 
     runner = CliRunner()
     # Mock overwrite prompt to return "cancel"
-    with patch("slash_commands.writer.prompt_overwrite_action") as mock_prompt:
+    with patch("slash_commands.writer.prompt_conflict_policy") as mock_prompt:
         mock_prompt.return_value = "cancel"
         result = runner.invoke(
             app,
@@ -661,3 +698,587 @@ def test_cli_cleanup_excludes_backups_when_requested(tmp_path):
 
     assert result.exit_code == 0
     assert "No generated files found" in result.stdout
+
+
+def test_cli_generate_targets_from_file(mock_prompts_dir, tmp_path):
+    """Test that --targets-from generates for every listed target and reports a summary."""
+    alice = tmp_path / "alice"
+    bob = tmp_path / "bob"
+    (alice / ".claude").mkdir(parents=True)
+    (bob / ".cursor").mkdir(parents=True)
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text(f"{alice}\n{bob}\n{tmp_path / 'missing'}\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--targets-from",
+            str(targets_file),
+            "--yes",
+        ],
+    )
+
+    assert result.exit_code == 3
+    assert (alice / ".claude" / "commands" / "test-prompt.md").exists()
+    assert (bob / ".cursor" / "commands" / "test-prompt.md").exists()
+    assert "Targets succeeded: 2" in result.stdout
+    assert "Targets failed: 1" in result.stdout
+
+
+def test_cli_generate_targets_from_requires_yes(mock_prompts_dir, tmp_path):
+    """Test that fleet mode refuses to run interactively."""
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text(f"{tmp_path}\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        ["generate", "--prompts-dir", str(mock_prompts_dir), "--targets-from", str(targets_file)],
+    )
+
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize(
+    "option",
+    [["--diff"], ["--backup-store"], ["--keep-backups", "2"], ["--max-backup-bytes", "10"]],
+)
+def test_cli_generate_targets_from_rejects_unsupported_options(mock_prompts_dir, tmp_path, option):
+    """Test that options fleet mode does not implement are rejected, not ignored."""
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text(f"{tmp_path}\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--targets-from",
+            str(targets_file),
+            "--yes",
+            *option,
+        ],
+    )
+
+    assert result.exit_code == 2
+    assert "--targets-from cannot be combined" in result.stdout
+
+
+def test_cli_generate_targets_from_missing_file(mock_prompts_dir, tmp_path):
+    """Test that a missing --targets-from source is a validation error, as in status."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--targets-from",
+            str(tmp_path / "missing.txt"),
+            "--yes",
+        ],
+    )
+
+    assert result.exit_code == 2
+
+
+def test_cli_generate_unreadable_targets_file(mock_prompts_dir, tmp_path):
+    """Test that an unreadable --targets-from file is a clean I/O error."""
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text(f"{tmp_path}\n")
+    runner = CliRunner()
+    with patch("slash_commands.cli.read_targets", side_effect=PermissionError("Permission denied")):
+        result = runner.invoke(
+            app,
+            [
+                "generate",
+                "--prompts-dir",
+                str(mock_prompts_dir),
+                "--targets-from",
+                str(targets_file),
+                "--yes",
+            ],
+        )
+
+    assert result.exit_code == 3
+    assert "I/O error: Permission denied" in result.stdout
+
+
+def test_cli_diff_prints_only_real_changes(mock_prompts_dir, tmp_path):
+    """Test that --diff previews changes without writing files."""
+    runner = CliRunner()
+    base_args = [
+        "generate",
+        "--prompts-dir",
+        str(mock_prompts_dir),
+        "--agents",
+        "claude-code",
+        "--target-path",
+        str(tmp_path),
+    ]
+    runner.invoke(app, [*base_args, "--yes"])
+    output_path = tmp_path / ".claude" / "commands" / "test-prompt.md"
+    output_path.write_text(output_path.read_text().replace("This is a test", "Edited"))
+
+    result = runner.invoke(app, [*base_args, "--diff"])
+
+    assert result.exit_code == 0
+    assert "+This is a test prompt." in result.stdout
+    assert "Modified: 1" in result.stdout
+    assert "Unchanged: 0" in result.stdout
+    assert "Edited" in output_path.read_text()
+
+
+def test_cli_generate_ndjson_streams_events(mock_prompts_dir, tmp_path):
+    """Test that --output ndjson emits one JSON event per file plus a summary."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--agents",
+            "gemini-cli",
+            "--target-path",
+            str(tmp_path),
+            "--yes",
+            "--output",
+            "ndjson",
+        ],
+    )
+
+    assert result.exit_code == 0
+    # CliRunner may mix stderr into stdout; only the JSON lines are events
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [event["event"] for event in events] == ["file", "file", "prompt", "summary"]
+    assert {event["agent"] for event in events[:2]} == {"claude-code", "gemini-cli"}
+    assert all(event["action"] == "written" for event in events[:2])
+    assert events[-1]["files_written"] == 2
+
+
+def test_cli_generate_ndjson_requires_yes(mock_prompts_dir, tmp_path):
+    """Test that NDJSON output refuses to prompt interactively."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--target-path",
+            str(tmp_path),
+            "--output",
+            "ndjson",
+        ],
+    )
+
+    assert result.exit_code == 2
+
+
+def test_cli_cleanup_ndjson_streams_events(tmp_path):
+    """Test that cleanup --output ndjson emits one event per deleted file."""
+    command_dir = tmp_path / ".claude" / "commands"
+    command_dir.mkdir(parents=True, exist_ok=True)
+    generated_file = command_dir / "test-command.md"
+    generated_file.write_text(
+        "---\nname: test-command\nmeta:\n  source_prompt: test\n---\n# Test\n"
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        ["cleanup", "--target-path", str(tmp_path), "--yes", "--output", "ndjson"],
+    )
+
+    assert result.exit_code == 0
+    # CliRunner may mix stderr into stdout; only the JSON lines are events
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert events[0] == {
+        "event": "deleted",
+        "path": str(generated_file),
+        "agent": "claude-code",
+        "agent_display_name": "Claude Code",
+        "type": "command",
+        "reason": "Has generated metadata",
+    }
+    assert events[-1] == {"event": "summary", "files_found": 1, "files_deleted": 1, "errors": 0}
+    assert not generated_file.exists()
+
+
+def test_cli_generate_timings_report(mock_prompts_dir, tmp_path):
+    """Test that --timings prints a per-stage table and throughput."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--target-path",
+            str(tmp_path),
+            "--yes",
+            "--timings",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Timings" in result.stdout
+    assert "normalize" in result.stdout
+    assert "files/s" in result.stdout
+    assert "Slowest" in result.stdout
+
+
+def test_cli_cleanup_ndjson_timings_event(mock_prompts_dir, tmp_path):
+    """Test that --timings adds a final timings event to NDJSON output."""
+    runner = CliRunner()
+    runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--target-path",
+            str(tmp_path),
+            "--yes",
+        ],
+    )
+    result = runner.invoke(
+        app,
+        ["cleanup", "--target-path", str(tmp_path), "--yes", "--output", "ndjson", "--timings"],
+    )
+
+    assert result.exit_code == 0
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    assert [event["event"] for event in events[-2:]] == ["summary", "timings"]
+    assert set(events[-1]["stages"]) == {"scan", "delete"}
+    assert events[-1]["files"] == 1
+
+
+def test_cli_generate_archive(mock_prompts_dir, tmp_path):
+    """Test that --archive writes one archive and leaves the target untouched."""
+    archive_path = tmp_path / "commands.zip"
+    target = tmp_path / "target"
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--target-path",
+            str(target),
+            "--archive",
+            str(archive_path),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Archive:" in result.stdout
+    assert not target.exists()
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.namelist() == [".claude/commands/test-prompt.md"]
+
+
+def test_cli_generate_archive_rejects_unknown_format(mock_prompts_dir, tmp_path):
+    """Test that an unsupported archive suffix is a validation error."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--archive",
+            str(tmp_path / "commands.rar"),
+        ],
+    )
+
+    assert result.exit_code == 2
+
+
+def test_cli_generate_link_mode(mock_prompts_dir, tmp_path):
+    """Test that --link-mode links every agent's command file into the store."""
+    target = tmp_path / "target"
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--agents",
+            "cursor",
+            "--target-path",
+            str(target),
+            "--link-mode",
+            "symlink",
+            "--yes",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Link store:" in result.stdout
+    assert "(1 new object(s), 0 unused object(s) removed)" in result.stdout
+    claude = target / ".claude/commands/test-prompt.md"
+    cursor = target / ".cursor/commands/test-prompt.md"
+    assert claude.is_symlink()
+    assert claude.resolve() == cursor.resolve()
+    assert claude.resolve().is_relative_to((target / ".sdd-store").resolve())
+
+
+def test_cli_generate_yes_with_backup_options_backs_up(mock_prompts_dir, tmp_path):
+    """Test that --yes backs files up before overwriting when a backup option is given."""
+    base_args = [
+        "generate",
+        "--prompts-dir",
+        str(mock_prompts_dir),
+        "--agents",
+        "claude-code",
+        "--target-path",
+        str(tmp_path),
+        "--yes",
+    ]
+    runner = CliRunner()
+    runner.invoke(app, base_args)
+    command_file = tmp_path / ".claude/commands/test-prompt.md"
+    command_file.write_text("edited\n")
+
+    result = runner.invoke(app, [*base_args, "--keep-backups", "2"])
+
+    assert result.exit_code == 0
+    [entry] = BackupStore(tmp_path).entries_for(command_file)
+    assert entry.size == len("edited\n")
+
+
+def test_cli_restore_backup_of_linked_command_file(mock_prompts_dir, tmp_path):
+    """Test that symlinked command files are backed up and restored under their own path."""
+    base_args = [
+        "generate",
+        "--prompts-dir",
+        str(mock_prompts_dir),
+        "--agents",
+        "claude-code",
+        "--target-path",
+        str(tmp_path),
+        "--link-mode",
+        "symlink",
+        "--yes",
+    ]
+    runner = CliRunner()
+    runner.invoke(app, base_args)
+    command_file = tmp_path / ".claude/commands/test-prompt.md"
+    original = command_file.read_text()
+
+    result = runner.invoke(app, [*base_args, "--backup-store"])
+    assert result.exit_code == 0
+    assert len(BackupStore(tmp_path).entries_for(command_file)) == 1
+
+    result = runner.invoke(app, ["restore", str(command_file), "--target-path", str(tmp_path)])
+
+    assert result.exit_code == 0
+    assert not command_file.is_symlink()  # The shared store object is left untouched
+    assert command_file.read_text() == original
+
+
+def test_cli_generate_link_mode_relative_target(mock_prompts_dir, tmp_path, monkeypatch):
+    """Test that symlinks created for a relative --target-path resolve."""
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--target-path",
+            ".",
+            "--link-mode",
+            "symlink",
+            "--yes",
+        ],
+    )
+
+    assert result.exit_code == 0
+    claude = tmp_path / ".claude/commands/test-prompt.md"
+    assert claude.is_symlink()
+    assert claude.resolve().is_relative_to((tmp_path / ".sdd-store").resolve())
+    assert "test-prompt" in claude.read_text()
+
+
+def test_cli_generate_link_mode_rejects_archive(mock_prompts_dir, tmp_path):
+    """Test that --link-mode cannot be combined with --archive."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--link-mode",
+            "hardlink",
+            "--archive",
+            str(tmp_path / "commands.zip"),
+        ],
+    )
+
+    assert result.exit_code == 2
+    assert "--link-mode cannot be combined" in result.stdout
+
+
+def test_cli_generate_since_git_ref(mock_prompts_dir, tmp_path):
+    """Test that --since regenerates changed prompts and removes deleted ones."""
+    repo = mock_prompts_dir.parent
+    (mock_prompts_dir / "old-prompt.md").write_text("---\nname: old-prompt\n---\nOld\n")
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run([*git, "init", "-q"], cwd=repo, check=True)
+    subprocess.run([*git, "add", "prompts"], cwd=repo, check=True)
+    subprocess.run([*git, "commit", "-qm", "init"], cwd=repo, check=True)
+    target = tmp_path / "target"
+    args = [
+        "generate",
+        "--prompts-dir",
+        str(mock_prompts_dir),
+        "--agents",
+        "claude-code",
+        "--target-path",
+        str(target),
+        "--yes",
+    ]
+    runner = CliRunner()
+    assert runner.invoke(app, args).exit_code == 0
+
+    (mock_prompts_dir / "old-prompt.md").unlink()
+    (mock_prompts_dir / "new-prompt.md").write_text("---\nname: new-prompt\n---\nNew\n")
+    result = runner.invoke(app, [*args, "--since", "HEAD"])
+
+    assert result.exit_code == 0
+    assert "1 prompt(s) to generate, 1 deleted" in result.stdout
+    assert "Removed 1 file(s)" in result.stdout
+    commands = target / ".claude/commands"
+    assert sorted(path.name for path in commands.iterdir()) == ["new-prompt.md", "test-prompt.md"]
+
+
+def test_cli_generate_since_unknown_ref(mock_prompts_dir):
+    """Test that an unknown revision is a validation error."""
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--agents",
+            "claude-code",
+            "--since",
+            "no-such-ref",
+            "--yes",
+        ],
+    )
+
+    assert result.exit_code == 2
+
+
+def test_cli_status_reports_drift(mock_prompts_dir, tmp_path):
+    """Test that status lists drifted files and counts every state."""
+    target = tmp_path / "target"
+    runner = CliRunner()
+    common = ["--prompts-dir", str(mock_prompts_dir), "--agents", "claude-code", "--target-path"]
+    runner.invoke(app, ["generate", *common, str(target), "--yes"])
+
+    result = runner.invoke(app, ["status", *common, str(target)])
+    assert result.exit_code == 0
+    assert "1 up-to-date, 0 stale, 0 modified, 0 orphaned" in result.stdout
+
+    (mock_prompts_dir / "test-prompt.md").unlink()
+    result = runner.invoke(app, ["status", *common, str(target), "--output", "ndjson"])
+
+    assert result.exit_code == 0
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    assert events[0]["event"] == "file"
+    assert events[0]["state"] == "orphaned"
+    assert events[0]["source_prompt"] == "test-prompt"
+    assert events[-1] == {
+        "event": "summary",
+        "targets": 1,
+        "up-to-date": 0,
+        "stale": 0,
+        "modified": 0,
+        "orphaned": 1,
+    }
+
+
+def test_cli_status_unreadable_targets_file(mock_prompts_dir, tmp_path):
+    """Test that an unreadable --targets-from file is a clean I/O error."""
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text(f"{tmp_path}\n")
+    runner = CliRunner()
+    with patch("slash_commands.cli.read_targets", side_effect=PermissionError("Permission denied")):
+        result = runner.invoke(
+            app,
+            [
+                "status",
+                "--prompts-dir",
+                str(mock_prompts_dir),
+                "--targets-from",
+                str(targets_file),
+            ],
+        )
+
+    assert result.exit_code == 3
+    assert "I/O error: Permission denied" in result.stdout
+
+
+def test_cli_generate_with_prompt_layers(mock_prompts_dir, tmp_path, monkeypatch):
+    """Test that --prompt-layer adds prompts the top layer does not override."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    org_dir = tmp_path / "org"
+    org_dir.mkdir()
+    (org_dir / "test-prompt.md").write_text("---\nname: test-prompt\n---\nOrg version\n")
+    (org_dir / "org-only.md").write_text("---\nname: org-only\n---\nOrg only\n")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--prompts-dir",
+            str(mock_prompts_dir),
+            "--prompt-layer",
+            str(org_dir),
+            "--agents",
+            "claude-code",
+            "--target-path",
+            str(tmp_path / "target"),
+            "--yes",
+        ],
+    )
+
+    assert result.exit_code == 0, result.stdout
+    commands = tmp_path / "target/.claude/commands"
+    assert "This is a test prompt." in (commands / "test-prompt.md").read_text()
+    assert "Org only" in (commands / "org-only.md").read_text()
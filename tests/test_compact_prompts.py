@@ -0,0 +1,157 @@
+"""Tests for compact in-memory prompts."""
+
+from __future__ import annotations
+
+import gc
+import sys
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+from types import FunctionType, ModuleType
+
+import pytest
+
+from mcp_server.compact_prompts import BODY_COMPRESS_THRESHOLD, CompactPrompt, PromptLibrary
+from mcp_server.generate_tool import CommandRenderer
+from mcp_server.prompt_utils import (
+    MarkdownPrompt,
+    PromptArgumentSpec,
+    load_markdown_prompt,
+    prompt_hash,
+)
+from mcp_server.prompts_loader import register_prompts
+
+PARAGRAPH = "Review the task list, pick the next open sub-task and implement it with tests. "
+
+
+def _prompt(index: int, body_repeat: int = 2) -> MarkdownPrompt:
+    """Build a prompt as load_markdown_prompt would, with fresh objects for every field."""
+    return MarkdownPrompt(
+        path=Path("/srv/prompts/tenant") / f"prompt-{index}.md",
+        name=f"prompt-{index}",
+        description=f"Synthetic prompt {index}",
+        tags={"sdd", ["planning", "execution", "review"][index % 3]},
+        meta={"category": ["spec", "tasks"][index % 2], "allowed-tools": "Read, Write, Bash"},
+        enabled=True,
+        arguments=[
+            PromptArgumentSpec(name="feature", description="Feature to work on", required=True),
+            PromptArgumentSpec(name="scope", description=None, required=False),
+        ],
+        body=f"# Prompt {index}\n\n" + PARAGRAPH * body_repeat,
+        agent_overrides={"cursor": {"description": "Short description"}} if index % 4 else None,
+    )
+
+
+def test_round_trip_and_hash():
+    library = PromptLibrary(compress_bodies=True)
+    prompt = _prompt(1, body_repeat=20)
+
+    compact = library.add(prompt)
+
+    assert compact.compressed
+    assert compact.body == prompt.body
+    assert compact.path == prompt.path
+    assert compact.expand() == prompt
+    assert prompt_hash(compact) == prompt_hash(prompt)
+    assert compact.decorator_kwargs() == prompt.decorator_kwargs()
+
+
+def test_shares_equal_values_between_prompts():
+    library = PromptLibrary()
+    first, second = library.extend([_prompt(1), _prompt(7)])
+
+    assert first.tags is second.tags
+    assert first.meta is second.meta
+    assert first.arguments is second.arguments
+    assert first.directory is second.directory
+    with pytest.raises(TypeError):
+        first.meta["category"] = "changed"  # type: ignore[index]
+    with pytest.raises(AttributeError):
+        first.extra = 1  # type: ignore[attr-defined]
+
+
+def test_shares_only_mappings_of_plain_json_values():
+    library = PromptLibrary()
+    dated, text = library.extend([
+        replace(_prompt(1), name="dated", meta={"since": date(2024, 1, 2)}),
+        replace(_prompt(2), name="text", meta={"since": "2024-01-02"}),
+    ])
+
+    assert dated.meta == {"since": date(2024, 1, 2)}
+    assert text.meta == {"since": "2024-01-02"}
+
+
+def test_body_cache_is_not_confused_by_replaced_prompts():
+    library = PromptLibrary(compress_bodies=True)
+    stale = library.add(_prompt(1, body_repeat=20))
+    library.add(_prompt(1, body_repeat=21))
+    assert stale.body.startswith("# Prompt 1")  # Cached after it was replaced
+    others = [_prompt(index, body_repeat=20) for index in range(2, 10)]
+    del stale
+    gc.collect()
+
+    # New compact prompts may reuse the freed one's memory, and so its id
+    for prompt in library.extend(others):
+        assert prompt.body.startswith(f"# {prompt.name.replace('-', ' ').capitalize()}")
+
+
+def test_compresses_only_large_bodies_and_caches_decompressed():
+    library = PromptLibrary(compress_bodies=True, body_cache_size=1)
+    small = library.add(_prompt(1, body_repeat=1))
+    large = library.add(_prompt(2, body_repeat=20))
+    other = library.add(_prompt(3, body_repeat=20))
+
+    assert len(small.body) < BODY_COMPRESS_THRESHOLD
+    assert not small.compressed
+    assert large.compressed
+    assert large.body is large.body  # Served from the LRU
+    assert other.body != large.body  # Evicts large
+    assert library.get("prompt-2") is large
+    assert len(library) == 3
+
+
+def test_server_keeps_registered_prompts_compact(mcp_server, tmp_path):
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    (prompts_dir / "alpha.md").write_text("---\nname: alpha\ntags: [sdd]\n---\n# Alpha\n")
+    library = PromptLibrary()
+
+    prompts = register_prompts(mcp_server, prompts_dir, library=library)
+
+    assert [type(prompt) for prompt in prompts] == [CompactPrompt]
+    [rendered] = CommandRenderer(prompts).render("claude-code")
+    [expected] = CommandRenderer([load_markdown_prompt(prompts_dir / "alpha.md")]).render(
+        "claude-code"
+    )
+    assert rendered["content"].split("updated_at")[0] == expected["content"].split("updated_at")[0]
+
+
+def _deep_size(root: object) -> int:
+    """Return the size of every object reachable from ``root``, counting shared ones once."""
+    seen: set[int] = set()
+    pending = [root]
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, type | ModuleType | FunctionType):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+@pytest.mark.benchmark
+def test_compact_prompts_memory_benchmark(record_property):
+    """Memory benchmark: bytes per prompt for a 50k-prompt library, before and after."""
+    count = 50_000
+    prompts = [_prompt(index, body_repeat=16) for index in range(count)]
+    plain = _deep_size(prompts)
+    compact = _deep_size(PromptLibrary().extend(prompts))
+    compressed = _deep_size(PromptLibrary(compress_bodies=True).extend(prompts))
+
+    record_property("bytes_per_prompt_markdown", plain // count)
+    record_property("bytes_per_prompt_compact", compact // count)
+    record_property("bytes_per_prompt_compressed", compressed // count)
+    assert compact < plain * 0.75
+    assert compressed < compact / 2
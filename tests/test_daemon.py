@@ -0,0 +1,164 @@
+"""Tests for the generator daemon and its thin client."""
+
+import os
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import typer
+
+from slash_commands.cli import app
+from slash_commands.daemon import GeneratorDaemon
+from slash_commands.daemon_client import SOCKET_ENV_VAR, daemon_eligible, forward, main
+from slash_commands.prompt_cache import PromptCache
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    """Serve a daemon on a temporary socket in a background thread."""
+    socket_path = tmp_path / "daemon.sock"
+    server = GeneratorDaemon(typer.main.get_command(app), socket_path, idle_timeout=0.5)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield server
+    thread.join(timeout=5)
+    assert not socket_path.exists()
+
+
+@pytest.mark.parametrize(
+    ("argv", "expected"),
+    [
+        (["generate", "--yes"], True),
+        (["cleanup", "--dry-run"], False),
+        (["cleanup", "--dry-run", "--yes"], True),
+        (["generate", "--dry-run"], False),
+        (["generate", "--diff", "--agents", "claude-code"], True),
+        (["generate", "--agents", "claude-code"], False),
+        (["watch", "--yes"], False),
+        ([], False),
+    ],
+)
+def test_daemon_eligible(argv, expected):
+    assert daemon_eligible(argv) is expected
+
+
+def test_daemon_runs_forwarded_commands(running_daemon, temp_prompts_dir, tmp_path):
+    target = tmp_path / "target"
+    argv = [
+        "generate",
+        "--prompts-dir",
+        str(temp_prompts_dir),
+        "--agents",
+        "claude-code",
+        "--target-path",
+        str(target),
+        "--yes",
+    ]
+
+    first = forward(argv, running_daemon.socket_path)
+    second = forward(argv, running_daemon.socket_path)
+
+    assert first is not None
+    assert first["exit_code"] == 0
+    assert (target / ".claude/commands/generate-spec.md").exists()
+    assert second is not None
+    assert second["exit_code"] == 0
+    assert second["stdout"] == first["stdout"]
+    # The second run reuses the prompts parsed by the first
+    assert running_daemon.prompt_cache.hits == running_daemon.prompt_cache.misses
+
+
+def test_daemon_runs_forwarded_dry_run(running_daemon, temp_prompts_dir, tmp_path):
+    argv = [
+        "generate",
+        "--prompts-dir",
+        str(temp_prompts_dir),
+        "--agents",
+        "claude-code",
+        "--target-path",
+        str(tmp_path),
+        "--dry-run",
+    ]
+    assert daemon_eligible(argv)
+
+    response = forward(argv, running_daemon.socket_path)
+
+    assert response is not None
+    assert response["exit_code"] == 0
+    assert "Aborted" not in response["stderr"]
+    assert not (tmp_path / ".claude").exists()
+
+
+def test_daemon_reports_exit_codes(running_daemon, temp_prompts_dir, tmp_path):
+    response = forward(
+        [
+            "generate",
+            "--prompts-dir",
+            str(temp_prompts_dir),
+            "--agents",
+            "no-such-agent",
+            "--target-path",
+            str(tmp_path),
+            "--yes",
+        ],
+        running_daemon.socket_path,
+    )
+
+    assert response is not None
+    assert response["exit_code"] == 2
+    assert "Invalid agent key" in response["stderr"]
+
+
+def test_client_skips_daemon_of_another_user(running_daemon, monkeypatch):
+    """Test that the client never sends a request to a socket another user serves."""
+    real_uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: real_uid + 1)
+
+    with patch("slash_commands.daemon_client.start_daemon") as start:
+        assert forward(["generate", "--yes"], running_daemon.socket_path) is None
+
+    start.assert_not_called()
+
+
+def test_client_does_not_rerun_a_request_without_response(tmp_path, monkeypatch, capsys):
+    """Test that a lost response is an error rather than a second, local run."""
+    socket_path = tmp_path / "daemon.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen(1)
+
+    def accept_and_hang_up() -> None:
+        connection, _ = server.accept()
+        with connection, connection.makefile("rb") as stream:
+            stream.readline()  # The request arrives; the daemon dies before replying
+
+    thread = threading.Thread(target=accept_and_hang_up, daemon=True)
+    thread.start()
+    monkeypatch.setenv(SOCKET_ENV_VAR, str(socket_path))
+
+    with patch("slash_commands.cli.main") as cli_main, pytest.raises(SystemExit) as exc_info:
+        main(["generate", "--yes"])
+
+    thread.join(timeout=5)
+    server.close()
+    assert exc_info.value.code == 3
+    cli_main.assert_not_called()
+    assert "No response from the daemon" in capsys.readouterr().err
+
+
+def test_prompt_cache_reparses_changed_files(tmp_path):
+    prompt_file = tmp_path / "alpha.md"
+    prompt_file.write_text("---\nname: alpha\n---\nfirst\n")
+    cache = PromptCache()
+
+    assert cache.load(prompt_file).body == "first"
+    assert cache.load(prompt_file) is cache.load(prompt_file)
+    prompt_file.write_text("---\nname: alpha\n---\nsecond, longer\n")
+
+    assert cache.load(prompt_file).body == "second, longer"
+    assert cache.misses == 2
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from slash_commands.config import SUPPORTED_AGENTS, AgentConfig
-from slash_commands.detection import detect_agents
+from slash_commands.detection import compile_detection_plan, detect_agents, scan_agents
 
 
 @pytest.fixture(scope="module")
@@ -57,3 +58,48 @@ def test_detect_agents_deduplicates_and_orders_results(tmp_path: Path):
 
     assert detected_keys == ["claude-code", "cursor"]
     assert all(detected_keys.count(key) == 1 for key in detected_keys)
+
+
+def test_detection_plan_merges_overlapping_directories():
+    plan = compile_detection_plan(SUPPORTED_AGENTS)
+    paths = [path.as_posix() for path in plan.paths]
+
+    assert len(paths) == len(set(paths))
+    # Shared prefixes appear once and always before their descendants
+    assert paths.count(".codeium") == 1
+    assert paths.index(".codeium") < paths.index(".codeium/windsurf")
+    assert paths.index(".config") < paths.index(".config/Code")
+    assert paths.index(".config/Code") < paths.index(".config/Code/User/prompts")
+
+
+def test_scan_agents_reports_detected_and_installed_state(tmp_path: Path):
+    (tmp_path / ".codeium" / "windsurf").mkdir(parents=True)
+    (tmp_path / ".claude" / "commands").mkdir(parents=True)
+
+    statuses = {status.agent.key: status for status in scan_agents(tmp_path)}
+
+    assert statuses["windsurf"].detected
+    assert not statuses["windsurf"].installed
+    assert statuses["claude-code"].detected
+    assert statuses["claude-code"].installed
+    assert not statuses["cursor"].detected
+    assert not statuses["cursor"].installed
+
+
+def test_scan_agents_skips_nested_lookups_when_parent_missing(tmp_path: Path):
+    (tmp_path / ".claude").mkdir()
+
+    with patch.object(Path, "exists", autospec=True, side_effect=Path.exists) as mock_exists:
+        scan_agents(tmp_path)
+
+    # Only children of existing top-level directories are looked up individually
+    looked_up = {
+        call.args[0].relative_to(tmp_path).as_posix() for call in mock_exists.call_args_list
+    }
+    assert looked_up == {".claude/commands"}
+
+
+def test_scan_agents_handles_missing_base_directory(tmp_path: Path):
+    statuses = scan_agents(tmp_path / "missing")
+
+    assert not any(status.detected or status.installed for status in statuses)
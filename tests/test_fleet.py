@@ -0,0 +1,81 @@
+"""Tests for fleet-mode generation across many target roots."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from mcp_server.prompt_utils import load_markdown_prompt
+from slash_commands.fleet import generate_fleet, read_targets
+
+
+@pytest.fixture
+def fleet_prompts(tmp_path):
+    """Return pre-parsed prompts shared by every target."""
+    prompt_file = tmp_path / "fleet-prompt.md"
+    prompt_file.write_text(
+        """---
+name: fleet-prompt
+description: Prompt used for fleet tests
+---
+# Fleet Prompt
+""",
+        encoding="utf-8",
+    )
+    return [load_markdown_prompt(prompt_file)]
+
+
+def test_read_targets_from_file_skips_comments_and_duplicates(tmp_path: Path):
+    targets_file = tmp_path / "targets.txt"
+    targets_file.write_text("# fleet\n/home/a\n\n/home/b\n/home/a\n", encoding="utf-8")
+
+    assert read_targets(str(targets_file)) == [Path("/home/a"), Path("/home/b")]
+
+
+def test_read_targets_from_glob(tmp_path: Path):
+    for name in ("alice", "bob"):
+        (tmp_path / "homes" / name).mkdir(parents=True)
+    (tmp_path / "homes" / "README").write_text("not a target")
+
+    targets = read_targets(str(tmp_path / "homes" / "*"))
+
+    assert targets == [tmp_path / "homes" / "alice", tmp_path / "homes" / "bob"]
+
+
+def test_read_targets_rejects_missing_file(tmp_path: Path):
+    with pytest.raises(ValueError, match="Targets file does not exist"):
+        read_targets(str(tmp_path / "missing.txt"))
+
+
+def test_generate_fleet_detects_agents_per_target(tmp_path: Path, fleet_prompts):
+    alice = tmp_path / "alice"
+    bob = tmp_path / "bob"
+    carol = tmp_path / "carol"
+    (alice / ".claude").mkdir(parents=True)
+    (bob / ".gemini").mkdir(parents=True)
+    carol.mkdir()
+
+    results = generate_fleet(fleet_prompts, [alice, bob, carol])
+
+    assert [result.target for result in results] == [alice, bob, carol]
+    assert results[0].agents == ["claude-code"]
+    assert (alice / ".claude" / "commands" / "fleet-prompt.md").exists()
+    assert results[1].agents == ["gemini-cli"]
+    assert (bob / ".gemini" / "commands" / "fleet-prompt.toml").exists()
+    assert results[2].skipped
+    assert results[2].ok
+
+
+def test_generate_fleet_continues_after_target_errors(tmp_path: Path, fleet_prompts):
+    good = tmp_path / "good"
+    good.mkdir()
+    missing = tmp_path / "missing"
+
+    results = generate_fleet(fleet_prompts, [missing, good], agents=["cursor"])
+
+    assert not results[0].ok
+    assert "does not exist" in results[0].error
+    assert results[1].ok
+    assert results[1].files_written == 1
+    assert (good / ".cursor" / "commands" / "fleet-prompt.md").exists()
@@ -0,0 +1,112 @@
+"""Tests for the generate-slash-commands MCP tool."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+from fastmcp import Client
+
+from mcp_server.generate_tool import (
+    GENERATE_TOOL_NAME,
+    CommandRenderer,
+    RenderCache,
+    register_generate_tool,
+)
+from mcp_server.prompts_loader import register_prompts
+
+
+@pytest.fixture
+def registered(mcp_server, temp_prompts_dir):
+    """Register the prompts and the generate tool on a test server."""
+    prompts = register_prompts(mcp_server, temp_prompts_dir)
+    renderer = register_generate_tool(mcp_server, prompts)
+    return mcp_server, renderer
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = RenderCache(maxsize=2)
+    cache.get_or_render(("a", "agent", "1"), lambda: "A")
+    cache.get_or_render(("b", "agent", "1"), lambda: "B")
+    cache.get_or_render(("a", "agent", "1"), lambda: "unused")
+    cache.get_or_render(("c", "agent", "1"), lambda: "C")
+
+    assert len(cache) == 2
+    assert cache.get_or_render(("a", "agent", "1"), lambda: "new") == "A"
+    assert cache.get_or_render(("b", "agent", "1"), lambda: "new") == "new"
+
+
+def test_render_cache_is_shared_safely_between_threads():
+    cache = RenderCache(maxsize=4)
+
+    def lookups(offset: int) -> None:
+        for index in range(2000):
+            name = str((index + offset) % 8)
+            assert cache.get_or_render((name, "agent", "1"), lambda name=name: name) == name
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lookups, range(8)))
+
+    assert len(cache) == 4
+    assert cache.hits + cache.misses == 8 * 2000
+
+
+def test_renderer_renders_from_several_threads(registered):
+    _, renderer = registered
+    expected = renderer.render("claude-code")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: renderer.render("claude-code"), range(16)))
+
+    assert results == [expected] * 16
+
+
+def test_renderer_reuses_cached_output(registered):
+    _, renderer = registered
+
+    first = renderer.render("claude-code")
+    second = renderer.render("claude-code")
+
+    assert first == second
+    assert renderer.cache.misses == len(first)
+    assert renderer.cache.hits == len(first)
+
+
+def test_renderer_selects_prompts_and_paths(registered):
+    _, renderer = registered
+
+    files = renderer.render("gemini-cli", ["manage-tasks"])
+
+    assert [file["path"] for file in files] == [".gemini/commands/manage-tasks.toml"]
+    assert "prompt = " in files[0]["content"]
+
+
+def test_renderer_rejects_unknown_agent_and_prompt(registered):
+    _, renderer = registered
+
+    with pytest.raises(ValueError, match="Unknown agent"):
+        renderer.render("no-such-agent")
+    with pytest.raises(ValueError, match="Unknown prompts: missing"):
+        renderer.render("claude-code", ["missing"])
+
+
+def test_generate_tool_over_session(registered):
+    mcp_server, _ = registered
+
+    async def call_tool():
+        async with Client(mcp_server) as client:
+            return await client.call_tool(GENERATE_TOOL_NAME, {"agent": "claude-code"})
+
+    result = anyio.run(call_tool)
+
+    paths = [file["path"] for file in result.structured_content["result"]]
+    assert ".claude/commands/manage-tasks.md" in paths
+
+
+def test_renderer_hashes_prompt_content(temp_prompts_dir, mcp_server):
+    prompts = register_prompts(mcp_server, temp_prompts_dir)
+    cache = RenderCache()
+    CommandRenderer(prompts, cache).render("claude-code")
+    CommandRenderer(register_prompts(mcp_server, temp_prompts_dir), cache).render("claude-code")
+
+    # Re-parsed but identical prompts hit the shared cache
+    assert cache.misses == cache.hits
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import random
+import time
 import tomllib
 
 import pytest
@@ -9,6 +11,7 @@ from slash_commands.config import get_agent_config
 from slash_commands.generators import (
     MarkdownCommandGenerator,
     TomlCommandGenerator,
+    _normalize_output,
 )
 
 
@@ -197,3 +200,87 @@ def test_toml_generator_snapshot_regression(sample_prompt):
     assert isinstance(data["prompt"], str)
     assert "meta" in data
     assert isinstance(data["meta"], dict)
+
+
+def _reference_normalize_output(content: str) -> str:
+    """The original multi-copy normalizer, kept as a behavioural reference."""
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+    result = "\n".join(line.rstrip() for line in content.splitlines())
+    if result and not result.endswith("\n"):
+        result += "\n"
+    return result
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "\n",
+        "\n\n",
+        "text",
+        "text\n",
+        "text\n\n\n",
+        "text  \n\t\nmore\t \r\n",
+        "a\r\r\nb\rc",
+        "a\n  ",
+        "a\n\n  ",
+        "form\x0cfeed\x0bvertical\x1cfile\x85next\u2028line",
+        "unicode\u3000\nspace\xa0\n",
+        "unit\x1f\nseparator",
+    ],
+)
+def test_normalize_output_matches_reference(content):
+    assert _normalize_output(content) == _reference_normalize_output(content)
+
+
+def test_normalize_output_matches_reference_on_random_input():
+    rng = random.Random(1234)
+    alphabet = ["a", " ", "\t", "\n", "\r", "\r\n", "\x0b", "\x1f", "\x85", "\xa0", "\u3000"]
+    for _ in range(5000):
+        content = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert _normalize_output(content) == _reference_normalize_output(content), repr(content)
+
+
+def test_normalize_output_returns_normalized_content_without_copying():
+    content = "---\nname: sample\n---\n\n# Body\n\nText with trailing text.\n"
+    assert _normalize_output(content) is content
+
+
+def _best_time(func, content: str, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _large_bodies() -> tuple[str, str]:
+    line = "Knowledge base entry with `inline code`, links and prose of typical length.\n"
+    clean = "---\nname: kb\n---\n\n" + line * 50_000  # ~4 MB, already normalized
+    dirty = ("Hard break with trailing spaces.  \r\n" + line) * 25_000
+    return clean, dirty
+
+
+def test_normalize_output_fast_path_on_large_bodies():
+    """Multi-MB normalized bodies skip the rewrite; others match the reference."""
+    clean, dirty = _large_bodies()
+
+    assert _normalize_output(clean) is clean
+    normalized = _normalize_output(dirty)
+    assert normalized is not dirty
+    assert normalized == _reference_normalize_output(dirty)
+
+
+@pytest.mark.benchmark
+def test_normalize_output_benchmark_on_large_bodies(record_property):
+    """Micro-benchmark: multi-MB bodies, against the reference implementation."""
+    clean, dirty = _large_bodies()
+
+    for label, content in (("clean", clean), ("dirty", dirty)):
+        # Best-of-N timings keep this stable on loaded machines
+        record_property(f"{label}_seconds", round(_best_time(_normalize_output, content), 4))
+        record_property(
+            f"{label}_reference_seconds",
+            round(_best_time(_reference_normalize_output, content), 4),
+        )
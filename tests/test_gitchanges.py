@@ -0,0 +1,66 @@
+"""Tests for finding prompts changed since a git revision."""
+
+from __future__ import annotations
+
+import subprocess
+
+import pytest
+
+from slash_commands.gitchanges import prompt_changes_since
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _prompt(name: str, body: str = "Body") -> str:
+    return f"---\nname: {name}\ndescription: {name}\n---\n{body}\n"
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Create a git repository with a committed prompts directory."""
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    for name in ("alpha", "beta", "gamma", "delta"):
+        (prompts_dir / f"{name}.md").write_text(_prompt(name))
+    (tmp_path / "README.md").write_text("outside the prompts directory\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", "init")
+    return prompts_dir
+
+
+def test_prompt_changes_since(repo):
+    (repo / "alpha.md").write_text(_prompt("alpha", "Edited"))
+    (repo / "beta.md").unlink()
+    _git(repo, "mv", "gamma.md", "gamma-renamed.md")
+    (repo / "epsilon.md").write_text(_prompt("epsilon"))
+    (repo / "notes.txt").write_text("not a prompt\n")
+    (repo.parent / "README.md").write_text("changed\n")
+
+    changes = prompt_changes_since(repo, "HEAD")
+
+    assert changes.modified == [repo / "alpha.md", repo / "epsilon.md", repo / "gamma-renamed.md"]
+    assert changes.deleted == [repo / "beta.md", repo / "gamma.md"]
+    assert changes.previous_names == {"alpha", "beta", "gamma"}
+    # Other files may be partials included by unchanged prompts
+    assert changes.partials == [repo / "notes.txt"]
+
+
+def test_no_changes(repo):
+    changes = prompt_changes_since(repo, "HEAD")
+
+    assert changes.modified == []
+    assert changes.deleted == []
+
+
+@pytest.mark.parametrize("ref", ["no-such-ref", "--output=x"])
+def test_invalid_revision(repo, ref):
+    with pytest.raises(ValueError):
+        prompt_changes_since(repo, ref)
+
+
+def test_not_a_repository(tmp_path):
+    with pytest.raises(ValueError, match="git rev-parse failed"):
+        prompt_changes_since(tmp_path, "HEAD")
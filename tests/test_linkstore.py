@@ -0,0 +1,160 @@
+"""Tests for the shared link store."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from slash_commands.linkstore import GC_GRACE_PERIOD, LinkStore, is_shared_file
+from slash_commands.writer import SlashCommandWriter
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """Create a prompts directory with one prompt."""
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    (prompts_dir / "alpha.md").write_text(
+        "---\nname: alpha\ndescription: alpha prompt\n---\n# alpha\n"
+    )
+    return prompts_dir
+
+
+def test_put_stores_each_content_once(tmp_path):
+    store = LinkStore(tmp_path / "store")
+
+    first = store.put("hello\n")
+    second = store.put("hello\n")
+
+    assert first == second
+    assert first.read_text() == "hello\n"
+    assert store.objects_created == 1
+    assert first.stat().st_mode & 0o222 == 0
+
+
+@pytest.mark.parametrize("mode", ["symlink", "hardlink"])
+def test_link_replaces_existing_file_without_writing_through(tmp_path, mode):
+    store = LinkStore(tmp_path / "store")
+    target = tmp_path / "commands" / "alpha.md"
+
+    assert store.link(target, "one\n", mode) == mode
+    object_path = store.put("one\n")
+    assert is_shared_file(target)
+
+    store.link(target, "two\n", mode)
+
+    assert target.read_text() == "two\n"
+    assert object_path.read_text() == "one\n"
+
+
+def test_link_falls_back_to_copy(tmp_path):
+    store = LinkStore(tmp_path / "store")
+    target = tmp_path / "commands" / "alpha.md"
+
+    with patch("slash_commands.linkstore.os.link", side_effect=OSError("cross-device")):
+        assert store.link(target, "one\n", "hardlink") == "copy"
+
+    assert target.read_text() == "one\n"
+    assert not is_shared_file(target)
+
+
+@pytest.mark.parametrize("mode", ["symlink", "hardlink"])
+def test_writer_links_agents_with_identical_content(prompts_dir, tmp_path, mode):
+    target = tmp_path / "target"
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "cursor", "gemini-cli"],
+        base_path=target,
+        overwrite_action="overwrite",
+        link_mode=mode,
+    )
+
+    result = writer.generate()
+
+    assert {file["link"] for file in result["files"]} == {mode}
+    claude = target / ".claude/commands/alpha.md"
+    cursor = target / ".cursor/commands/alpha.md"
+    assert claude.read_bytes() == cursor.read_bytes()
+    assert "claude-code" not in claude.read_text()
+    # One object for the Markdown agents, one for the TOML agent
+    assert writer.link_store is not None
+    assert writer.link_store.objects_created == 2
+
+
+def test_writer_reuses_objects_across_runs(prompts_dir, tmp_path, monkeypatch):
+    """Test that unchanged prompts link to the same objects on every run."""
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    target = tmp_path / "target"
+    writers = [
+        SlashCommandWriter(
+            prompts_dir=prompts_dir,
+            agents=["claude-code"],
+            base_path=target,
+            overwrite_action="overwrite",
+            link_mode="symlink",
+        )
+        for _ in range(2)
+    ]
+
+    for writer in writers:
+        writer.generate()
+
+    assert [writer.link_store.objects_created for writer in writers] == [1, 0]
+    assert "updated_at" not in (target / ".claude/commands/alpha.md").read_text()
+
+
+def _age(root: Path) -> None:
+    old = os.path.getmtime(root) - GC_GRACE_PERIOD - 1
+    for path in root.rglob("*"):
+        os.utime(path, (old, old), follow_symlinks=False)
+
+
+@pytest.mark.parametrize("mode", ["symlink", "hardlink"])
+def test_collect_garbage_removes_unreferenced_objects(tmp_path, mode):
+    store = LinkStore(tmp_path / "store")
+    target = tmp_path / "commands" / "alpha.md"
+    store.link(target, "one\n", mode)
+    old_object = store.put("one\n")
+    store.link(target, "two\n", mode)
+    store.link(tmp_path / "commands" / "beta.md", "three\n", mode)
+    (tmp_path / "commands" / "beta.md").unlink()
+    _age(store.root)
+    young = store.put("four\n")  # Not linked yet, as during a concurrent run
+
+    result = store.collect_garbage()
+
+    assert result == {"objects_removed": 2, "bytes_freed": len("one\n") + len("three\n")}
+    assert not old_object.exists()
+    assert young.exists()
+    assert target.read_text() == "two\n"
+    assert len(list((store.root / "links").glob("*/*"))) == 1
+
+
+def test_copy_mode_does_not_write_through_existing_links(prompts_dir, tmp_path):
+    target = tmp_path / "target"
+    SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code"],
+        base_path=target,
+        overwrite_action="overwrite",
+        link_mode="hardlink",
+    ).generate()
+    output = target / ".claude/commands/alpha.md"
+    object_path = next(
+        path for path in (target / ".sdd-store/objects").rglob("*") if path.is_file()
+    )
+    shared = object_path.read_text()
+
+    SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code"],
+        base_path=target,
+        overwrite_action="overwrite",
+    ).generate()
+
+    assert not is_shared_file(output)
+    assert "claude-code" in output.read_text()
+    assert object_path.read_text() == shared
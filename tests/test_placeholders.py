@@ -0,0 +1,64 @@
+"""Tests for single-pass placeholder substitution."""
+
+from __future__ import annotations
+
+from mcp_server.prompt_utils import PromptArgumentSpec
+from slash_commands.placeholders import (
+    Placeholder,
+    build_arguments_section,
+    compile_placeholders,
+    render_placeholders,
+)
+
+ARGUMENTS = (
+    PromptArgumentSpec(name="query", description="Search query", required=True),
+    PromptArgumentSpec(name="format", description=None, required=False),
+)
+
+
+def test_compile_splits_body_into_segments():
+    """Test that a body is tokenized once into literals and placeholders."""
+    plan = compile_placeholders("Use `$ARGUMENTS` then $ARGUMENTS and {{args}}.")
+
+    assert plan.segments == (
+        "Use ",
+        Placeholder(kind="arguments", text="`$ARGUMENTS`"),
+        " then ",
+        Placeholder(kind="arguments", text="$ARGUMENTS"),
+        " and ",
+        Placeholder(kind="args", text="{{args}}"),
+        ".",
+    )
+    assert plan.kinds == {"arguments", "args"}
+    assert compile_placeholders("Use `$ARGUMENTS` then $ARGUMENTS and {{args}}.") is plan
+
+
+def test_render_substitutes_requested_kinds_only():
+    """Test that placeholders of kinds not requested are kept verbatim."""
+    body = "Args:\n`$ARGUMENTS`\nNames: {{args}}"
+    section = build_arguments_section(ARGUMENTS)
+
+    assert render_placeholders(body, ARGUMENTS, ["arguments"]) == (
+        f"Args:\n{section}\nNames: {{{{args}}}}"
+    )
+    assert render_placeholders(body, ARGUMENTS, ["arguments", "args"]) == (
+        f"Args:\n{section}\nNames: query, format"
+    )
+    assert section == "- `<query>` (required): Search query\n- `[format]` (optional): "
+
+
+def test_render_returns_body_without_placeholders_unchanged():
+    """Test the fast path for bodies without placeholders."""
+    body = "No placeholders here, just $ and {{braces}}."
+
+    assert render_placeholders(body, ARGUMENTS, ["arguments", "args"]) is body
+    assert compile_placeholders("").segments == ("",)
+
+
+def test_substituted_text_is_not_rescanned():
+    """Test that substituted values are not expanded again."""
+    arguments = (PromptArgumentSpec(name="{{args}}", description="$ARGUMENTS", required=True),)
+
+    rendered = render_placeholders("$ARGUMENTS", arguments, ["arguments", "args"])
+
+    assert rendered == "- `<{{args}}>` (required): $ARGUMENTS"
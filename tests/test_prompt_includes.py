@@ -0,0 +1,145 @@
+"""Tests for prompt includes (partials) and their dependency graph."""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from mcp_server import prompt_includes
+from mcp_server.generate_tool import CommandRenderer
+from mcp_server.prompt_includes import IncludeGraph
+from mcp_server.prompt_utils import load_markdown_prompt
+from slash_commands.prompt_cache import PromptCache
+from slash_commands.watch import PromptWatcher
+from slash_commands.writer import SlashCommandWriter
+
+
+def _write(path: Path, text: str, mtime_ns: int | None = None) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        # Make edits visible regardless of filesystem timestamp granularity
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+@pytest.fixture
+def prompts_dir(tmp_path: Path) -> Path:
+    prompts_dir = tmp_path / "prompts"
+    _write(prompts_dir / "partials/commit.md", "Commit often.\n<!-- include: partials/sign.md -->")
+    _write(prompts_dir / "partials/sign.md", "Sign your commits.\n")
+    _write(
+        prompts_dir / "alpha.md",
+        "---\nname: alpha\n---\n# Alpha\n\n<!-- include: partials/commit.md -->\n\nDone.\n",
+    )
+    _write(
+        prompts_dir / "beta.md",
+        "---\nname: beta\n---\n# Beta\n<!-- include: partials/commit.md -->\n",
+    )
+    _write(prompts_dir / "gamma.md", "---\nname: gamma\n---\n# Gamma\n")
+    return prompts_dir
+
+
+def test_expands_nested_includes(prompts_dir: Path):
+    alpha = load_markdown_prompt(prompts_dir / "alpha.md")
+
+    assert alpha.body == "# Alpha\n\nCommit often.\nSign your commits.\n\nDone."
+    assert [include.path for include in alpha.includes] == [
+        prompts_dir / "partials/commit.md",
+        prompts_dir / "partials/sign.md",
+    ]
+    assert load_markdown_prompt(prompts_dir / "gamma.md").includes == ()
+
+
+def test_shares_expanded_partials(prompts_dir: Path):
+    load_markdown_prompt(prompts_dir / "alpha.md")
+    hits = prompt_includes._partials.hits
+    load_markdown_prompt(prompts_dir / "beta.md")
+
+    assert prompt_includes._partials.hits == hits + 1
+
+
+@pytest.mark.parametrize(
+    ("directive", "message"),
+    [
+        ("<!-- include: partials/missing.md -->", "Cannot include"),
+        ("<!-- include: ../outside.md -->", "must be relative"),
+        ("<!-- include: partials/loop.md -->", "Include cycle"),
+    ],
+)
+def test_invalid_includes(prompts_dir: Path, directive: str, message: str):
+    _write(prompts_dir / "partials/loop.md", "<!-- include: partials/loop.md -->\n")
+    _write(prompts_dir / "broken.md", f"---\nname: broken\n---\n{directive}\n")
+
+    with pytest.raises(ValueError, match=message):
+        load_markdown_prompt(prompts_dir / "broken.md")
+
+
+def test_include_graph_reports_dependents_of_changed_partials(prompts_dir: Path):
+    graph = IncludeGraph(
+        load_markdown_prompt(prompts_dir / name) for name in ("alpha.md", "beta.md", "gamma.md")
+    )
+    assert graph.changed_partials() == set()
+
+    _write(prompts_dir / "partials/sign.md", "Sign and push.\n", mtime_ns=10**18)
+    changed = graph.changed_partials()
+
+    assert changed == {prompts_dir / "partials/sign.md"}
+    assert graph.dependents(changed) == {prompts_dir / "alpha.md", prompts_dir / "beta.md"}
+    assert graph.changed_partials() == set()  # Each change is reported once
+
+
+def test_prompt_cache_reparses_when_partial_changes(prompts_dir: Path):
+    cache = PromptCache()
+    alpha = cache.load(prompts_dir / "alpha.md")
+    assert cache.load(prompts_dir / "alpha.md") is alpha
+
+    _write(prompts_dir / "partials/sign.md", "Sign and push.\n", mtime_ns=10**18)
+
+    assert "Sign and push." in cache.load(prompts_dir / "alpha.md").body
+
+
+def test_watcher_regenerates_dependents_of_edited_partial(prompts_dir: Path, tmp_path: Path):
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code"],
+        base_path=tmp_path,
+        overwrite_action="overwrite",
+    )
+    watcher = PromptWatcher(writer, poll_interval=0.01, debounce=0.0)
+    watcher.initialize()
+
+    _write(prompts_dir / "partials/commit.md", "Commit once per task.\n", mtime_ns=10**18)
+    changes = watcher.poll()
+    summary = watcher.apply(changes)
+
+    assert changes.modified == {prompts_dir / "alpha.md", prompts_dir / "beta.md"}
+    assert len(summary["written"]) == 2
+    assert "Commit once per task." in (tmp_path / ".claude/commands/beta.md").read_text()
+
+
+def test_renderer_refreshes_only_dependents(prompts_dir: Path):
+    prompts = [load_markdown_prompt(prompts_dir / name) for name in ("alpha.md", "gamma.md")]
+    renderer = CommandRenderer(prompts)
+    renderer.render("claude-code")
+    generation = renderer.generation
+
+    _write(prompts_dir / "partials/sign.md", "Sign and push.\n", mtime_ns=10**18)
+    files = {file["name"]: file["content"] for file in renderer.render("claude-code")}
+
+    assert renderer.generation != generation
+    assert "Sign and push." in files["alpha"]
+    assert renderer.cache.hits == 1  # gamma
+    assert renderer.cache.misses == 3
+
+
+def test_includes_inside_prompt_pack(tmp_path: Path):
+    pack = tmp_path / "pack.zip"
+    with zipfile.ZipFile(pack, "w") as archive:
+        archive.writestr("alpha.md", "---\nname: alpha\n---\n<!-- include: shared/a.md -->\n")
+        archive.writestr("shared/a.md", "From the pack.\n")
+
+    assert load_markdown_prompt(pack / "alpha.md").body == "From the pack."
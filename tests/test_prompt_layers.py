@@ -0,0 +1,117 @@
+"""Tests for layered prompt directories."""
+
+import os
+
+import pytest
+
+from mcp_server import prompt_layers
+from mcp_server.prompt_layers import PromptOverlay
+from mcp_server.prompts_loader import register_prompts
+from slash_commands.timing import collect_timings
+from slash_commands.writer import SlashCommandWriter
+
+
+@pytest.fixture(autouse=True)
+def isolated_layer_cache(monkeypatch, tmp_path):
+    """Start every test without cached layer indexes."""
+    monkeypatch.setattr(prompt_layers, "_memory", {})
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def _write_prompt(directory, filename, name, body):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / filename).write_text(f"---\nname: {name}\n---\n{body}\n", encoding="utf-8")
+
+
+@pytest.fixture
+def layers(tmp_path):
+    """Org, team and user layers; the user layer renames its file."""
+    org, team, user = tmp_path / "org", tmp_path / "team", tmp_path / "user"
+    _write_prompt(org, "review.md", "review", "org review")
+    _write_prompt(org, "plan.md", "plan", "org plan")
+    _write_prompt(team, "review.md", "review", "team review")
+    _write_prompt(user, "my-plan.md", "plan", "user plan")
+    return [org, team, user]
+
+
+def test_highest_layer_wins_by_name(layers):
+    overlay = PromptOverlay(layers)
+
+    prompts = {prompt.name: prompt.body for prompt in overlay.load()}
+
+    assert prompts == {"review": "team review", "plan": "user plan"}
+
+
+def test_unchanged_layers_are_not_rescanned(layers, tmp_path):
+    cache_path = tmp_path / "overlay.json"
+    PromptOverlay(layers, cache_path=cache_path).resolve()
+    prompt_layers._memory.clear()  # A new process, with only the cache file
+
+    overlay = PromptOverlay(layers, cache_path=cache_path)
+    overlay.resolve()
+    assert overlay.scanned == 0
+
+    _write_prompt(layers[0], "ship.md", "ship", "org ship")
+    winners = overlay.resolve()
+    assert overlay.scanned == 1
+    assert winners["ship"] == layers[0] / "ship.md"
+
+
+def test_in_place_rename_is_detected(layers):
+    overlay = PromptOverlay(layers)
+    overlay.resolve()
+    user_file = layers[2] / "my-plan.md"
+    stat = layers[2].stat()
+    _write_prompt(layers[2], "my-plan.md", "roadmap", "user roadmap")
+    os.utime(layers[2], ns=(stat.st_atime_ns, stat.st_mtime_ns))  # Directory looks unchanged
+
+    prompts = {prompt.name: prompt.path for prompt in overlay.load()}
+
+    assert prompts["roadmap"] == user_file
+    assert prompts["plan"] == layers[0] / "plan.md"
+
+
+def test_missing_layer(tmp_path):
+    with pytest.raises(ValueError, match="does not exist"):
+        PromptOverlay([tmp_path / "missing", tmp_path]).resolve()
+
+
+def test_writer_generates_from_layers(layers, tmp_path):
+    writer = SlashCommandWriter(
+        prompts_dir=layers[-1],
+        prompt_layers=layers[:-1],
+        agents=["claude-code"],
+        base_path=tmp_path / "target",
+    )
+
+    writer.generate()
+
+    commands = tmp_path / "target/.claude/commands"
+    assert "team review" in (commands / "review.md").read_text()
+    assert "user plan" in (commands / "plan.md").read_text()
+
+
+def test_writer_loads_layered_prompts_one_at_a_time(layers, tmp_path):
+    writer = SlashCommandWriter(
+        prompts_dir=layers[-1],
+        prompt_layers=layers[:-1],
+        agents=["claude-code"],
+        base_path=tmp_path / "target",
+    )
+    writer._prompt_overlay().resolve()
+    stat = layers[2].stat()
+    _write_prompt(layers[2], "my-plan.md", "roadmap", "user roadmap")
+    os.utime(layers[2], ns=(stat.st_atime_ns, stat.st_mtime_ns))  # Directory looks unchanged
+
+    with collect_timings() as timings:
+        names = [prompt.name for prompt in writer._iter_prompts()]
+
+    assert names == ["roadmap", "plan", "review"]
+    assert timings.stages["load"].calls == 3
+    assert timings.stages["discovery"].calls == 2  # Initial scan and one rescan
+
+
+def test_server_registers_layered_prompts(mcp_server, layers):
+    prompts = register_prompts(mcp_server, layers[-1], layers[:-1])
+
+    assert sorted(prompt.name for prompt in prompts) == ["plan", "review"]
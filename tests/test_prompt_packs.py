@@ -0,0 +1,87 @@
+"""Tests for prompt packs read from zip archives."""
+
+import zipfile
+
+import pytest
+
+from mcp_server.prompt_packs import PromptPack, list_prompt_files, open_pack
+from mcp_server.prompt_utils import load_markdown_prompt
+from mcp_server.prompts_loader import register_prompts
+from slash_commands.prompt_cache import PromptCache
+from slash_commands.writer import SlashCommandWriter
+
+
+def _write_pack(path, members):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return path
+
+
+@pytest.fixture
+def pack(tmp_path):
+    return _write_pack(
+        tmp_path / "sdd-1.0.zip",
+        {
+            "sdd-1.0/generate-spec.md": "---\nname: generate-spec\n---\nWrite a spec.\n",
+            "sdd-1.0/manage-tasks.md": "---\nname: manage-tasks\n---\nManage tasks.\n",
+            "sdd-1.0/notes/ignored.md": "Not a prompt.\n",
+        },
+    )
+
+
+def test_lists_prompts_in_single_top_level_directory(pack):
+    files = list_prompt_files(pack)
+
+    assert [path.name for path in files] == ["generate-spec.md", "manage-tasks.md"]
+    assert load_markdown_prompt(files[0]).body == "Write a spec."
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_reads_members(tmp_path, use_mmap):
+    path = _write_pack(tmp_path / "flat.zip", {"alpha.md": "---\nname: alpha\n---\nA\n"})
+    pack = PromptPack(path, use_mmap=use_mmap)
+    try:
+        assert pack.read_text("alpha.md") == "---\nname: alpha\n---\nA\n"
+        with pytest.raises(FileNotFoundError):
+            pack.member("missing.md")
+    finally:
+        pack.close()
+
+
+def test_reopens_changed_pack(tmp_path):
+    path = _write_pack(tmp_path / "flat.zip", {"alpha.md": "---\nname: alpha\n---\nfirst\n"})
+    cache = PromptCache()
+    assert cache.load(path / "alpha.md").body == "first"
+    first = open_pack(path)
+
+    _write_pack(path, {"alpha.md": "---\nname: alpha\n---\nsecond, longer\n"})
+
+    assert open_pack(path) is not first
+    assert cache.load(path / "alpha.md").body == "second, longer"
+
+
+def test_invalid_pack(tmp_path):
+    path = tmp_path / "broken.zip"
+    path.write_bytes(b"not a zip")
+
+    with pytest.raises(ValueError, match="Invalid prompt pack"):
+        PromptPack(path)
+
+
+def test_writer_generates_from_pack(pack, tmp_path):
+    writer = SlashCommandWriter(
+        prompts_dir=pack, agents=["claude-code"], base_path=tmp_path / "target"
+    )
+
+    result = writer.generate()
+
+    assert result["prompts_loaded"] == 2
+    command = tmp_path / "target/.claude/commands/generate-spec.md"
+    assert "Write a spec." in command.read_text()
+
+
+def test_server_registers_pack_prompts(mcp_server, pack):
+    prompts = register_prompts(mcp_server, pack)
+
+    assert [prompt.name for prompt in prompts] == ["generate-spec", "manage-tasks"]
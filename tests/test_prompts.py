@@ -113,3 +113,70 @@ class TestPromptLoading:
         decorator_kwargs = prompt.decorator_kwargs()
 
         assert decorator_kwargs["tags"] == ["execution", "tasks"]
+
+
+class TestAgentOverrides:
+    """Tests for per-agent override views resolved at load time."""
+
+    def _write_prompt(self, tmp_path, overrides: str):
+        prompt_path = tmp_path / "override-prompt.md"
+        prompt_path.write_text(
+            "---\n"
+            "name: override-prompt\n"
+            "description: Base description\n"
+            "arguments:\n"
+            "  - name: target\n"
+            "    required: true\n"
+            f"agent_overrides:\n{overrides}"
+            "---\n"
+            "# Body\n"
+        )
+        return prompt_path
+
+    def test_views_are_resolved_at_load_time(self, tmp_path):
+        prompt = load_markdown_prompt(
+            self._write_prompt(
+                tmp_path,
+                "  gemini-cli:\n"
+                "    description: Gemini description\n"
+                "    enabled: false\n"
+                "    arguments:\n"
+                "      - name: target\n"
+                "        required: false\n"
+                "      - extra\n",
+            )
+        )
+
+        view = prompt.for_agent("gemini-cli")
+        assert view.description == "Gemini description"
+        assert view.enabled is False
+        assert [(arg.name, arg.required) for arg in view.arguments] == [
+            ("target", False),
+            ("extra", True),
+        ]
+        # The view is computed once and shared by every lookup
+        assert prompt.for_agent("gemini-cli") is view
+        assert prompt.for_agent("claude-code") is prompt.default_view
+        assert prompt.default_view.description == "Base description"
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            "  gemini-cli: just a string\n",
+            "  gemini-cli:\n    enabled: maybe\n",
+            "  gemini-cli:\n    arguments:\n      - description: Missing name\n",
+        ],
+    )
+    def test_malformed_overrides_fail_at_load_time(self, tmp_path, overrides):
+        with pytest.raises(ValueError, match="agent_overrides"):
+            load_markdown_prompt(self._write_prompt(tmp_path, overrides))
+
+    def test_unsupported_override_keys_are_ignored_with_a_warning(self, tmp_path, caplog):
+        prompt = load_markdown_prompt(
+            self._write_prompt(tmp_path, "  gemini-cli:\n    descripton: Typo\n")
+        )
+
+        assert prompt.for_agent("gemini-cli").description == "Base description"
+        assert "ignoring unsupported agent_overrides keys for 'gemini-cli': descripton" in (
+            caplog.text
+        )
@@ -0,0 +1,101 @@
+"""Tests for the drift status report."""
+
+import json
+
+from slash_commands.manifest import manifest_path
+from slash_commands.status import collect_status
+from slash_commands.writer import SlashCommandWriter
+
+
+def _writer(prompts_dir, target):
+    return SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        base_path=target,
+        overwrite_action="overwrite",
+    )
+
+
+def _states(report):
+    return {
+        f"{status.path.parent.parent.name}/{status.path.name}": status.state
+        for status in report.files
+    }
+
+
+def test_freshly_generated_files_are_up_to_date(temp_prompts_dir, tmp_path):
+    writer = _writer(temp_prompts_dir, tmp_path)
+    writer.generate()
+
+    report = collect_status(writer)
+
+    assert report.files
+    assert set(report.counts()) == {"up-to-date", "stale", "modified", "orphaned"}
+    assert report.counts()["up-to-date"] == len(report.files)
+    assert all(status.reason == "matches the manifest" for status in report.files)
+
+
+def test_manifest_is_kept_outside_the_target(temp_prompts_dir, tmp_path):
+    target = tmp_path / "home"
+    (target / ".sdd-manifest.json").parent.mkdir()
+    (target / ".sdd-manifest.json").write_text("{}")  # Left by an earlier version
+    writer = _writer(temp_prompts_dir, target)
+
+    writer.generate()
+
+    assert manifest_path(target).is_relative_to(tmp_path / "state")
+    assert json.loads(manifest_path(target).read_text())["target"] == str(target.resolve())
+    assert sorted(path.name for path in target.iterdir()) == [".claude", ".gemini"]
+
+    writer.cleanup(include_backups=False)
+
+    assert not manifest_path(target).exists()
+
+
+def test_classifies_drift(temp_prompts_dir, tmp_path):
+    writer = _writer(temp_prompts_dir, tmp_path)
+    writer.generate()
+    edited = tmp_path / ".claude/commands/generate-spec.md"
+    edited.write_text(edited.read_text() + "\nMy notes.\n", encoding="utf-8")
+    prompt_file = temp_prompts_dir / "generate-task-list-from-spec.md"
+    prompt_file.write_text(prompt_file.read_text() + "\nMore steps.\n", encoding="utf-8")
+    (temp_prompts_dir / "manage-tasks.md").unlink()
+    # Files without generated metadata are not reported
+    (tmp_path / ".claude/commands/handwritten.md").write_text("# Mine\n", encoding="utf-8")
+
+    states = _states(collect_status(writer))
+
+    assert states[".claude/generate-spec.md"] == "modified"
+    assert states[".claude/generate-task-list-from-spec.md"] == "stale"
+    assert states[".gemini/generate-task-list-from-spec.toml"] == "stale"
+    assert states[".claude/manage-tasks.md"] == "orphaned"
+    assert states[".gemini/generate-spec.toml"] == "up-to-date"
+    assert ".claude/handwritten.md" not in states
+
+
+def test_older_version_is_stale(temp_prompts_dir, tmp_path):
+    writer = _writer(temp_prompts_dir, tmp_path)
+    writer.generate()
+    manifest_file = manifest_path(tmp_path)
+    manifest = json.loads(manifest_file.read_text())
+    manifest["files"][".claude/commands/generate-spec.md"]["version"] = "0.0.1"
+    manifest_file.write_text(json.dumps(manifest))
+
+    states = _states(collect_status(writer))
+
+    assert states[".claude/generate-spec.md"] == "stale"
+
+
+def test_falls_back_to_rendering_without_manifest(temp_prompts_dir, tmp_path):
+    writer = _writer(temp_prompts_dir, tmp_path)
+    writer.generate()
+    manifest_path(tmp_path).unlink()
+    command = tmp_path / ".gemini/commands/generate-spec.toml"
+    command.write_text(command.read_text().replace("Generate", "Write"), encoding="utf-8")
+
+    report = collect_status(writer)
+    states = _states(report)
+
+    assert states[".gemini/generate-spec.toml"] == "modified"
+    assert states[".claude/generate-spec.md"] == "up-to-date"
+    assert {status.reason for status in report.files} >= {"matches a fresh render"}
@@ -0,0 +1,65 @@
+"""Tests for per-stage timing collection."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from slash_commands.timing import collect_timings, current_timings, stage
+from slash_commands.writer import SlashCommandWriter
+
+
+def test_stage_is_noop_without_collector():
+    """Test that timing stages cost nothing when no collector is active."""
+    assert current_timings() is None
+    with stage("render"):
+        pass
+    assert current_timings() is None
+
+
+def test_collect_timings_accumulates_stages():
+    """Test that repeated stages accumulate wall time and call counts."""
+    with collect_timings() as timings:
+        for _ in range(3):
+            with stage("render"):
+                sum(range(1000))
+        timings.add_prompt("slow", 0.5)
+        timings.add_prompt("fast", 0.1)
+        timings.add_prompt("slow", 0.25)
+
+    assert current_timings() is None
+    assert timings.stages["render"].calls == 3
+    assert timings.stages["render"].wall > 0
+    assert timings.elapsed >= timings.stages["render"].wall
+    assert timings.slowest_prompts(1) == [("slow", 0.75)]
+
+
+def test_writer_reports_generation_stages(tmp_path):
+    """Test that a generation run records every pipeline stage and prompt."""
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    for name in ("alpha", "beta"):
+        (prompts_dir / f"{name}.md").write_text(
+            f"---\nname: {name}\ndescription: {name}\n---\n# {name}\n"
+        )
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        base_path=tmp_path,
+        overwrite_action="backup",
+    )
+    writer.generate()
+    with collect_timings() as timings:
+        writer.generate()
+
+    expected = {"discovery", "load", "overrides", "render", "normalize", "exists", "backup"}
+    assert expected <= set(timings.stages)
+    assert timings.stages["load"].calls == 2
+    assert timings.stages["write"].calls == 4
+    assert timings.files == 4
+    assert set(timings.prompts) == {"alpha", "beta"}
+
+    data = timings.to_dict(slowest=1)
+    assert len(data["slowest_prompts"]) == 1
+    assert data["files_per_second"] > 0
+    assert Path(tmp_path / ".claude" / "commands" / "alpha.md").exists()
@@ -0,0 +1,154 @@
+"""Tests for transactional staging of generated command files."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from slash_commands.transaction import (
+    STAGING_PREFIX,
+    STALE_STAGING_AGE,
+    AgentTransaction,
+    _host_tag,
+    _staging_owner,
+)
+from slash_commands.writer import SlashCommandWriter
+
+
+def _staging_dirs(command_dir: Path) -> list[Path]:
+    return [p for p in command_dir.iterdir() if p.name.startswith(STAGING_PREFIX)]
+
+
+def test_transaction_commits_staged_files(tmp_path: Path):
+    command_dir = tmp_path / ".claude" / "commands"
+    transaction = AgentTransaction(command_dir)
+
+    transaction.stage(command_dir / "one.md", "one\n")
+    transaction.stage(command_dir / "two.md", "two\n")
+
+    # Nothing is visible before commit
+    assert not (command_dir / "one.md").exists()
+
+    transaction.commit()
+
+    assert (command_dir / "one.md").read_text() == "one\n"
+    assert (command_dir / "two.md").read_text() == "two\n"
+    assert transaction.committed
+    assert _staging_dirs(command_dir) == []
+
+
+def test_transaction_rollback_leaves_directory_untouched(tmp_path: Path):
+    command_dir = tmp_path / "commands"
+    command_dir.mkdir()
+    (command_dir / "one.md").write_text("original\n")
+
+    transaction = AgentTransaction(command_dir)
+    transaction.stage(command_dir / "one.md", "updated\n")
+    transaction.rollback()
+
+    assert (command_dir / "one.md").read_text() == "original\n"
+    assert _staging_dirs(command_dir) == []
+
+
+def test_transaction_removes_staging_left_by_killed_runs(tmp_path: Path):
+    command_dir = tmp_path / "commands"
+    host = _host_tag()
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()  # Its PID now belongs to no running process
+    dead = command_dir / f"{STAGING_PREFIX}{host}-{finished.pid}-1-abc"
+    (dead / ".rollback").mkdir(parents=True)
+    (dead / ".rollback" / "0-one.md").write_text("original\n")
+    live = command_dir / f"{STAGING_PREFIX}{_staging_owner()}-def"
+    live.mkdir()
+    reused = command_dir / f"{STAGING_PREFIX}{host}-{os.getpid()}-1-ghi"  # PID reused since
+    reused.mkdir()
+    other_host = command_dir / f"{STAGING_PREFIX}0123456789ab-{finished.pid}-1-jkl"
+    other_host.mkdir()
+    legacy = command_dir / f"{STAGING_PREFIX}mno"
+    legacy.mkdir()
+    old = legacy.stat().st_mtime - STALE_STAGING_AGE - 1
+    os.utime(legacy, (old, old))
+
+    transaction = AgentTransaction(command_dir)
+    transaction.stage(command_dir / "one.md", "one\n")
+    transaction.commit()
+
+    assert sorted(_staging_dirs(command_dir)) == sorted([live, other_host])
+
+    os.utime(other_host, (old, old))
+    AgentTransaction(command_dir).stage(command_dir / "two.md", "two\n")
+
+    assert other_host not in _staging_dirs(command_dir)
+
+
+def test_transaction_restores_originals_when_swap_fails(tmp_path: Path):
+    command_dir = tmp_path / "commands"
+    command_dir.mkdir()
+    (command_dir / "one.md").write_text("original one\n")
+
+    transaction = AgentTransaction(command_dir)
+    transaction.stage(command_dir / "one.md", "updated one\n")
+    transaction.stage(command_dir / "two.md", "new two\n")
+
+    real_replace = os.replace
+    calls = {"count": 0}
+
+    def flaky_replace(src, dst):
+        calls["count"] += 1
+        if calls["count"] == 2:
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    with (
+        patch("slash_commands.transaction.os.replace", side_effect=flaky_replace),
+        pytest.raises(OSError, match="disk full"),
+    ):
+        transaction.commit()
+
+    assert (command_dir / "one.md").read_text() == "original one\n"
+    assert not (command_dir / "two.md").exists()
+    assert not transaction.committed
+    assert _staging_dirs(command_dir) == []
+
+
+def test_writer_transactional_mode_rolls_back_on_failure(tmp_path: Path):
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    for name in ("alpha", "beta"):
+        (prompts_dir / f"{name}.md").write_text(
+            f"---\nname: {name}\ndescription: {name} prompt\n---\n# {name.title()}\n"
+        )
+
+    command_dir = tmp_path / ".claude" / "commands"
+    command_dir.mkdir(parents=True)
+    (command_dir / "alpha.md").write_text("user content\n")
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code"],
+        base_path=tmp_path,
+        overwrite_action="overwrite",
+        transactional=True,
+    )
+
+    with (
+        patch.object(AgentTransaction, "commit", side_effect=KeyboardInterrupt),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        writer.generate()
+
+    assert (command_dir / "alpha.md").read_text() == "user content\n"
+    assert not (command_dir / "beta.md").exists()
+    assert _staging_dirs(command_dir) == []
+
+    result = writer.generate()
+
+    assert result["files_written"] == 2
+    assert "# Alpha" in (command_dir / "alpha.md").read_text()
+    assert "# Beta" in (command_dir / "beta.md").read_text()
+    assert _staging_dirs(command_dir) == []
@@ -0,0 +1,125 @@
+"""Tests for watch mode."""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from slash_commands.watch import PromptWatcher, WatchChanges, diff_snapshots, snapshot_prompts
+from slash_commands.writer import SlashCommandWriter
+
+
+def _write_prompt(prompts_dir: Path, name: str, title: str, mtime_ns: int | None = None) -> Path:
+    prompt_file = prompts_dir / f"{name}.md"
+    prompt_file.write_text(
+        f"---\nname: {name}\ndescription: {name} prompt\n---\n# {title}\n", encoding="utf-8"
+    )
+    if mtime_ns is not None:
+        # Make edits visible regardless of filesystem timestamp granularity
+        os.utime(prompt_file, ns=(mtime_ns, mtime_ns))
+    return prompt_file
+
+
+@pytest.fixture
+def watcher(tmp_path: Path) -> PromptWatcher:
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    _write_prompt(prompts_dir, "alpha", "Alpha")
+    _write_prompt(prompts_dir, "beta", "Beta")
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        base_path=tmp_path,
+        overwrite_action="overwrite",
+    )
+    watcher = PromptWatcher(writer, poll_interval=0.01, debounce=0.0)
+    watcher.initialize()
+    return watcher
+
+
+def test_diff_snapshots_reports_modified_and_deleted():
+    old = {Path("a.md"): (1, 10), Path("b.md"): (1, 10)}
+    new = {Path("a.md"): (2, 10), Path("c.md"): (1, 5)}
+
+    changes = diff_snapshots(old, new)
+
+    assert changes.modified == {Path("a.md"), Path("c.md")}
+    assert changes.deleted == {Path("b.md")}
+
+
+def test_watch_changes_merge_keeps_latest_state():
+    pending = WatchChanges(modified={Path("a.md")})
+    pending.merge(WatchChanges(deleted={Path("a.md")}))
+    assert pending.modified == set()
+    assert pending.deleted == {Path("a.md")}
+
+    pending.merge(WatchChanges(modified={Path("a.md")}))
+    assert pending.modified == {Path("a.md")}
+    assert pending.deleted == set()
+
+
+def test_watcher_regenerates_only_modified_prompt(watcher: PromptWatcher, tmp_path: Path):
+    prompts_dir = watcher.writer.prompts_dir
+    beta_output = tmp_path / ".claude" / "commands" / "beta.md"
+    beta_before = beta_output.read_text()
+
+    _write_prompt(prompts_dir, "alpha", "Alpha Edited", mtime_ns=10**18)
+    changes = watcher.poll()
+    summary = watcher.apply(changes)
+
+    assert changes.modified == {prompts_dir / "alpha.md"}
+    assert sorted(summary["written"]) == [
+        str(tmp_path / ".claude" / "commands" / "alpha.md"),
+        str(tmp_path / ".gemini" / "commands" / "alpha.toml"),
+    ]
+    assert "Alpha Edited" in (tmp_path / ".claude" / "commands" / "alpha.md").read_text()
+    assert beta_output.read_text() == beta_before
+
+
+def test_watcher_removes_outputs_of_deleted_prompt(watcher: PromptWatcher, tmp_path: Path):
+    (watcher.writer.prompts_dir / "beta.md").unlink()
+
+    summary = watcher.apply(watcher.poll())
+
+    assert len(summary["removed"]) == 2
+    assert not (tmp_path / ".claude" / "commands" / "beta.md").exists()
+    assert not (tmp_path / ".gemini" / "commands" / "beta.toml").exists()
+    assert (tmp_path / ".claude" / "commands" / "alpha.md").exists()
+
+
+def test_watcher_keeps_user_replaced_outputs(watcher: PromptWatcher, tmp_path: Path):
+    user_file = tmp_path / ".claude" / "commands" / "beta.md"
+    user_file.write_text("# My own command\n")
+    (watcher.writer.prompts_dir / "beta.md").unlink()
+
+    watcher.apply(watcher.poll())
+
+    assert user_file.read_text() == "# My own command\n"
+
+
+def test_watcher_debounces_bursts_until_quiet(watcher: PromptWatcher):
+    prompts_dir = watcher.writer.prompts_dir
+    _write_prompt(prompts_dir, "alpha", "Alpha 1", mtime_ns=10**18)
+    _write_prompt(prompts_dir, "gamma", "Gamma", mtime_ns=10**18)
+
+    changes = watcher.wait_for_changes(threading.Event())
+
+    assert changes.modified == {prompts_dir / "alpha.md", prompts_dir / "gamma.md"}
+
+
+def test_watcher_requires_non_interactive_writer(tmp_path: Path):
+    writer = SlashCommandWriter(prompts_dir=tmp_path, agents=["claude-code"], base_path=tmp_path)
+
+    with pytest.raises(ValueError, match="non-interactive"):
+        PromptWatcher(writer)
+
+
+def test_snapshot_prompts_ignores_non_markdown(tmp_path: Path):
+    _write_prompt(tmp_path, "alpha", "Alpha")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    assert list(snapshot_prompts(tmp_path)) == [tmp_path / "alpha.md"]
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import tracemalloc
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from slash_commands.config import CommandFormat
+from slash_commands.diffing import classify_change
+from slash_commands.generators import MarkdownCommandGenerator
 from slash_commands.writer import SlashCommandWriter, _find_package_prompts_dir
 
 
@@ -642,3 +645,276 @@ def test_writer_cleanup_excludes_backups_when_requested(tmp_path):
 
     assert result["files_deleted"] == 0
     assert backup_file.exists()  # Backup should still exist
+
+
+def test_writer_sniffs_large_generated_markdown_without_full_read(tmp_path):
+    """Test that generated markdown is recognized from its head alone."""
+    command_dir = tmp_path / ".claude" / "commands"
+    command_dir.mkdir(parents=True, exist_ok=True)
+    generated_file = command_dir / "big-command.md"
+    generated_file.write_text(
+        "---\nname: big-command\nmeta:\n  source_prompt: big\n  version: 1.0.0\n---\n"
+        + "Body line with ünïcode\n" * 20_000,
+        encoding="utf-8",
+    )
+
+    writer = SlashCommandWriter(prompts_dir=tmp_path, agents=[], base_path=tmp_path)
+
+    with patch.object(Path, "read_text", side_effect=AssertionError("full read")):
+        found_files = writer.find_generated_files(agents=["claude-code"], include_backups=False)
+
+    assert [info["path"] for info in found_files] == [str(generated_file)]
+
+
+def test_writer_sniffs_large_generated_toml_from_trailing_meta(tmp_path):
+    """Test that generated TOML is recognized from the trailing [meta] table."""
+    command_dir = tmp_path / ".gemini" / "commands"
+    command_dir.mkdir(parents=True, exist_ok=True)
+    generated_file = command_dir / "big-command.toml"
+    body = "Prompt line with ünïcode\n" * 20_000
+    generated_file.write_text(
+        f'prompt = """\n{body}"""\ndescription = "Big"\n\n'
+        '[meta]\nversion = "1.0.0"\nsource_prompt = "big"\nagent = "gemini-cli"\n',
+        encoding="utf-8",
+    )
+
+    writer = SlashCommandWriter(prompts_dir=tmp_path, agents=[], base_path=tmp_path)
+
+    with patch.object(Path, "read_text", side_effect=AssertionError("full read")):
+        found_files = writer.find_generated_files(agents=["gemini-cli"], include_backups=False)
+
+    assert [info["path"] for info in found_files] == [str(generated_file)]
+
+
+def test_writer_falls_back_to_full_parse_when_sniff_is_ambiguous(tmp_path):
+    """Test that frontmatter larger than the sniff window is still detected."""
+    command_dir = tmp_path / ".claude" / "commands"
+    command_dir.mkdir(parents=True, exist_ok=True)
+    generated_file = command_dir / "long-frontmatter.md"
+    long_description = "x" * 20_000
+    generated_file.write_text(
+        f"---\nname: long\ndescription: {long_description}\n"
+        "meta:\n  source_prompt: long\n---\n# Long\n",
+        encoding="utf-8",
+    )
+    manual_file = command_dir / "manual-long.md"
+    manual_file.write_text(f"---\nname: manual\ndescription: {long_description}\n---\n# Manual\n")
+
+    writer = SlashCommandWriter(prompts_dir=tmp_path, agents=[], base_path=tmp_path)
+    found_files = writer.find_generated_files(agents=["claude-code"], include_backups=False)
+
+    assert [info["path"] for info in found_files] == [str(generated_file)]
+
+
+def test_writer_diff_mode_classifies_changes(mock_prompt_load: Path, tmp_path):
+    """Test that diff mode reports created, modified and unchanged files."""
+    prompts_dir = mock_prompt_load
+    SlashCommandWriter(
+        prompts_dir=prompts_dir, agents=["claude-code", "gemini-cli"], base_path=tmp_path
+    ).generate()
+
+    # Edit one generated file and remove another
+    claude_path = tmp_path / ".claude" / "commands" / "test-prompt.md"
+    claude_path.write_text(claude_path.read_text().replace("This is a test", "Hand-edited"))
+    (prompts_dir / "second-prompt.md").write_text(
+        "---\nname: second-prompt\ndescription: Second\n---\n# Second\n"
+    )
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        dry_run=True,
+        base_path=tmp_path,
+        diff=True,
+    )
+    result = writer.generate()
+
+    statuses = {
+        (info["agent"], Path(info["path"]).stem): info["status"] for info in result["files"]
+    }
+    # updated_at differs between runs but must not count as a change
+    assert statuses[("gemini-cli", "test-prompt")] == "unchanged"
+    assert statuses[("claude-code", "test-prompt")] == "modified"
+    assert statuses[("claude-code", "second-prompt")] == "created"
+    assert result["changes"] == {"created": 2, "modified": 1, "unchanged": 1}
+
+    modified = next(info for info in result["files"] if info["status"] == "modified")
+    assert "-Hand-edited prompt." in modified["diff"]
+    assert "+This is a test prompt." in modified["diff"]
+    assert "Hand-edited" in claude_path.read_text()
+
+
+def test_writer_diff_mode_skips_text_diff_for_unchanged_files(mock_prompt_load: Path, tmp_path):
+    """Test that unchanged files are rejected by size/digest without diffing."""
+    writer_args = {
+        "prompts_dir": mock_prompt_load,
+        "agents": ["claude-code"],
+        "base_path": tmp_path,
+    }
+    SlashCommandWriter(**writer_args).generate()
+
+    with patch("slash_commands.diffing.difflib.unified_diff") as mock_diff:
+        result = SlashCommandWriter(**writer_args, dry_run=True, diff=True).generate()
+
+    mock_diff.assert_not_called()
+    assert result["changes"]["unchanged"] == 1
+
+
+@pytest.mark.parametrize(
+    ("template", "filename"),
+    [
+        ("---\nmeta:\n  updated_at: '{stamp}'\n---\n\nupdated_at: {body}\n", "cmd.md"),
+        (
+            'prompt = """\nupdated_at = {body}\n"""\n\n[meta]\nupdated_at = "{stamp}"\n',
+            "cmd.toml",
+        ),
+    ],
+)
+def test_classify_change_masks_updated_at_only_in_metadata(tmp_path, template, filename):
+    """Test that only the generated metadata's updated_at is ignored, not body lines."""
+    path = tmp_path / filename
+    path.write_text(template.format(stamp="2024-01-01", body="old"))
+
+    assert classify_change(path, template.format(stamp="2025-06-30", body="old")).status == (
+        "unchanged"
+    )
+    assert classify_change(path, template.format(stamp="2024-01-01", body="new")).status == (
+        "modified"
+    )
+
+
+def _write_prompt_library(prompts_dir: Path, count: int, body_size: int) -> None:
+    """Write ``count`` prompt files with bodies of roughly ``body_size`` bytes."""
+    prompts_dir.mkdir()
+    for index in range(count):
+        (prompts_dir / f"prompt-{index:03d}.md").write_text(
+            f"---\nname: prompt-{index:03d}\ndescription: Prompt {index}\n---\n"
+            + ("Body text line.\n" * (body_size // 16))
+        )
+
+
+def test_writer_iter_generate_yields_one_result_per_prompt(tmp_path):
+    """Test that iter_generate yields each prompt's files as it is written."""
+    prompts_dir = tmp_path / "prompts"
+    _write_prompt_library(prompts_dir, count=3, body_size=64)
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        base_path=tmp_path,
+    )
+    results = writer.iter_generate()
+
+    first = next(results)
+    assert first["name"] == "prompt-000"
+    assert {info["agent"] for info in first["files"]} == {"claude-code", "gemini-cli"}
+    # The first prompt is on disk before later prompts are rendered
+    assert all(Path(info["path"]).exists() for info in first["files"])
+    assert not (tmp_path / ".claude" / "commands" / "prompt-001.md").exists()
+
+    remaining = list(results)
+    assert [result["name"] for result in remaining] == ["prompt-001", "prompt-002"]
+    assert all(len(result["files"]) == 2 for result in remaining)
+
+
+def test_writer_iter_generate_memory_is_bounded(tmp_path):
+    """Test that peak memory stays well below the size of the prompt library."""
+    body_size = 32 * 1024
+    count = 120
+    prompts_dir = tmp_path / "prompts"
+    _write_prompt_library(prompts_dir, count=count, body_size=body_size)
+
+    writer = SlashCommandWriter(
+        prompts_dir=prompts_dir,
+        agents=["claude-code", "gemini-cli"],
+        base_path=tmp_path,
+    )
+
+    tracemalloc.start()
+    try:
+        processed = sum(1 for _ in writer.iter_generate())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert processed == count
+    # Holding every prompt body (plus rendered output) would need several MB
+    assert peak < count * body_size / 4
+
+
+def test_writer_plan_classifies_existing_files(mock_prompt_load: Path, tmp_path):
+    """Test that planning sorts existing outputs into conflict categories."""
+    (mock_prompt_load / "second-prompt.md").write_text(
+        "---\nname: second-prompt\ndescription: Second\n---\n# Second\n"
+    )
+    (mock_prompt_load / "third-prompt.md").write_text(
+        "---\nname: third-prompt\ndescription: Third\n---\n# Third\n"
+    )
+    (mock_prompt_load / "fifth-prompt.md").write_text(
+        "---\nname: fifth-prompt\ndescription: Fifth\n---\n# Fifth\n"
+    )
+    writer_args = {
+        "prompts_dir": mock_prompt_load,
+        "agents": ["claude-code"],
+        "base_path": tmp_path,
+    }
+    SlashCommandWriter(**writer_args, overwrite_action="overwrite").generate()
+
+    command_dir = tmp_path / ".claude" / "commands"
+    # A file from an older release and a file edited by hand
+    second = command_dir / "second-prompt.md"
+    second.write_text(second.read_text().replace("version:", "version: 0.0.1 #"))
+    (command_dir / "third-prompt.md").write_text("Edited by hand.\n")
+    # A generated file whose source prompt changed since
+    (mock_prompt_load / "fifth-prompt.md").write_text(
+        "---\nname: fifth-prompt\ndescription: Fifth\n---\n# Fifth, revised\n"
+    )
+    (mock_prompt_load / "fourth-prompt.md").write_text(
+        "---\nname: fourth-prompt\ndescription: Fourth\n---\n# Fourth\n"
+    )
+
+    writer = SlashCommandWriter(**writer_args)
+    plan = writer.plan()
+
+    assert plan.new_files == 1
+    categories = {conflict.path.name: conflict.category for conflict in plan.conflicts}
+    assert categories == {
+        "test-prompt.md": "unchanged",
+        "second-prompt.md": "outdated",
+        "third-prompt.md": "modified",
+        "fifth-prompt.md": "stale",
+    }
+
+    # The write phase applies the planned policies without prompting, and only
+    # renders the output that did not exist when planning
+    with (
+        patch("slash_commands.writer.prompt_overwrite_action") as mock_prompt,
+        patch.object(
+            MarkdownCommandGenerator,
+            "generate",
+            autospec=True,
+            side_effect=MarkdownCommandGenerator.generate,
+        ) as mock_generate,
+    ):
+        writer.resolve_conflicts(
+            plan,
+            {
+                "unchanged": "skip",
+                "outdated": "overwrite",
+                "modified": "backup",
+                "stale": "overwrite",
+            },
+        )
+        result = writer.generate()
+
+    mock_prompt.assert_not_called()
+    assert mock_generate.call_count == 1
+    assert {Path(info["path"]).name for info in result["files"]} == {
+        "second-prompt.md",
+        "third-prompt.md",
+        "fourth-prompt.md",
+        "fifth-prompt.md",
+    }
+    assert "Fifth, revised" in (command_dir / "fifth-prompt.md").read_text()
+    assert len(result["backups_created"]) == 1
+    assert "0.0.1" not in second.read_text()